@@ -1,5 +1,24 @@
 from Trade.position_calculator import PositionCalculator
 from Trade.trade_settings import TRADE_SETTINGS, ORDER_TYPES, TRADE_SIDES
+from Trade.market_filters import get_market_filters
+from Trade.order_tracker import client_order_ids, get_order_tracker
+
+def prepare_account(exchange, symbol_without_slash):
+    """Margin type'ı ISOLATED yap ve kaldıracı ayarla"""
+    # Margin type'ı ISOLATED yap
+    try:
+        exchange.set_margin_mode('ISOLATED', symbol_without_slash)
+        print(f"3️⃣ Margin type ISOLATED olarak ayarlandı")
+    except Exception as e:
+        if "No need to change margin type" not in str(e):
+            print(f"⚠️ Margin type hatası: {str(e)}")
+    
+    # Kaldıracı ayarla
+    try:
+        exchange.set_leverage(TRADE_SETTINGS['LEVERAGE'], symbol_without_slash)
+        print(f"4️⃣ Kaldıraç {TRADE_SETTINGS['LEVERAGE']}x olarak ayarlandı")
+    except Exception as e:
+        print(f"⚠️ Kaldıraç ayarlama hatası: {str(e)}")
 
 def open_futures_position(exchange, symbol, signal_data):
     """Futures pozisyonu aç"""
@@ -22,20 +41,11 @@ def open_futures_position(exchange, symbol, signal_data):
             exchange.options['defaultType'] = 'future'
             print(f"2️⃣ Market tipi future olarak ayarlandı")
             
-            # Margin type'ı ISOLATED yap
-            try:
-                exchange.set_margin_mode('ISOLATED', symbol_without_slash)
-                print(f"3️⃣ Margin type ISOLATED olarak ayarlandı")
-            except Exception as e:
-                if "No need to change margin type" not in str(e):
-                    print(f"⚠️ Margin type hatası: {str(e)}")
-            
-            # Kaldıracı ayarla
-            try:
-                exchange.set_leverage(TRADE_SETTINGS['LEVERAGE'], symbol_without_slash)
-                print(f"4️⃣ Kaldıraç {TRADE_SETTINGS['LEVERAGE']}x olarak ayarlandı")
-            except Exception as e:
-                print(f"⚠️ Kaldıraç ayarlama hatası: {str(e)}")
+            if signal_data.get('prepared'):
+                # Ön sinyal sırasında margin type ve kaldıraç ayarlandı - kapanışta istek atılmaz
+                print(f"3️⃣ Margin type ve kaldıraç önceden ayarlandı")
+            else:
+                prepare_account(exchange, symbol_without_slash)
             
             # İşlem yönünü belirle
             side = TRADE_SIDES['BUY'] if signal_data['type'] == 'buy' else TRADE_SIDES['SELL']
@@ -56,20 +66,41 @@ def open_futures_position(exchange, symbol, signal_data):
                 sl_percent=TRADE_SETTINGS['STOP_LOSS_PERCENT'],
                 tp_percent=TRADE_SETTINGS['TAKE_PROFIT_PERCENT']
             )
+            # Borsa filtreleri: miktar stepSize'a, SL/TP tickSize'a yuvarlanır
+            filters = get_market_filters(exchange)
+            if symbol_without_slash in filters:
+                position_size = filters.quantize_amount(symbol_without_slash, position_size, signal_data['price'])
+                if not position_size:
+                    min_amount = filters.min_amount(symbol_without_slash, signal_data['price'])
+                    print(f"❌ Miktar borsa filtrelerinin altında (en az {min_amount}) - emir gönderilmedi")
+                    return False
+                calc_result['sl_price'] = filters.quantize_price(symbol_without_slash, calc_result['sl_price'])
+                calc_result['tp_price'] = filters.quantize_price(symbol_without_slash, calc_result['tp_price'])
+                print(f"6️⃣ Filtrelere göre yuvarlanan miktar: {position_size}")
+            
             print("\n7️⃣ TP/SL Seviyeleri:")
             print(f"• Giriş: {calc_result['entry_price']:.4f}")
             print(f"• Stop Loss: {calc_result['sl_price']:.4f}")
             print(f"• Take Profit: {calc_result['tp_price']:.4f}")
             
+            # Bacaklar clientOrderId ile takip edilir (user-data stream olayları bu id ile gelir)
+            client_ids = client_order_ids()
+            signal_data['client_order_ids'] = client_ids
+            tracker = get_order_tracker(exchange, create=False)
+            
             print("\n8️⃣ Market emri gönderiliyor...")
             # Ana order'ı aç
             order = exchange.create_market_order(
                 symbol=symbol_without_slash,
                 side=side.lower(),
                 amount=position_size,
-                params={'type': 'future'}
+                params={'type': 'future', 'newClientOrderId': client_ids['entry']}
             )
             print(f"✅ Market emri açıldı! Order ID: {order['id']}")
+            # Emir ID'leri sinyal verisine eklenir (günlük için)
+            signal_data['order_ids'] = {'entry': order['id']}
+            if tracker is not None:
+                tracker.register(order, 'entry')
             
             print("\n9️⃣ Stop Loss emri gönderiliyor...")
             # Stop Loss emri
@@ -81,10 +112,14 @@ def open_futures_position(exchange, symbol, signal_data):
                 params={
                     'stopPrice': calc_result['sl_price'],
                     'reduceOnly': True,
-                    'workingType': 'MARK_PRICE'
+                    'workingType': 'MARK_PRICE',
+                    'newClientOrderId': client_ids['stop_loss']
                 }
             )
             print(f"✅ Stop Loss emri yerleştirildi! Order ID: {sl_order['id']}")
+            signal_data['order_ids']['stop_loss'] = sl_order['id']
+            if tracker is not None:
+                tracker.register(sl_order, 'stop_loss')
             
             print("\n🔟 Take Profit emri gönderiliyor...")
             # Take Profit emri
@@ -96,10 +131,14 @@ def open_futures_position(exchange, symbol, signal_data):
                 params={
                     'stopPrice': calc_result['tp_price'],
                     'reduceOnly': True,
-                    'workingType': 'MARK_PRICE'
+                    'workingType': 'MARK_PRICE',
+                    'newClientOrderId': client_ids['take_profit']
                 }
             )
             print(f"✅ Take Profit emri yerleştirildi! Order ID: {tp_order['id']}")
+            signal_data['order_ids']['take_profit'] = tp_order['id']
+            if tracker is not None:
+                tracker.register(tp_order, 'take_profit')
             
             print(f"""
 {'='*60}
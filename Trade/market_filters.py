@@ -0,0 +1,213 @@
+"""
+Market filtreleri tablosu - emir göndermeden önce miktar ve fiyat yuvarlama
+
+Binance her sembol için LOT_SIZE / MARKET_LOT_SIZE (stepSize, minQty, maxQty),
+PRICE_FILTER (tickSize, minPrice, maxPrice) ve MIN_NOTIONAL filtreleri uygular; bunlara
+uymayan emir reddedilir. Tablo önbellekteki marketlerden bir kez kurulur, satırlar
+NumPy dizileridir: tek sembol O(1), sembol dizileri tek seferde (vektörel) yuvarlanır.
+
+Kullanım:
+    filters = get_market_filters(exchange)
+    amount = filters.quantize_amount('BTC/USDT', 0.01234, price=65000)   # 0.012 (veya 0.0 - işlem yapılamaz)
+    sl = filters.quantize_price('BTC/USDT', 64321.987)                  # 64322.0
+"""
+import threading
+from core.lazy_import import lazy_import
+np = lazy_import('numpy')
+
+# Kayan nokta bölme hatası (0.3 / 0.1 = 2.9999999999999996) adım kaybettirmesin
+EPSILON = 1e-9
+
+FIELDS = [
+    'tick', 'min_price', 'max_price', 'step', 'min_qty', 'max_qty', 'min_notional',
+    'price_decimals', 'amount_decimals',
+]
+
+
+def decimals_of(value):
+    """'0.00100' -> 3, '1' -> 0 (filtre değerleri borsadan string gelir)"""
+    text = f"{float(value):.12f}".rstrip('0')
+    return len(text.split('.')[1]) if '.' in text else 0
+
+
+def _filter_value(filters, filter_type, key):
+    for item in filters:
+        if item.get('filterType') == filter_type and item.get(key) not in (None, ''):
+            return float(item[key])
+    return None
+
+
+def market_row(market):
+    """
+    Tek marketin filtre satırı
+
+    Market emirlerinde (giriş, STOP_MARKET, TAKE_PROFIT_MARKET) MARKET_LOT_SIZE da geçerli
+    olduğu için iki lot filtresinin sıkı olanı alınır. info.filters yoksa ccxt precision/limits.
+    """
+    filters = (market.get('info') or {}).get('filters') or []
+    precision = market.get('precision') or {}
+    limits = market.get('limits') or {}
+
+    tick = _filter_value(filters, 'PRICE_FILTER', 'tickSize') or precision.get('price') or 0.0
+    min_price = _filter_value(filters, 'PRICE_FILTER', 'minPrice') or (limits.get('price') or {}).get('min') or 0.0
+    max_price = _filter_value(filters, 'PRICE_FILTER', 'maxPrice') or (limits.get('price') or {}).get('max') or np.inf
+
+    steps = [s for s in (_filter_value(filters, 'LOT_SIZE', 'stepSize'),
+                         _filter_value(filters, 'MARKET_LOT_SIZE', 'stepSize')) if s]
+    step = max(steps) if steps else (precision.get('amount') or 0.0)
+    min_qtys = [q for q in (_filter_value(filters, 'LOT_SIZE', 'minQty'),
+                            _filter_value(filters, 'MARKET_LOT_SIZE', 'minQty')) if q is not None]
+    min_qty = max(min_qtys) if min_qtys else ((limits.get('amount') or {}).get('min') or 0.0)
+    max_qtys = [q for q in (_filter_value(filters, 'LOT_SIZE', 'maxQty'),
+                            _filter_value(filters, 'MARKET_LOT_SIZE', 'maxQty')) if q]
+    max_qty = min(max_qtys) if max_qtys else ((limits.get('amount') or {}).get('max') or np.inf)
+
+    # Futures: MIN_NOTIONAL.notional, spot: NOTIONAL/MIN_NOTIONAL.minNotional
+    min_notional = (_filter_value(filters, 'MIN_NOTIONAL', 'notional')
+                    or _filter_value(filters, 'MIN_NOTIONAL', 'minNotional')
+                    or _filter_value(filters, 'NOTIONAL', 'minNotional')
+                    or (limits.get('cost') or {}).get('min') or 0.0)
+
+    return {
+        'tick': tick, 'min_price': min_price, 'max_price': max_price,
+        'step': step, 'min_qty': min_qty, 'max_qty': max_qty, 'min_notional': min_notional,
+        'price_decimals': decimals_of(tick) if tick else 12,
+        'amount_decimals': decimals_of(step) if step else 12,
+    }
+
+
+def _quantize(values, increments, decimals, mode):
+    """
+    values'u increments katına yuvarla (mode: 'floor', 'ceil', 'nearest')
+
+    Kat sayısı tamsayı olarak hesaplanır, sonuç 10**decimals'a bölünerek ondalık değere
+    en yakın float elde edilir (0.1 + 0.2 gibi artıklar kalmaz).
+    """
+    ratio = values / np.where(increments > 0, increments, 1.0)
+    if mode == 'floor':
+        units = np.floor(ratio + EPSILON)
+    elif mode == 'ceil':
+        units = np.ceil(ratio - EPSILON)
+    else:
+        units = np.round(ratio)
+    scale = 10.0 ** decimals
+    increment_units = np.round(increments * scale)
+    result = units * increment_units / scale
+    # Filtresi olmayan (increment 0) satırlar değişmez
+    return np.where(increments > 0, result, values)
+
+
+class MarketFilters:
+    """
+    Sembol başına filtre tablosu
+
+    Args:
+        markets (dict): exchange.markets
+    """
+    def __init__(self, markets):
+        self.symbols = []
+        self.index = {}
+        rows = []
+        contract_ids = set()
+        for symbol, market in markets.items():
+            row = market_row(market)
+            self.index[symbol] = len(rows)
+            # 'BTCUSDT' (open_futures_position'ın kullandığı id) ile de bulunur -
+            # spot ve futures aynı id'yi paylaşırsa futures marketi geçerli olur
+            market_id = market.get('id', symbol)
+            if market_id not in self.index or (market.get('contract') and market_id not in contract_ids):
+                self.index[market_id] = len(rows)
+                if market.get('contract'):
+                    contract_ids.add(market_id)
+            self.symbols.append(symbol)
+            rows.append(row)
+        for field in FIELDS:
+            dtype = 'int64' if field.endswith('decimals') else 'float64'
+            setattr(self, field, np.array([row[field] for row in rows], dtype=dtype))
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self.index
+
+    def rows(self, symbols):
+        """Sembol(ler)in satır indeksleri"""
+        if isinstance(symbols, str):
+            return self.index[symbols]
+        return np.fromiter((self.index[s] for s in symbols), dtype='int64', count=len(symbols))
+
+    def row(self, symbol):
+        """Tek sembolün filtreleri (dict)"""
+        i = self.index[symbol]
+        return {field: getattr(self, field)[i].item() for field in FIELDS}
+
+    def quantize_price(self, symbols, prices, mode='nearest'):
+        """
+        Fiyatı tickSize katına yuvarla ve [minPrice, maxPrice] aralığına sıkıştır
+
+        Args:
+            symbols (str | list): Sembol veya semboller
+            prices (float | array): Fiyat(lar)
+            mode (str): 'nearest', 'floor', 'ceil'
+
+        Returns:
+            float | ndarray: Girdi ile aynı şekilde
+        """
+        rows = self.rows(symbols)
+        prices = np.asarray(prices, dtype='float64')
+        result = _quantize(prices, self.tick[rows], self.price_decimals[rows], mode)
+        result = np.clip(result, self.min_price[rows], self.max_price[rows])
+        return result.item() if result.ndim == 0 else result
+
+    def quantize_amount(self, symbols, amounts, prices=None):
+        """
+        Miktarı stepSize katına aşağı yuvarla (bütçe aşılmaz), maxQty ile sınırla
+
+        minQty veya (fiyat verilirse) MIN_NOTIONAL altında kalan miktarlar 0.0 döner -
+        borsaya gönderilse reddedilecek emir hiç gönderilmez.
+
+        Args:
+            symbols (str | list): Sembol veya semboller
+            amounts (float | array): Coin cinsinden miktar(lar)
+            prices (float | array): Notional kontrolü için fiyat(lar)
+
+        Returns:
+            float | ndarray: Girdi ile aynı şekilde
+        """
+        rows = self.rows(symbols)
+        amounts = np.asarray(amounts, dtype='float64')
+        result = _quantize(amounts, self.step[rows], self.amount_decimals[rows], 'floor')
+        result = np.minimum(result, self.max_qty[rows])
+        tradable = result >= self.min_qty[rows]
+        if prices is not None:
+            tradable &= result * np.asarray(prices, dtype='float64') >= self.min_notional[rows] * (1 - EPSILON)
+        result = np.where(tradable & (result > 0), result, 0.0)
+        return result.item() if result.ndim == 0 else result
+
+    def min_amount(self, symbols, prices):
+        """Filtreleri geçen en küçük miktar (minQty ve MIN_NOTIONAL)"""
+        rows = self.rows(symbols)
+        prices = np.asarray(prices, dtype='float64')
+        needed = np.maximum(self.min_qty[rows], self.min_notional[rows] / prices)
+        result = _quantize(needed, self.step[rows], self.amount_decimals[rows], 'ceil')
+        return result.item() if result.ndim == 0 else result
+
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def get_market_filters(exchange, reload=False):
+    """
+    Exchange'in filtre tablosu (marketler yüklendiğinde bir kez kurulur)
+    Marketler yeniden yüklenirse (farklı markets nesnesi) tablo da yenilenir.
+    """
+    markets = exchange.markets or exchange.load_markets()
+    key = id(exchange)
+    with _tables_lock:
+        cached = _tables.get(key)
+        if reload or cached is None or cached[0] is not markets:
+            cached = (markets, MarketFilters(markets))
+            _tables[key] = cached
+        return cached[1]
@@ -0,0 +1,476 @@
+"""
+Olay tabanlı emir takibi - check_order_status (fetch_order) sorgulaması yerine
+
+- Emir/işlem defteri bellekte, clientOrderId ile tutulur (borsa order id'si ile de bulunur)
+- Güncellemeler Binance futures user-data stream'inden gelir (ORDER_TRADE_UPDATE,
+  ACCOUNT_UPDATE); canlıda ccxt.pro watch_orders, simülasyonda SimExchange.subscribe_user_data
+- SL veya TP dolunca aynı gruptaki diğer bacak, pozisyon kapanınca o sembolün açık
+  reduce-only emirleri iptal edilir (yetim emir kalmaz). Sadece bu takipçinin register
+  ettiği emirler iptal edilir; çok süreçli taramada diğer süreçlerin SL/TP'sine dokunulmaz
+- Akış koparsa veya olay kaçarsa reconcile() tek fetch_open_orders + fetch_positions ile
+  defteri borsayla eşitler; sadece defterde açık görünüp borsada olmayan emirler için
+  fetch_order atılır
+
+Kullanım:
+    tracker = get_order_tracker(exchange)
+    tracker.start()
+    status = tracker.status(client_order_id)   # 'open', 'closed', 'canceled', 'expired'
+"""
+import os
+import time
+import threading
+import itertools
+from Trade.trade_settings import TRADE_SETTINGS
+
+# Binance user-data stream 'X' alanı -> ccxt durumu
+ORDER_STATUSES = {
+    'NEW': 'open',
+    'PARTIALLY_FILLED': 'open',
+    'FILLED': 'closed',
+    'CANCELED': 'canceled',
+    'EXPIRED': 'expired',
+    'EXPIRED_IN_MATCH': 'expired',
+    'REJECTED': 'rejected',
+}
+
+# Pozisyon bacakları (clientOrderId soneki)
+LEGS = {'entry': 'e', 'stop_loss': 's', 'take_profit': 't'}
+
+# Binance newClientOrderId: ^[\.A-Z\:/a-z0-9_-]{1,36}$
+CLIENT_ID_PREFIX = 'bp'
+
+_BASE36 = '0123456789abcdefghijklmnopqrstuvwxyz'
+_sequence = itertools.count(1)
+
+
+def _base36(value):
+    text = ''
+    while True:
+        value, digit = divmod(value, 36)
+        text = _BASE36[digit] + text
+        if not value:
+            return text
+
+
+def new_order_group():
+    """
+    Pozisyon için benzersiz grup id'si (zaman + süreç + sayaç)
+
+    Çok süreçli taramada (sharded_scan) aynı milisaniyede açılan pozisyonlar çakışmaz.
+    """
+    return (f"{CLIENT_ID_PREFIX}{_base36(int(time.time() * 1000))}"
+            f"{_base36(os.getpid() % 1296):0>2}{_base36(next(_sequence))}")
+
+
+def client_order_ids(group=None):
+    """Grubun bacak id'leri: {'entry': 'bp...-e', 'stop_loss': 'bp...-s', 'take_profit': 'bp...-t'}"""
+    group = group or new_order_group()
+    return {leg: f"{group}-{suffix}" for leg, suffix in LEGS.items()}
+
+
+def split_client_order_id(client_id):
+    """'bp...-s' -> ('bp...', 'stop_loss'); bu modülün üretmediği id'ler için (None, None)"""
+    if not client_id or not client_id.startswith(CLIENT_ID_PREFIX) or '-' not in client_id:
+        return None, None
+    group, suffix = client_id.rsplit('-', 1)
+    for leg, leg_suffix in LEGS.items():
+        if suffix == leg_suffix:
+            return group, leg
+    return None, None
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _market_id(exchange, symbol):
+    """'BTC/USDT:USDT' veya 'BTCUSDT' -> 'BTCUSDT'"""
+    try:
+        return exchange.market(symbol)['id']
+    except Exception:
+        return symbol.split(':')[0].replace('/', '')
+
+
+class OrderTracker:
+    """
+    Bellekteki emir/işlem defteri
+
+    Args:
+        exchange: ccxt.binance veya SimExchange
+        reconcile_seconds (float): Periyodik toplu eşitleme aralığı
+        cancel_orphans (bool): Kapanan pozisyonun kalan SL/TP emirleri iptal edilsin mi
+    """
+    def __init__(self, exchange, reconcile_seconds=None, cancel_orphans=None):
+        self.exchange = exchange
+        self.reconcile_seconds = (TRADE_SETTINGS['ORDER_RECONCILE_SECONDS']
+                                  if reconcile_seconds is None else reconcile_seconds)
+        self.cancel_orphans = (TRADE_SETTINGS['CANCEL_ORPHAN_ORDERS']
+                               if cancel_orphans is None else cancel_orphans)
+        self.orders = {}       # clientOrderId -> emir
+        self.by_id = {}        # borsa order id -> clientOrderId
+        self.fills = {}        # clientOrderId -> [işlem]
+        self.positions = {}    # market id -> işaretli miktar
+        self._lock = threading.RLock()
+        self._stream = None
+        self._last_reconcile = 0.0
+        self._reconcile_requested = False
+        self.stats = {'events': 0, 'stale_events': 0, 'reconciles': 0, 'missed': 0,
+                      'adopted': 0, 'orphans_canceled': 0}
+
+    # ------------------------------------------------------------------
+    # Defter
+    # ------------------------------------------------------------------
+    def register(self, order, leg=None):
+        """create_order sonucunu deftere ekle (olay emirden önce gelmiş olabilir)"""
+        entry = self._apply({
+            'client_id': order.get('clientOrderId'),
+            'id': str(order['id']),
+            'symbol': _market_id(self.exchange, order['symbol']),
+            'side': order.get('side'),
+            'type': order.get('type'),
+            'amount': _float(order.get('amount')),
+            'filled': _float(order.get('filled')),
+            'average': _float(order.get('average')),
+            'stop_price': _float(order.get('stopPrice') or order.get('triggerPrice')),
+            'reduce_only': bool(order.get('reduceOnly')),
+            'status': order.get('status') or 'open',
+            'time': order.get('lastTradeTimestamp') or order.get('timestamp') or 0,
+        })
+        if leg and entry is not None:
+            entry['leg'] = leg
+            # Bu süreçte açılan emir - yetim iptali sadece bunlara uygulanır
+            entry['own'] = True
+        return entry
+
+    def _apply(self, update):
+        """Güncellemeyi deftere işle (eski tarihli güncellemeler statüyü geri almaz)"""
+        client_id = update['client_id'] or update['id']
+        with self._lock:
+            client_id = self.by_id.get(update['id'], client_id)
+            entry = self.orders.get(client_id)
+            if entry is None:
+                group, leg = split_client_order_id(client_id)
+                entry = dict(update, client_id=client_id, group=group, leg=leg)
+                self.orders[client_id] = entry
+                self.by_id[update['id']] = client_id
+                return entry
+            if update['time'] < entry['time'] or (entry['status'] != 'open' and update['status'] == 'open'):
+                self.stats['stale_events'] += 1
+                return entry
+            for key, value in update.items():
+                # Olaylarda olmayan alanlar (0/None) defterdeki değeri silmez
+                if key in ('status', 'time') or (key != 'client_id' and value not in (None, 0.0)):
+                    entry[key] = value
+            return entry
+
+    def on_event(self, event):
+        """Binance user-data stream olayı (ORDER_TRADE_UPDATE / ACCOUNT_UPDATE)"""
+        self.stats['events'] += 1
+        if event.get('e') == 'ACCOUNT_UPDATE':
+            for position in event.get('a', {}).get('P', []):
+                self._on_position(position['s'], _float(position['pa']))
+            return
+        if event.get('e') != 'ORDER_TRADE_UPDATE':
+            return
+        o = event['o']
+        entry = self._apply({
+            'client_id': o['c'],
+            'id': str(o['i']),
+            'symbol': o['s'],
+            'side': o['S'].lower(),
+            'type': o['o'],
+            'amount': _float(o['q']),
+            'filled': _float(o['z']),
+            'average': _float(o['ap']),
+            'stop_price': _float(o['sp']),
+            'reduce_only': bool(o.get('R')),
+            'status': ORDER_STATUSES.get(o['X'], o['X'].lower()),
+            'time': o.get('T') or event.get('E', 0),
+        })
+        if o['x'] == 'TRADE':
+            with self._lock:
+                self.fills.setdefault(entry['client_id'], []).append({
+                    'trade_id': o.get('t'),
+                    'amount': _float(o['l']),
+                    'price': _float(o['L']),
+                    'time': o.get('T'),
+                    'realized_pnl': _float(o.get('rp')),
+                })
+        self._after_update(entry)
+
+    def on_order(self, order):
+        """ccxt birleşik emir dict'i (watch_orders, fetch_open_orders, fetch_order)"""
+        self.stats['events'] += 1
+        return self._ingest(order)
+
+    def _ingest(self, order):
+        entry = self.register(order)
+        self._after_update(entry)
+        return entry
+
+    def _after_update(self, entry):
+        # SL veya TP doldu: aynı pozisyonun diğer koruma bacağı yetim kalır
+        if entry['status'] == 'closed' and entry['leg'] in ('stop_loss', 'take_profit'):
+            self._cancel_orphans(entry['symbol'], group=entry['group'], exclude=entry['client_id'])
+
+    def _on_position(self, symbol, amount):
+        with self._lock:
+            self.positions[symbol] = amount
+        if amount == 0:
+            self._cancel_orphans(symbol)
+
+    def _cancel_orphans(self, symbol, group=None, exclude=None):
+        """Sembolün (veya grubun) bu takipçinin açtığı açık reduce-only emirlerini iptal et"""
+        if not self.cancel_orphans:
+            return []
+        with self._lock:
+            orphans = [
+                entry for entry in self.orders.values()
+                if entry['status'] == 'open' and entry['reduce_only'] and entry['symbol'] == symbol
+                and entry.get('own')
+                and entry['client_id'] != exclude and (group is None or entry['group'] == group)
+            ]
+        canceled = []
+        for entry in orphans:
+            try:
+                self.exchange.cancel_order(entry['id'], entry['symbol'])
+                print(f"🧹 {symbol} yetim {entry['leg'] or entry['type']} emri iptal edildi ({entry['client_id']})")
+            except Exception as e:
+                # Aynı anda dolmuş veya zaten iptal edilmiş olabilir - reconcile netleştirir
+                print(f"⚠️ {symbol} yetim emir iptal edilemedi: {str(e)}")
+                self._reconcile_requested = True
+                continue
+            with self._lock:
+                if entry['status'] == 'open':
+                    entry['status'] = 'canceled'
+            self.stats['orphans_canceled'] += 1
+            canceled.append(entry['client_id'])
+        return canceled
+
+    # ------------------------------------------------------------------
+    # Sorgular
+    # ------------------------------------------------------------------
+    def get(self, key):
+        """clientOrderId veya borsa order id'si ile emir"""
+        with self._lock:
+            entry = self.orders.get(key)
+            if entry is None:
+                entry = self.orders.get(self.by_id.get(str(key)))
+            return dict(entry) if entry else None
+
+    def status(self, key):
+        entry = self.get(key)
+        return entry['status'] if entry else None
+
+    def group(self, group):
+        """Pozisyonun bacakları: {'entry': emir, 'stop_loss': emir, 'take_profit': emir}"""
+        with self._lock:
+            return {entry['leg']: dict(entry) for entry in self.orders.values() if entry['group'] == group}
+
+    def open_orders(self, symbol=None):
+        with self._lock:
+            return [dict(entry) for entry in self.orders.values()
+                    if entry['status'] == 'open' and (symbol is None or entry['symbol'] == symbol)]
+
+    # ------------------------------------------------------------------
+    # Toplu eşitleme
+    # ------------------------------------------------------------------
+    def reconcile(self):
+        """
+        Defteri borsayla eşitle
+
+        Pozisyonlar açık emirlerden sonra istenir: arada başka süreç pozisyon + SL/TP
+        açarsa pozisyon da görünür ve emirleri yetim sanılıp iptal edilmez.
+
+        Returns:
+            dict: Kaçırılan, sahiplenilen ve iptal edilen emir sayıları
+        """
+        # Binance tüm semboller için açık emirleri tek istekte verir (ağırlık 40)
+        self.exchange.options['warnOnFetchOpenOrdersWithoutSymbol'] = False
+        open_orders = self.exchange.fetch_open_orders()
+        positions = self.exchange.fetch_positions()
+
+        canceled_before = self.stats['orphans_canceled']
+        live_ids = set()
+        adopted = 0
+        for order in open_orders:
+            live_ids.add(str(order['id']))
+            if self.get(order['id']) is None:
+                adopted += 1
+            self._ingest(order)
+
+        # Defterde açık ama borsada açık değil: olay kaçmış, son durumu tek tek sor
+        missed = [entry for entry in self.open_orders() if entry['id'] not in live_ids]
+        for entry in missed:
+            try:
+                self._ingest(self.exchange.fetch_order(entry['id'], entry['symbol']))
+            except Exception as e:
+                print(f"⚠️ {entry['symbol']} emir durumu alınamadı: {str(e)}")
+
+        with self._lock:
+            self.positions = {}
+            for position in positions:
+                info = position.get('info') or {}
+                symbol = info.get('symbol') or _market_id(self.exchange, position['symbol'])
+                self.positions[symbol] = _float(info.get('positionAmt', position.get('contracts')))
+            orphan_symbols = {entry['symbol'] for entry in self.open_orders()
+                              if entry['reduce_only'] and not self.positions.get(entry['symbol'])}
+        for symbol in orphan_symbols:
+            self._cancel_orphans(symbol)
+        canceled = self.stats['orphans_canceled'] - canceled_before
+
+        self.stats['reconciles'] += 1
+        self.stats['missed'] += len(missed)
+        self.stats['adopted'] += adopted
+        self._last_reconcile = time.time()
+        self._reconcile_requested = False
+        return {'open': len(open_orders), 'missed': len(missed), 'adopted': adopted, 'canceled': canceled}
+
+    def request_reconcile(self):
+        """Akış koptu veya iptal başarısız - bir sonraki maybe_reconcile'da eşitle"""
+        self._reconcile_requested = True
+
+    def maybe_reconcile(self):
+        """Süre dolduysa veya istendiyse reconcile (döngüden her turda çağrılır)"""
+        if not self._reconcile_requested and time.time() - self._last_reconcile < self.reconcile_seconds:
+            return None
+        try:
+            result = self.reconcile()
+        except Exception as e:
+            print(f"⚠️ Emir eşitleme hatası: {str(e)}")
+            return None
+        if result['missed'] or result['adopted'] or result['canceled']:
+            print(f"🔁 Emir eşitleme: {result['missed']} kaçırılan, {result['adopted']} bilinmeyen, "
+                  f"{result['canceled']} yetim iptal")
+        return result
+
+    # ------------------------------------------------------------------
+    # Checkpoint
+    # ------------------------------------------------------------------
+    def snapshot(self):
+        """Defterin JSON'a yazılabilir kopyası (yeniden başlatmada restore ile yüklenir)"""
+        with self._lock:
+            return {
+                'orders': [dict(entry) for entry in self.orders.values()],
+                'fills': {client_id: list(fills) for client_id, fills in self.fills.items()},
+                'positions': dict(self.positions),
+            }
+
+    def restore(self, state):
+        """
+        Kaydedilmiş defteri yükle - akıştan gelmiş kayıtların üzerine yazılmaz
+
+        Kapalıyken kaçan olaylar start()'ın istediği ilk reconcile'da netleşir.
+        """
+        with self._lock:
+            for entry in state.get('orders', []):
+                client_id = entry['client_id']
+                if client_id in self.orders:
+                    continue
+                self.orders[client_id] = dict(entry)
+                self.by_id[entry['id']] = client_id
+            for client_id, fills in state.get('fills', {}).items():
+                self.fills.setdefault(client_id, list(fills))
+            if not self.positions:
+                self.positions = dict(state.get('positions', {}))
+        return len(state.get('orders', []))
+
+    # ------------------------------------------------------------------
+    # Akış
+    # ------------------------------------------------------------------
+    def start(self):
+        """User-data stream'e bağlan (simülasyonda doğrudan, canlıda ccxt.pro ile arka planda)"""
+        if self._stream is not None:
+            return
+        if hasattr(self.exchange, 'subscribe_user_data'):
+            self.exchange.subscribe_user_data(self.on_event)
+            self._stream = self.exchange
+        else:
+            self._stream = UserDataStream(self)
+            self._stream.start()
+        # Başlangıçta mevcut emirler ve pozisyonlar deftere alınır
+        self.request_reconcile()
+        print("📡 Emir takibi başladı (user-data stream)")
+
+    def stop(self):
+        if self._stream is self.exchange:
+            self.exchange.unsubscribe_user_data(self.on_event)
+        elif self._stream is not None:
+            self._stream.stop()
+        self._stream = None
+
+    def report(self):
+        with self._lock:
+            open_count = sum(1 for entry in self.orders.values() if entry['status'] == 'open')
+            total = len(self.orders)
+        s = self.stats
+        print(f"📒 Emir defteri: {total} emir ({open_count} açık), {s['events']} olay, "
+              f"{s['reconciles']} eşitleme ({s['missed']} kaçırılan), {s['orphans_canceled']} yetim iptal")
+
+
+class UserDataStream(threading.Thread):
+    """
+    Binance futures user-data stream (ccxt.pro watch_orders) - arka plan thread'i
+
+    listenKey oluşturma ve 30 dakikalık yenileme ccxt.pro tarafından yapılır. Bağlantı
+    koparsa yeniden bağlanılır ve arada kaçan olaylar için eşitleme istenir.
+    """
+    def __init__(self, tracker, retry_seconds=5):
+        super().__init__(name='user-data-stream', daemon=True)
+        self.tracker = tracker
+        self.retry_seconds = retry_seconds
+        self._stop_event = threading.Event()
+
+    def _client(self):
+        import ccxt.pro as ccxtpro
+        exchange = self.tracker.exchange
+        client = ccxtpro.binanceusdm({
+            'apiKey': exchange.apiKey,
+            'secret': exchange.secret,
+            'options': {'defaultType': 'future'},
+        })
+        urls = getattr(exchange, 'urls', {})
+        if urls.get('test') and urls.get('api') == urls.get('test'):
+            client.set_sandbox_mode(True)
+        return client
+
+    def run(self):
+        import asyncio
+        asyncio.run(self._watch())
+
+    async def _watch(self):
+        import asyncio
+        client = self._client()
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    orders = await client.watch_orders()
+                    for order in orders:
+                        self.tracker.on_order(order)
+                except Exception as e:
+                    print(f"⚠️ User-data stream hatası: {str(e)} - yeniden bağlanılıyor")
+                    self.tracker.request_reconcile()
+                    await asyncio.sleep(self.retry_seconds)
+        finally:
+            await client.close()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+
+def get_order_tracker(exchange, create=True):
+    """Exchange'in emir takipçisi (create=False ise yoksa None)"""
+    key = id(exchange)
+    with _trackers_lock:
+        tracker = _trackers.get(key)
+        if tracker is None and create:
+            tracker = OrderTracker(exchange)
+            _trackers[key] = tracker
+        return tracker
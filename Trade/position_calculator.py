@@ -1,3 +1,7 @@
+from core.lazy_import import lazy_import
+np = lazy_import('numpy')
+
+
 class PositionCalculator:
     def __init__(self, leverage=10):
         self.leverage = leverage
@@ -65,6 +69,76 @@ class PositionCalculator:
         risk = abs(entry_price - sl_price) * position_size
         return risk
 
+    # ------------------------------------------------------------------
+    # Toplu (vektörel) hesaplamalar - backtest ve simülasyonlar için
+    # Sonuçlar tekil fonksiyonlarla bit bit aynıdır (aynı işlem sırası)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _long_mask(sides):
+        """'LONG'/'SHORT' (veya +1/-1, True/False) -> LONG maskesi (tekil versiyondaki gibi 'LONG' dışı SHORT)"""
+        sides = np.asarray(sides)
+        if sides.dtype.kind in 'USO':
+            return sides == 'LONG'
+        if sides.dtype.kind == 'b':
+            return sides
+        return sides > 0
+
+    def calculate_tp_sl_batch(self, entry_prices, sides, sl_percent=1.0, tp_percent=1.5):
+        """
+        calculate_tp_sl'nin dizi versiyonu (karışık LONG/SHORT)
+
+        Args:
+            entry_prices (array): Giriş fiyatları
+            sides (array): 'LONG'/'SHORT' dizisi (veya +1/-1, True=LONG)
+            sl_percent, tp_percent (float | array): Kaldıraçsız yüzdeler
+
+        Returns:
+            dict: calculate_tp_sl ile aynı anahtarlar, değerler dizi
+        """
+        entry_prices = np.asarray(entry_prices, dtype='float64')
+        sl_percent = np.broadcast_to(np.asarray(sl_percent, dtype='float64'), entry_prices.shape)
+        tp_percent = np.broadcast_to(np.asarray(tp_percent, dtype='float64'), entry_prices.shape)
+        is_long = np.broadcast_to(self._long_mask(sides), entry_prices.shape)
+
+        sl_fraction = sl_percent / 100
+        tp_fraction = tp_percent / 100
+        sl_price = np.where(is_long, entry_prices * (1 - sl_fraction), entry_prices * (1 + sl_fraction))
+        tp_price = np.where(is_long, entry_prices * (1 + tp_fraction), entry_prices * (1 - tp_fraction))
+
+        return {
+            'entry_price': entry_prices,
+            'sl_price': sl_price,
+            'tp_price': tp_price,
+            'sl_percent': sl_percent,
+            'tp_percent': tp_percent,
+            'leveraged_sl': sl_percent * self.leverage,
+            'leveraged_tp': tp_percent * self.leverage
+        }
+
+    def calculate_position_size_batch(self, usdt_amounts, entry_prices):
+        """calculate_position_size'ın dizi versiyonu"""
+        usdt_amounts = np.asarray(usdt_amounts, dtype='float64')
+        entry_prices = np.asarray(entry_prices, dtype='float64')
+        return (usdt_amounts * self.leverage) / entry_prices
+
+    def calculate_risk_batch(self, position_sizes, entry_prices, sl_prices):
+        """calculate_risk'in dizi versiyonu"""
+        entry_prices = np.asarray(entry_prices, dtype='float64')
+        sl_prices = np.asarray(sl_prices, dtype='float64')
+        return np.abs(entry_prices - sl_prices) * np.asarray(position_sizes, dtype='float64')
+
+    def calculate_batch(self, entry_prices, sides, usdt_amounts, sl_percent=1.0, tp_percent=1.5):
+        """
+        Aday dizisi için giriş, SL, TP, kaldıraçlı yüzdeler, miktar ve risk tek seferde
+
+        Returns:
+            dict: calculate_tp_sl_batch anahtarları + 'position_size', 'risk'
+        """
+        result = self.calculate_tp_sl_batch(entry_prices, sides, sl_percent, tp_percent)
+        result['position_size'] = self.calculate_position_size_batch(usdt_amounts, result['entry_price'])
+        result['risk'] = self.calculate_risk_batch(result['position_size'], result['entry_price'], result['sl_price'])
+        return result
+
     def print_position_info(self, calc_result, position_size, side):
         """
         Pozisyon bilgilerini yazdır
@@ -1,11 +1,12 @@
 # trade_executor.py
 
-import ccxt
 import json
 import os
 from datetime import datetime
 from .position_calculator import PositionCalculator
 from .trade_settings import TRADE_SETTINGS, ORDER_TYPES, TRADE_SIDES
+from .order_tracker import get_order_tracker
+from core.exchange_factory import get_exchange
 
 class TradeExecutor:
     def __init__(self):
@@ -25,22 +26,8 @@ class TradeExecutor:
             return None
 
     def initialize_exchange(self):
-        """Binance Futures bağlantısını başlat"""
-        exchange = ccxt.binance({
-            'apiKey': self.config['api_key'],
-            'secret': self.config['api_secret'],
-            'enableRateLimit': True,
-            'options': {
-                'defaultType': 'future',
-                'adjustForTimeDifference': True
-            }
-        })
-        
-        if self.config.get('testnet', False):
-            exchange.set_sandbox_mode(True)
-            print("🔧 TESTNET modu aktif!")
-        
-        return exchange
+        """Binance Futures bağlantısını başlat (süreçteki diğer modüllerle paylaşılır)"""
+        return get_exchange(self.config, market_type='future')
 
     def execute_trade(self, signal_data):
         """Sinyal geldiğinde işlemi aç"""
@@ -107,7 +94,12 @@ class TradeExecutor:
             return False
 
     def check_order_status(self, symbol, order_id):
-        """Emir durumunu kontrol et"""
+        """Emir durumunu kontrol et (emir takibi açıksa defterden, istek atılmadan)"""
+        tracker = get_order_tracker(self.exchange, create=False)
+        if tracker is not None:
+            status = tracker.status(order_id)
+            if status is not None:
+                return status
         try:
             order = self.exchange.fetch_order(order_id, symbol)
             return order['status']
@@ -15,9 +15,59 @@ TRADE_SETTINGS = {
     'MAX_OPEN_POSITIONS': 2,     # Maksimum 2 açık pozisyon
     'MIN_VOLUME': 1000000,       # Minimum 24s hacim (USDT)
     
+    # Tarama hunisi (ön filtre)
+    'PREFILTER_MIN_QUOTE_VOLUME': 0,  # Son mumun minimum USDT hacmi (0 = kapalı)
+    
+    # Tarama modu
+    'SCAN_MODE': 'first',        # 'first': ilk sinyalde işlem aç, 'ranked': tüm coinleri skorla ve sırala
+    'SCAN_WORKERS': 8,           # 'ranked' modda paralel değerlendirme sayısı
+    'RANK_DEADLINE_SECONDS': 60, # Mum kapanışından sonra işlem açmak için son süre (saniye)
+    
     # Market türü
     'MARKET_TYPE': 'future',    # Futures piyasası
     
+    # Market bilgisi önbelleği
+    'MARKETS_CACHE_TTL': 6 * 3600,   # exchangeInfo disk önbelleği geçerlilik süresi (saniye)
+    
+    # Sinyal günlüğü (data/journal.sqlite)
+    'JOURNAL_ENABLED': True,     # Değerlendirilen adaylar ve işlem sonuçları kaydedilir
+    
+    # Geçmiş veri (lookback planlayıcı)
+    'LOOKBACK_TOLERANCE': 0.01,  # İndikatörlerin son değerinde kabul edilen göreli ısınma hatası
+    
+    # Bellek
+    'LOW_MEMORY_MODE': False,    # İndikatörler float32, durum kolonları int8; gereksiz df kopyaları yapılmaz
+    
+    # Aktif mumda ön sinyal (kapanışta sadece onay/iptal)
+    'PROVISIONAL_SIGNALS': False,     # Aktif mum fiyat değiştikçe RangeFilter artımlı değerlendirilir
+    'PROVISIONAL_POLL_SECONDS': 5,    # fetch_tickers aralığı (saniye, ağırlık 40)
+    'PROVISIONAL_REFRESH_SECONDS': 60,  # Ön sinyalin skor/validasyonu en fazla bu kadar eski kalır
+    
+    # Emir takibi (user-data stream)
+    'ORDER_TRACKING': False,          # Emir durumları WebSocket olaylarıyla bellekte tutulur (fetch_order yerine)
+    'ORDER_RECONCILE_SECONDS': 300,   # Defterin borsayla toplu eşitlenme aralığı (saniye)
+    'CANCEL_ORPHAN_ORDERS': False,    # SL/TP dolunca veya pozisyon kapanınca kalan reduce-only emirler iptal edilir (ORDER_TRACKING gerekir)
+    
+    # Profil (çalışırken SIGUSR1 veya data/profile_scan dosyası ile açılır)
+    'PROFILE_MODE': 'sampling',       # 'sampling' (düşük ek yük) veya 'deterministic' (cProfile)
+    'PROFILE_PASSES': 1,              # Açıldıktan sonra profillenen tarama turu sayısı
+    'PROFILE_INTERVAL_MS': 5,         # sampling modunda örnekleme aralığı (ms)
+    
+    # Tarama katmanları (sakin coinler her mumda tam değerlendirilmez)
+    'SCAN_TIERS': False,              # Soğuk coinler tek fetch_tickers ile kontrol edilir, uyanınca taranır (sinyal kaçırabilir)
+    'TIER_COLD_STEPS': 4.0,           # RangeFilter'a bu kadar tipik mum hareketinden uzak coin soğur (düşürmek tasarrufu artırır, sinyal kaçırabilir)
+    'TIER_WAKE_STEPS': 2.0,           # Soğuk coin fiyatı bu uzaklığa inince uyanır (sıkışmada soğuma eşiği)
+    'TIER_MAX_SKIP': 12,              # Soğuk coin en fazla bu kadar mum atlanır (12 = 1 saat)
+    
+    # Korelasyon filtresi (açık pozisyonlarla aynı yönde yüksek korelasyonlu coin açılmaz)
+    'MAX_CORRELATION': 0,             # Yön düzeltilmiş maksimum getiri korelasyonu (0 = kapalı, örn. 0.8)
+    'CORRELATION_WINDOW': 288,        # Korelasyon penceresi (5m mum, 288 = 24 saat)
+    'CORRELATION_MIN_BARS': 60,       # Korelasyon için gereken minimum ortak mum (azsa filtre uygulanmaz)
+    
+    # Sıcak yeniden başlatma (data/checkpoints)
+    'CHECKPOINT_ENABLED': True,       # Mum tamponları, katmanlar, emir defteri ve margin ayarları periyodik kaydedilir
+    'CHECKPOINT_SECONDS': 300,        # Kayıt aralığı (saniye)
+    
     # Zaman ayarları
     'POSITION_CHECK_INTERVAL': 5,    # Pozisyon kontrol aralığı (saniye)
     'ORDER_TIMEOUT': 120,            # Emir timeout süresi (2 dakika)
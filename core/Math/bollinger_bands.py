@@ -1,38 +1,67 @@
-import pandas as pd
-import numpy as np
+from core.lazy_import import lazy_import
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+
+# Düşük bellek modunda bb_position/bb_trend yerine int8 kodlar tutulur
+BB_POSITION_CODES = {'lower': -1, 'middle': 0, 'upper': 1}
+BB_TREND_CODES = {'down': -1, 'neutral': 0, 'up': 1}
+
+def bollinger_series(src, length=20, mult=2.0):
+    """Üst, orta ve alt bant serileri (4 ondalık hassasiyet)"""
+    # Orta bant (Basis) - SMA20
+    basis = src.rolling(window=length, min_periods=length).mean()
+    
+    # Standart sapma (TradingView ile aynı)
+    dev = mult * src.rolling(window=length, min_periods=length).std(ddof=1)
+    
+    # Üst ve alt bantlar
+    upper = basis + dev
+    lower = basis - dev
+    
+    return upper.round(4), basis.round(4), lower.round(4)
+
+def bb_position_series(close, upper, lower):
+    """Fiyatın bant pozisyonu ('upper', 'middle', 'lower')"""
+    position = pd.Series('middle', index=close.index)
+    position[close >= upper] = 'upper'
+    position[close <= lower] = 'lower'
+    return position
+
+def bb_trend_series(close, basis):
+    """Orta bant kesişim yönü ('up', 'down', 'neutral')"""
+    trend = pd.Series('neutral', index=close.index)
+    trend[(close > basis) & (close.shift(1) <= basis)] = 'up'
+    trend[(close < basis) & (close.shift(1) >= basis)] = 'down'
+    return trend
+
+def bb_position_codes(close, upper, lower):
+    """bb_position_series'in int8 karşılığı (BB_POSITION_CODES)"""
+    codes = np.zeros(len(close), dtype='int8')
+    codes[(close >= upper).to_numpy()] = BB_POSITION_CODES['upper']
+    codes[(close <= lower).to_numpy()] = BB_POSITION_CODES['lower']
+    return pd.Series(codes, index=close.index)
+
+def bb_trend_codes(close, basis):
+    """bb_trend_series'in int8 karşılığı (BB_TREND_CODES)"""
+    prev = close.shift(1)
+    codes = np.zeros(len(close), dtype='int8')
+    codes[((close > basis) & (prev <= basis)).to_numpy()] = BB_TREND_CODES['up']
+    codes[((close < basis) & (prev >= basis)).to_numpy()] = BB_TREND_CODES['down']
+    return pd.Series(codes, index=close.index)
 
 def calculate_bollinger_bands(df, length=20, mult=2.0):
     """
     Bollinger Bands hesaplama (TradingView ile aynı)
     """
     try:
-        # Kaynak fiyat (close)
-        src = df['close']
-        
-        # Orta bant (Basis) - SMA20
-        basis = src.rolling(window=length, min_periods=length).mean()
-        
-        # Standart sapma (TradingView ile aynı)
-        dev = mult * src.rolling(window=length, min_periods=length).std(ddof=1)
-        
-        # Üst ve alt bantlar
-        upper = basis + dev
-        lower = basis - dev
-        
         # DataFrame'e ekle (4 ondalık hassasiyet)
-        df['bb_upper'] = upper.round(4)
-        df['bb_basis'] = basis.round(4)
-        df['bb_lower'] = lower.round(4)
+        df['bb_upper'], df['bb_basis'], df['bb_lower'] = bollinger_series(df['close'], length, mult)
         
         # Fiyatın bant pozisyonunu belirle
-        df['bb_position'] = 'middle'
-        df.loc[df['close'] >= df['bb_upper'], 'bb_position'] = 'upper'
-        df.loc[df['close'] <= df['bb_lower'], 'bb_position'] = 'lower'
+        df['bb_position'] = bb_position_series(df['close'], df['bb_upper'], df['bb_lower'])
         
         # Trend yönünü belirle
-        df['bb_trend'] = 'neutral'
-        df.loc[(df['close'] > df['bb_basis']) & (df['close'].shift(1) <= df['bb_basis']), 'bb_trend'] = 'up'
-        df.loc[(df['close'] < df['bb_basis']) & (df['close'].shift(1) >= df['bb_basis']), 'bb_trend'] = 'down'
+        df['bb_trend'] = bb_trend_series(df['close'], df['bb_basis'])
         
         return df
         
@@ -1,5 +1,14 @@
-import numpy as np
-import pandas as pd
+from core.lazy_import import lazy_import
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Konsolidasyon sebep kodları (analyze_series 'reason' kolonu)
+REASON_TREND = 0            # Trend bölgesi
+REASON_PRICE_RANGE = 1      # Fiyat dar bantta sıkışmış
+REASON_BB_WIDTH = 2         # BB bantları çok dar
+REASON_EMA_RANGE = 3        # EMA'lar sıkışmış
+REASON_LOW_VOLATILITY = 4   # Düşük volatilite (ATR)
+REASON_NET_TREND = 5        # Net trend mevcut
 
 class ConsolidationAnalyzer:
     def __init__(self):
@@ -7,10 +16,69 @@ class ConsolidationAnalyzer:
         self.price_threshold = 0.02  # %2'ye çıkaralım (şu an %1.5)
         self.bb_width_threshold = 0.015  # %1.5'e çıkaralım
         self.signal_density_threshold = 3  # Bu iyi
-        
+
+    def analyze_series(self, df):
+        """
+        Tüm mumlar için vektörel konsolidasyon analizi (tek geçiş, rolling pencereler)
+
+        df'de high/low/close, bb_upper/bb_lower/bb_basis ve ema_5..ema_34 olmalı.
+        Returns:
+            DataFrame: is_consolidation, reason (REASON_* kodu) ve metrik kolonları
+        """
+        window = self.window_size
+        close = df['close']
+
+        # 1. Fiyat Aralığı - son window mumun en yüksek/en düşük değeri
+        recent_high = df['high'].rolling(window, min_periods=1).max()
+        recent_low = df['low'].rolling(window, min_periods=1).min()
+        price_range = (recent_high - recent_low) / recent_low
+
+        # 2. Bollinger Bands Genişliği
+        bb_width = (df['bb_upper'] - df['bb_lower']) / df['bb_basis']
+
+        # 3. EMA Ribbon Sıkışması
+        emas = df[['ema_5', 'ema_8', 'ema_13', 'ema_21', 'ema_34']]
+        ema_min = emas.min(axis=1)
+        ema_range = (emas.max(axis=1) - ema_min) / ema_min
+
+        # 4. Volatilite (ATR varsa)
+        atr_ratio = df['atr'] / close if 'atr' in df.columns else None
+
+        # Trend yönü - son window kapanışın ortalama değişimi
+        steps = np.minimum(np.arange(len(df)), window - 1)
+        first_close = close.shift(window - 1).fillna(close.iloc[0] if len(df) else np.nan)
+        price_direction = (close - first_close) / pd.Series(steps, index=df.index).replace(0, np.nan)
+
+        # Sıra önemli: ilk sağlanan koşul sebebi belirler
+        conditions = [
+            price_range < self.price_threshold,
+            bb_width < self.bb_width_threshold,
+            ema_range < 0.01,  # %1'den az ayrışma
+        ]
+        reasons = [REASON_PRICE_RANGE, REASON_BB_WIDTH, REASON_EMA_RANGE]
+        if atr_ratio is not None:
+            conditions.append(atr_ratio < 0.001)  # %0.1'den az volatilite
+            reasons.append(REASON_LOW_VOLATILITY)
+        conditions.append(price_direction.abs() > 0.0002)  # Net trend varsa
+        reasons.append(REASON_NET_TREND)
+
+        reason = np.select(conditions, reasons, default=REASON_TREND).astype('int8')
+
+        result = pd.DataFrame({
+            'is_consolidation': (reason != REASON_TREND) & (reason != REASON_NET_TREND),
+            'reason': reason,
+            'price_range': price_range,
+            'bb_width': bb_width,
+            'ema_range': ema_range,
+            'price_direction': price_direction,
+        }, index=df.index)
+        if atr_ratio is not None:
+            result['atr_ratio'] = atr_ratio
+        return result
+
     def analyze(self, df):
         """
-        Konsolidasyon analizi yap
+        Konsolidasyon analizi yap (son mum - analyze_series'in son satırı)
         Returns:
             dict: {
                 'is_consolidation': bool,
@@ -36,72 +104,44 @@ class ConsolidationAnalyzer:
                     'reason': "BB hesaplaması eksik",
                     'metrics': {}
                 }
-            
-            result = {
-                'is_consolidation': False,
-                'reason': '',
-                'metrics': {}
-            }
-            
-            # 1. Fiyat Aralığı Kontrolü
-            recent_high = df['high'].tail(self.window_size).max()
-            recent_low = df['low'].tail(self.window_size).min()
-            price_range = (recent_high - recent_low) / recent_low
-            result['metrics']['price_range'] = price_range
-            
-            if price_range < self.price_threshold:
-                result['is_consolidation'] = True
-                result['reason'] = f"Fiyat dar bantta sıkışmış (%{price_range*100:.1f})"
-                return result
-            
-            # 2. Bollinger Bands Genişlik Kontrolü
-            bb_width = (df['bb_upper'].iloc[-1] - df['bb_lower'].iloc[-1]) / df['bb_basis'].iloc[-1]  # bb_middle -> bb_basis
-            result['metrics']['bb_width'] = bb_width
-            
-            if bb_width < self.bb_width_threshold:
-                result['is_consolidation'] = True
-                result['reason'] = f"BB bantları çok dar (%{bb_width*100:.1f})"
-                return result
-            
-            # 3. EMA Ribbon Sıkışma Kontrolü
-            ema_values = [
-                df['ema_5'].iloc[-1],
-                df['ema_8'].iloc[-1],
-                df['ema_13'].iloc[-1],
-                df['ema_21'].iloc[-1],
-                df['ema_34'].iloc[-1]
-            ]
-            
-            ema_range = (max(ema_values) - min(ema_values)) / min(ema_values)
-            result['metrics']['ema_range'] = ema_range
-            
-            if ema_range < 0.01:  # %1'den az ayrışma
-                result['is_consolidation'] = True
-                result['reason'] = f"EMA'lar sıkışmış (%{ema_range*100:.1f})"
-                return result
-            
-            # 4. Volatilite Kontrolü (ATR kullanarak)
-            if 'atr' in df.columns:
-                atr_ratio = df['atr'].iloc[-1] / df['close'].iloc[-1]
-                result['metrics']['atr_ratio'] = atr_ratio
-                
-                if atr_ratio < 0.001:  # %0.1'den az volatilite
-                    result['is_consolidation'] = True
-                    result['reason'] = f"Düşük volatilite (%{atr_ratio*100:.3f})"
-                    return result
-            
-            # Trend yönü kontrolü ekleyelim
-            price_direction = df['close'].tail(self.window_size).diff().mean()
-            if abs(price_direction) > 0.0002:  # Net trend varsa
+
+            # Son mum için son window satır yeterli
+            last = self.analyze_series(df.tail(self.window_size)).iloc[-1]
+            code = int(last['reason'])
+
+            if code == REASON_NET_TREND:
                 return {
                     'is_consolidation': False,
                     'reason': "Net trend mevcut",
-                    'metrics': {'price_direction': price_direction}
+                    'metrics': {'price_direction': last['price_direction']}
                 }
-                
-            result['reason'] = "Trend bölgesi"
-            return result
-            
+
+            # Sebebe kadar hesaplanan metrikler
+            metric_order = ['price_range', 'bb_width', 'ema_range']
+            if 'atr_ratio' in last.index:
+                metric_order.append('atr_ratio')
+            reached = {
+                REASON_PRICE_RANGE: 1,
+                REASON_BB_WIDTH: 2,
+                REASON_EMA_RANGE: 3,
+                REASON_LOW_VOLATILITY: 4,
+            }.get(code, len(metric_order))
+            metrics = {name: last[name] for name in metric_order[:reached]}
+
+            reasons = {
+                REASON_PRICE_RANGE: lambda: f"Fiyat dar bantta sıkışmış (%{last['price_range']*100:.1f})",
+                REASON_BB_WIDTH: lambda: f"BB bantları çok dar (%{last['bb_width']*100:.1f})",
+                REASON_EMA_RANGE: lambda: f"EMA'lar sıkışmış (%{last['ema_range']*100:.1f})",
+                REASON_LOW_VOLATILITY: lambda: f"Düşük volatilite (%{last['atr_ratio']*100:.3f})",
+                REASON_TREND: lambda: "Trend bölgesi",
+            }
+
+            return {
+                'is_consolidation': bool(last['is_consolidation']),
+                'reason': reasons[code](),
+                'metrics': metrics
+            }
+
         except Exception as e:
             print(f"❌ Konsolidasyon analizi hatası: {str(e)}")
-            return {'is_consolidation': True, 'reason': f"Hata: {str(e)}", 'metrics': {}} 
\ No newline at end of file
+            return {'is_consolidation': True, 'reason': f"Hata: {str(e)}", 'metrics': {}}
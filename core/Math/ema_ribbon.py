@@ -1,8 +1,11 @@
 """
 EMA Ribbon indikatörü - TradingView uyumlu
 """
-import pandas as pd
-import numpy as np
+from core.lazy_import import lazy_import
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+from core.Math.indicator_registry import registry
+from Trade.trade_settings import TRADE_SETTINGS
 
 def calculate_ema(series, period):
     """
@@ -12,21 +15,27 @@ def calculate_ema(series, period):
     ema = series.ewm(span=period, adjust=False).mean()
     return ema
 
-def calculate_ema_signals(df, periods=[5, 8, 13, 20, 50, 100, 200]):
+def calculate_ema_signals(df, periods=[5, 8, 13, 20, 50, 100, 200], copy=None):
     """
     TradingView uyumlu EMA Ribbon hesaplama
+
+    copy=None ise düşük bellek modunda df kopyalanmadan yerinde güncellenir
     """
     try:
-        # DataFrame'in derin kopyasını oluştur
-        df = df.copy(deep=True)
+        low_memory = TRADE_SETTINGS['LOW_MEMORY_MODE']
+        if copy is None:
+            copy = not low_memory
+        if copy:
+            # DataFrame'in derin kopyasını oluştur
+            df = df.copy(deep=True)
         
         # EMA'ları hesapla
-        for period in periods:
-            df[f'ema_{period}'] = df['close'].ewm(span=period, adjust=False).mean()
+        registry.compute(df, [f'ema_{period}' for period in periods])
         
-        # Signal sütununu başlangıçta oluştur
-        df['signal'] = 0
-        df['ema_trend'] = 0
+        # Signal sütununu başlangıçta oluştur (-1/0/1 - düşük bellekte int8)
+        state_dtype = 'int8' if low_memory else 'int64'
+        df['signal'] = np.zeros(len(df), dtype=state_dtype)
+        df['ema_trend'] = np.zeros(len(df), dtype=state_dtype)
         
         # Önceki 3 mum trend değişimi olmadığından emin ol
         for i in range(3, len(df)):
@@ -0,0 +1,341 @@
+"""
+İndikatör registry - her indikatör girdilerini ve çıktı kolonlarını bildirir.
+İstenen kolonlar bağımlılık grafiği (DAG) üzerinden çözülür, sadece istenenler
+hesaplanır ve (sembol, son mum) bazında hafızada tutulur.
+
+Düşük bellek modunda (TRADE_SETTINGS['LOW_MEMORY_MODE']) indikatörler float32,
+durum kolonları int8 olarak saklanır. bb_position/bb_trend metin kolonları
+yerine bb_position_code/bb_trend_code (int8) istenebilir.
+
+Kullanım:
+    from core.Math.indicator_registry import registry
+    df = registry.compute(df, ['rsi', 'stoch_rsi_k', 'ema_200'], symbol='BTC/USDT')
+"""
+import re
+import math
+import threading
+from collections import OrderedDict
+from core.lazy_import import lazy_import
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+from core.Math.rsi_indicator import rsi_series
+from core.Math.stoch_rsi import ewm_rsi_series, stoch_rsi_series
+from core.Math.bollinger_bands import (
+    bollinger_series, bb_position_series, bb_trend_series, bb_position_codes, bb_trend_codes
+)
+from core.Math.range_filter import RangeFilter
+from Trade.trade_settings import TRADE_SETTINGS
+
+# Ham mum kolonları - her zaman df'de bulunur
+BASE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# Binance futures klines tek istekte en fazla 1500 mum döndürür
+MAX_FETCH_LIMIT = 1500
+
+
+def ewm_warmup(alpha, tolerance):
+    """
+    Üstel ortalamada başlangıç değerinin etkisi (1-alpha)^n ile söner.
+    Etkinin tolerance altına inmesi için gereken mum sayısı: n >= ln(tol) / ln(1-alpha)
+    """
+    return math.ceil(math.log(tolerance) / math.log(1 - alpha))
+
+
+class Indicator:
+    """
+    Tek bir hesaplama düğümü
+
+    Args:
+        name (str): Düğüm adı
+        outputs (list): Ürettiği kolonlar
+        inputs (list): İhtiyaç duyduğu kolonlar (ham veya başka indikatör)
+        compute (callable): compute(cols) -> {kolon: Series}; cols girdileri içerir
+        warmup (int | callable): Girdiler hazır olduktan sonra son değerin oturması
+            için gereken mum sayısı; callable ise warmup(tolerance)
+    """
+    def __init__(self, name, outputs, inputs, compute, warmup=0):
+        self.name = name
+        self.outputs = list(outputs)
+        self.inputs = list(inputs)
+        self.compute = compute
+        self.warmup = warmup
+
+    def warmup_bars(self, tolerance):
+        if callable(self.warmup):
+            return self.warmup(tolerance)
+        return self.warmup
+
+    def __repr__(self):
+        return f"Indicator({self.name}: {self.inputs} -> {self.outputs})"
+
+
+def series_nbytes(series):
+    """Serinin veri boyutu (index hariç - aynı df'nin kolonları index'i paylaşır)"""
+    return int(series.memory_usage(index=False, deep=True))
+
+
+def frame_nbytes(df):
+    """DataFrame'in index dahil toplam boyutu"""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class IndicatorRegistry:
+    """
+    Args:
+        memo_per_symbol (int): Sembol başına hafızada tutulan mum sayısı
+        low_memory (bool): float çıktıları float32, küçük tamsayıları int8 sakla
+            (None ise TRADE_SETTINGS['LOW_MEMORY_MODE'])
+    """
+    def __init__(self, memo_per_symbol=4, low_memory=None):
+        if low_memory is None:
+            low_memory = TRADE_SETTINGS['LOW_MEMORY_MODE']
+        self.low_memory = low_memory
+        self._providers = {}
+        self._factories = []
+        self._memo = {}
+        self._memo_per_symbol = memo_per_symbol
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, indicator):
+        """İndikatörü kaydet - her çıktı kolonu tek bir düğüme ait olmalı"""
+        for column in indicator.outputs:
+            if column in self._providers:
+                raise ValueError(f"'{column}' kolonu zaten kayıtlı: {self._providers[column]}")
+            self._providers[column] = indicator
+        return indicator
+
+    def register_pattern(self, pattern, factory):
+        """Parametrik kolonlar için fabrika (örn. ema_(\\d+) -> EMA düğümü)"""
+        self._factories.append((re.compile(pattern), factory))
+
+    def provider(self, column):
+        """Kolonu üreten düğüm"""
+        indicator = self._providers.get(column)
+        if indicator is not None:
+            return indicator
+        for pattern, factory in self._factories:
+            match = pattern.fullmatch(column)
+            if match:
+                with self._lock:
+                    # Paralel taramada başka bir thread önce kaydetmiş olabilir
+                    if column in self._providers:
+                        return self._providers[column]
+                    return self.register(factory(*match.groups()))
+        raise KeyError(f"Bilinmeyen indikatör kolonu: {column}")
+
+    def plan(self, columns):
+        """İstenen kolonlar için topolojik sırada düğüm listesi"""
+        order = []
+        state = {}
+
+        def visit(column):
+            if column in BASE_COLUMNS:
+                return
+            indicator = self.provider(column)
+            mark = state.get(indicator.name)
+            if mark == 'done':
+                return
+            if mark == 'visiting':
+                raise ValueError(f"İndikatör bağımlılık döngüsü: {indicator.name}")
+            state[indicator.name] = 'visiting'
+            for dependency in indicator.inputs:
+                visit(dependency)
+            state[indicator.name] = 'done'
+            order.append(indicator)
+
+        for column in columns:
+            visit(column)
+        return order
+
+    def lookback(self, columns, tolerance=None):
+        """
+        İstenen kolonların son mum değeri için gereken minimum geçmiş (mum sayısı)
+
+        Zincirdeki her düğümün ısınması girdilerinin ısınmasına eklenir, en uzun yol alınır.
+
+        Args:
+            columns (list): İstenen kolonlar
+            tolerance (float): Sonsuz geçmişe göre kabul edilen göreli fark
+                (None ise TRADE_SETTINGS['LOOKBACK_TOLERANCE'])
+        """
+        if tolerance is None:
+            tolerance = TRADE_SETTINGS['LOOKBACK_TOLERANCE']
+        bars = {}
+        for indicator in self.plan(columns):
+            ready = max((bars.get(c, 1) for c in indicator.inputs), default=1)
+            for column in indicator.outputs:
+                bars[column] = ready + indicator.warmup_bars(tolerance)
+        needed = max((bars.get(c, 1) for c in columns), default=1)
+        return min(needed, MAX_FETCH_LIMIT)
+
+    def _memo_for(self, symbol, df):
+        """
+        (sembol, son mum) için hafıza
+        Uzunluk (EMA ısınması) ve son kapanış/hacim (aktif mum değişir) da anahtarda.
+        """
+        if symbol is None or df.empty:
+            return {}
+        key = (df.index[-1], len(df), float(df['close'].iloc[-1]), float(df['volume'].iloc[-1]))
+        with self._lock:
+            entries = self._memo.setdefault(symbol, OrderedDict())
+            if key in entries:
+                entries.move_to_end(key)
+            else:
+                entries[key] = {}
+                while len(entries) > self._memo_per_symbol:
+                    entries.popitem(last=False)
+            return entries[key]
+
+    def _compact(self, outputs):
+        """Düşük bellek modunda çıktıları küçült (hesaplama float64 yapılır, sonuç saklanır)"""
+        if not self.low_memory:
+            return outputs
+        compact = {}
+        for column, series in outputs.items():
+            kind = series.dtype.kind
+            if kind == 'f' and series.dtype.itemsize > 4:
+                series = series.astype('float32')
+            elif kind in 'iu' and series.dtype.itemsize > 1 and len(series) \
+                    and -128 <= series.min() and series.max() <= 127:
+                series = series.astype('int8')
+            compact[column] = series
+        return compact
+
+    def compute(self, df, columns, symbol=None):
+        """
+        İstenen kolonları (ve bağımlılıklarını) hesapla, df'ye sadece istenenleri ekle
+
+        Args:
+            df (DataFrame): OHLCV verisi
+            columns (list): İstenen kolonlar
+            symbol (str): Verilirse sonuçlar (sembol, son mum) için hafızada tutulur
+
+        Returns:
+            DataFrame: Aynı df, istenen kolonlar eklenmiş
+        """
+        memo = self._memo_for(symbol, df)
+        available = {}
+
+        for indicator in self.plan(columns):
+            if all(column in memo for column in indicator.outputs):
+                self.hits += 1
+                available.update({c: memo[c] for c in indicator.outputs})
+                continue
+
+            self.misses += 1
+            cols = {}
+            for column in indicator.inputs:
+                cols[column] = df[column] if column in BASE_COLUMNS else available[column]
+            outputs = self._compact(indicator.compute(cols))
+            available.update(outputs)
+            memo.update(outputs)
+
+        for column in columns:
+            if column not in BASE_COLUMNS:
+                df[column] = available[column]
+        return df
+
+    def memory_usage(self):
+        """
+        Hafızadaki indikatör serilerinin boyutu
+
+        Returns:
+            dict: {'symbols': sembol sayısı, 'bytes': toplam byte, 'per_symbol': ortalama byte}
+        """
+        with self._lock:
+            total = sum(
+                series_nbytes(series)
+                for entries in self._memo.values()
+                for memo in entries.values()
+                for series in memo.values()
+            )
+            symbols = len(self._memo)
+        return {'symbols': symbols, 'bytes': total, 'per_symbol': total / symbols if symbols else 0}
+
+    def clear(self, symbol=None):
+        """Hafızayı temizle"""
+        with self._lock:
+            if symbol is None:
+                self._memo.clear()
+            else:
+                self._memo.pop(symbol, None)
+
+
+def _ema(period):
+    period = int(period)
+    return Indicator(
+        f'ema_{period}', [f'ema_{period}'], ['close'],
+        lambda cols: {f'ema_{period}': cols['close'].ewm(span=period, adjust=False).mean()},
+        warmup=lambda tol: ewm_warmup(2 / (period + 1), tol)
+    )
+
+
+def _bollinger(cols):
+    upper, basis, lower = bollinger_series(cols['close'])
+    return {'bb_upper': upper, 'bb_basis': basis, 'bb_lower': lower}
+
+
+def _stoch_rsi(cols):
+    k, d = stoch_rsi_series(cols['rsi_ewm'])
+    return {'stoch_rsi_k': k, 'stoch_rsi_d': d}
+
+
+_RF = RangeFilter(period=100, multiplier=3.0)
+
+
+def _range_filter(cols):
+    signals = _RF.generate_signals(pd.DataFrame({'close': cols['close']}))
+    return {
+        'rf_filter': signals['filter'],
+        'rf_upper_band': signals['upper_band'],
+        'rf_lower_band': signals['lower_band'],
+        'rf_buy': signals['buy_signals'],
+        'rf_sell': signals['sell_signals'],
+        'rf_trend': signals['trend'],
+    }
+
+
+def build_default_registry():
+    """Projede kullanılan indikatörler"""
+    reg = IndicatorRegistry()
+    # Wilder RSI: 14 mumluk SMA tohumu + alpha=1/14 yumuşatma (fark için +1 mum)
+    reg.register(Indicator(
+        'rsi', ['rsi'], ['close'], lambda cols: {'rsi': rsi_series(cols['close'], 14)},
+        warmup=lambda tol: 1 + 14 + ewm_warmup(1 / 14, tol)
+    ))
+    reg.register(Indicator(
+        'rsi_ewm', ['rsi_ewm'], ['close'], lambda cols: {'rsi_ewm': ewm_rsi_series(cols['close'], 14)},
+        warmup=lambda tol: 1 + ewm_warmup(1 / 14, tol)
+    ))
+    # Stokastik pencere (14) + %K (3) + %D (3) rolling pencereleri
+    reg.register(Indicator('stoch_rsi', ['stoch_rsi_k', 'stoch_rsi_d'], ['rsi_ewm'], _stoch_rsi, warmup=14 + 3 + 3 - 2))
+    reg.register(Indicator('bollinger', ['bb_upper', 'bb_basis', 'bb_lower'], ['close'], _bollinger, warmup=20 - 1))
+    reg.register(Indicator(
+        'bb_position', ['bb_position'], ['close', 'bb_upper', 'bb_lower'],
+        lambda cols: {'bb_position': bb_position_series(cols['close'], cols['bb_upper'], cols['bb_lower'])}
+    ))
+    reg.register(Indicator(
+        'bb_trend', ['bb_trend'], ['close', 'bb_basis'],
+        lambda cols: {'bb_trend': bb_trend_series(cols['close'], cols['bb_basis'])}, warmup=1
+    ))
+    reg.register(Indicator(
+        'bb_position_code', ['bb_position_code'], ['close', 'bb_upper', 'bb_lower'],
+        lambda cols: {'bb_position_code': bb_position_codes(cols['close'], cols['bb_upper'], cols['bb_lower'])}
+    ))
+    reg.register(Indicator(
+        'bb_trend_code', ['bb_trend_code'], ['close', 'bb_basis'],
+        lambda cols: {'bb_trend_code': bb_trend_codes(cols['close'], cols['bb_basis'])}, warmup=1
+    ))
+    reg.register(Indicator(
+        'range_filter',
+        ['rf_filter', 'rf_upper_band', 'rf_lower_band', 'rf_buy', 'rf_sell', 'rf_trend'],
+        ['close'], _range_filter, warmup=_RF.warmup
+    ))
+    reg.register_pattern(r'ema_(\d+)', _ema)
+    return reg
+
+
+# Süreç genelinde paylaşılan registry
+registry = build_default_registry()
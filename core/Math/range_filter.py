@@ -1,11 +1,32 @@
-import pandas as pd
-import numpy as np
+import math
+from core.lazy_import import lazy_import
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
 
 class RangeFilter:
+    # Taramanın orijinal geçmişi (1000 mum, aktif mum hariç)
+    HISTORY = 999
+
     def __init__(self, period=100, multiplier=3.0):
         self.period = period
         self.multiplier = multiplier
 
+    def warmup(self, tolerance):
+        """
+        Son mumun sinyalinin tam geçmişle aynı kalması için gereken mum sayısı
+
+        smoothrng iki zincirli EMA'dır (span=period, span=2*period-1); başlangıç
+        etkisi her birinde (1-alpha)^n ile söner. Ama filtre önceki değerine bağlı bir
+        mandaldır (ratchet) ve trend (cond_ini) bir kilittir: kesilmiş geçmişte farklı
+        bir dalda kalıp tolerans dışı sapabilir, sinyal değişebilir. Bu yüzden en az
+        orijinal geçmiş (HISTORY) kullanılır.
+        """
+        total = 1  # abs(x - x[1]) için bir önceki mum
+        for span in (self.period, self.period * 2 - 1):
+            alpha = 2 / (span + 1)
+            total += math.ceil(math.log(tolerance) / math.log(1 - alpha))
+        return max(total, self.HISTORY)
+
     def smooth_range(self, data, source='close'):
         """Pine Script'teki smoothrng fonksiyonunun birebir çevirisi"""
         x = data[source]
@@ -21,31 +42,32 @@ class RangeFilter:
 
     def range_filter(self, data, source='close'):
         """Pine Script'teki rngfilt fonksiyonunun birebir çevirisi"""
-        x = data[source]
-        r = self.smooth_range(data, source)
-        filt = pd.Series(index=data.index, dtype='float64')
+        x = data[source].to_numpy(dtype='float64')
+        r = self.smooth_range(data, source).to_numpy(dtype='float64')
+        filt = np.empty(len(x))
         
-        for i in range(len(data)):
+        # Döngü numpy dizileri üzerinde (iloc'a göre ~100x hızlı, sonuç aynı)
+        for i in range(len(x)):
             if i == 0:
-                filt.iloc[i] = x.iloc[i]
+                filt[i] = x[i]
                 continue
             
-            prev_filt = filt.iloc[i-1]
-            curr_x = x.iloc[i]
-            curr_r = r.iloc[i]
+            prev_filt = filt[i-1]
+            curr_x = x[i]
+            curr_r = r[i]
             
             if curr_x > prev_filt:
                 if curr_x - curr_r < prev_filt:
-                    filt.iloc[i] = prev_filt
+                    filt[i] = prev_filt
                 else:
-                    filt.iloc[i] = curr_x - curr_r
+                    filt[i] = curr_x - curr_r
             else:
                 if curr_x + curr_r > prev_filt:
-                    filt.iloc[i] = prev_filt
+                    filt[i] = prev_filt
                 else:
-                    filt.iloc[i] = curr_x + curr_r
+                    filt[i] = curr_x + curr_r
         
-        return filt
+        return pd.Series(filt, index=data.index, dtype='float64')
 
     def generate_signals(self, data):
         src = data['close']
@@ -53,19 +75,23 @@ class RangeFilter:
         smrng = self.smooth_range(data)
         
         # Filter Direction - Pine Script'ten birebir çeviri
-        upward = pd.Series(0.0, index=data.index)
-        downward = pd.Series(0.0, index=data.index)
+        f = filt.to_numpy()
+        up = np.zeros(len(f))
+        down = np.zeros(len(f))
         
-        for i in range(1, len(data)):
-            if filt.iloc[i] > filt.iloc[i-1]:
-                upward.iloc[i] = upward.iloc[i-1] + 1
-                downward.iloc[i] = 0
-            elif filt.iloc[i] < filt.iloc[i-1]:
-                downward.iloc[i] = downward.iloc[i-1] + 1
-                upward.iloc[i] = 0
+        for i in range(1, len(f)):
+            if f[i] > f[i-1]:
+                up[i] = up[i-1] + 1
+                down[i] = 0
+            elif f[i] < f[i-1]:
+                down[i] = down[i-1] + 1
+                up[i] = 0
             else:
-                upward.iloc[i] = upward.iloc[i-1]
-                downward.iloc[i] = downward.iloc[i-1]
+                up[i] = up[i-1]
+                down[i] = down[i-1]
+        
+        upward = pd.Series(up, index=data.index)
+        downward = pd.Series(down, index=data.index)
         
         # Break Outs - Pine Script'ten birebir çeviri
         long_cond = ((src > filt) & (src > src.shift(1)) & (upward > 0)) | \
@@ -75,14 +101,17 @@ class RangeFilter:
                      ((src < filt) & (src > src.shift(1)) & (downward > 0))
         
         # CondIni hesaplama
-        cond_ini = pd.Series(0, index=data.index)
-        for i in range(1, len(data)):
-            if long_cond.iloc[i]:
-                cond_ini.iloc[i] = 1
-            elif short_cond.iloc[i]:
-                cond_ini.iloc[i] = -1
+        longs = long_cond.to_numpy()
+        shorts = short_cond.to_numpy()
+        cond = np.zeros(len(longs), dtype='int64')
+        for i in range(1, len(longs)):
+            if longs[i]:
+                cond[i] = 1
+            elif shorts[i]:
+                cond[i] = -1
             else:
-                cond_ini.iloc[i] = cond_ini.iloc[i-1]
+                cond[i] = cond[i-1]
+        cond_ini = pd.Series(cond, index=data.index)
         
         # Final sinyal koşulları
         long_condition = long_cond & (cond_ini.shift(1) == -1)
@@ -96,5 +125,72 @@ class RangeFilter:
             'sell_signals': short_condition,
             'trend': cond_ini,
             'upward': upward,
-            'downward': downward
+            'downward': downward,
+            'raw_filter': filt
+        }
+
+    def state(self, data, signals=None, source='close'):
+        """
+        Son mumdan sonraki mumu artımlı hesaplamak için gereken durum
+
+        Args:
+            signals (dict): Aynı data için generate_signals sonucu (verilmezse hesaplanır)
+        """
+        if signals is None:
+            signals = self.generate_signals(data)
+        x = data[source]
+        avrng = (x - x.shift(1)).abs().ewm(span=self.period, adjust=False).mean()
+        smooth = avrng.ewm(span=self.period * 2 - 1, adjust=False).mean()
+        return {
+            'x': float(x.iloc[-1]),
+            'avrng': float(avrng.iloc[-1]),
+            'smooth': float(smooth.iloc[-1]),
+            'filter': float(signals['raw_filter'].iloc[-1]),
+            'upward': float(signals['upward'].iloc[-1]),
+            'downward': float(signals['downward'].iloc[-1]),
+            'cond': int(signals['trend'].iloc[-1]),
+        }
+
+    def step(self, state, x):
+        """
+        Bir sonraki mumun kapanışı x olursa sonuç ne olur - O(1), tüm seriyi yeniden hesaplamaz
+        Aktif mum için fiyat her değiştiğinde aynı state ile tekrar çağrılabilir.
+
+        Returns:
+            dict: generate_signals'ın son satırıyla aynı değerler + 'state' (x ile kapanmış mumun durumu)
+        """
+        alpha = 2 / (self.period + 1)
+        alpha_smooth = 2 / (self.period * 2)
+        avrng = alpha * abs(x - state['x']) + (1 - alpha) * state['avrng']
+        smooth = alpha_smooth * avrng + (1 - alpha_smooth) * state['smooth']
+        r = smooth * self.multiplier
+
+        prev_filt = state['filter']
+        if x > prev_filt:
+            filt = prev_filt if x - r < prev_filt else x - r
+        else:
+            filt = prev_filt if x + r > prev_filt else x + r
+
+        upward, downward = state['upward'], state['downward']
+        if filt > prev_filt:
+            upward, downward = upward + 1, 0.0
+        elif filt < prev_filt:
+            downward, upward = downward + 1, 0.0
+
+        moved = x != state['x']
+        long_cond = x > filt and moved and upward > 0
+        short_cond = x < filt and moved and downward > 0
+        cond = 1 if long_cond else -1 if short_cond else state['cond']
+
+        return {
+            'filter': round(filt, 2),
+            'upper_band': round(filt + r, 2),
+            'lower_band': round(filt - r, 2),
+            'buy': bool(long_cond and state['cond'] == -1),
+            'sell': bool(short_cond and state['cond'] == 1),
+            'trend': cond,
+            'state': {
+                'x': x, 'avrng': avrng, 'smooth': smooth, 'filter': filt,
+                'upward': upward, 'downward': downward, 'cond': cond,
+            },
         }
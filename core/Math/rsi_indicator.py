@@ -1,34 +1,48 @@
 """
 RSI (Relative Strength Index) indikatörü - TradingView uyumlu
 """
-import pandas as pd
-import numpy as np
+from core.lazy_import import lazy_import
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+from Trade.trade_settings import TRADE_SETTINGS
 
-def calculate_rsi(df, period=14):
+def rsi_series(close, period=14):
+    """
+    Wilder RSI serisi (calculate_rsi ve indikatör registry ortak kullanır)
+    """
+    # Fiyat değişimlerini hesapla
+    delta = close.diff()
+    
+    # Pozitif ve negatif değişimler
+    gain = (delta.where(delta > 0, 0)).fillna(0)
+    loss = (-delta.where(delta < 0, 0)).fillna(0)
+    
+    # İlk SMA değerleri
+    avg_gain = np.array(gain.rolling(window=period).mean(), dtype='float64')
+    avg_loss = np.array(loss.rolling(window=period).mean(), dtype='float64')
+    gains = gain.to_numpy(dtype='float64')
+    losses = loss.to_numpy(dtype='float64')
+    
+    # Wilder's smoothing method - numpy dizileri üzerinde
+    for i in range(period, len(close)):
+        avg_gain[i] = (avg_gain[i-1] * (period-1) + gains[i]) / period
+        avg_loss[i] = (avg_loss[i-1] * (period-1) + losses[i]) / period
+    
+    rs = pd.Series(avg_gain, index=close.index) / pd.Series(avg_loss, index=close.index)
+    return 100 - (100 / (1 + rs))
+
+def calculate_rsi(df, period=14, copy=None):
     """
     TradingView ile birebir aynı RSI hesaplama
+
+    copy=None ise düşük bellek modunda df kopyalanmadan yerinde güncellenir
     """
     try:
-        df = df.copy()
-        
-        # Fiyat değişimlerini hesapla
-        delta = df['close'].diff()
-        
-        # Pozitif ve negatif değişimler
-        gain = (delta.where(delta > 0, 0)).fillna(0)
-        loss = (-delta.where(delta < 0, 0)).fillna(0)
-        
-        # İlk SMA değerleri
-        avg_gain = gain.rolling(window=period).mean()
-        avg_loss = loss.rolling(window=period).mean()
-        
-        # Wilder's smoothing method - iloc kullanarak düzeltildi
-        for i in range(period, len(df)):
-            avg_gain.iloc[i] = (avg_gain.iloc[i-1] * (period-1) + gain.iloc[i]) / period
-            avg_loss.iloc[i] = (avg_loss.iloc[i-1] * (period-1) + loss.iloc[i]) / period
-        
-        rs = avg_gain / avg_loss
-        df['rsi'] = 100 - (100 / (1 + rs))
+        if copy is None:
+            copy = not TRADE_SETTINGS['LOW_MEMORY_MODE']
+        if copy:
+            df = df.copy()
+        df['rsi'] = rsi_series(df['close'], period)
         
         return df
         
@@ -1,5 +1,34 @@
-import pandas as pd
-import numpy as np
+from core.lazy_import import lazy_import
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+
+def ewm_rsi_series(close, lengthRSI=14):
+    """
+    StochRSI'ın kullandığı RSI - EMA (com=length-1, adjust=True) ile yumuşatılır.
+    Wilder RSI'dan (rsi_indicator.rsi_series) farklı bir seridir.
+    """
+    close_diff = close.diff()
+    gain = close_diff.where(close_diff > 0, 0)
+    loss = -close_diff.where(close_diff < 0, 0)
+    
+    # EMA kullanarak RSI hesapla (TradingView yöntemi)
+    avg_gain = gain.ewm(com=lengthRSI-1, adjust=True).mean()
+    avg_loss = loss.ewm(com=lengthRSI-1, adjust=True).mean()
+    
+    rs = avg_gain / avg_loss
+    return 100 - (100 / (1 + rs))
+
+def stoch_rsi_series(rsi, lengthStoch=14, smoothK=3, smoothD=3):
+    """RSI serisinden %K ve %D"""
+    # Stokastik RSI hesapla
+    min_rsi = rsi.rolling(window=lengthStoch).min()
+    max_rsi = rsi.rolling(window=lengthStoch).max()
+    stoch_rsi = (rsi - min_rsi) / (max_rsi - min_rsi)
+    
+    # %K ve %D hesapla - SMA kullan
+    k = stoch_rsi.rolling(window=smoothK, center=False).mean() * 100
+    d = k.rolling(window=smoothD, center=False).mean()
+    return k, d
 
 def calculate_stoch_rsi(df, lengthRSI=14, lengthStoch=14, smoothK=3, smoothD=3):
     """
@@ -13,25 +42,10 @@ def calculate_stoch_rsi(df, lengthRSI=14, lengthStoch=14, smoothK=3, smoothD=3):
     """
     try:
         # 1. RSI hesapla - TradingView formülü
-        close_diff = df['close'].diff()
-        gain = close_diff.where(close_diff > 0, 0)
-        loss = -close_diff.where(close_diff < 0, 0)
-        
-        # EMA kullanarak RSI hesapla (TradingView yöntemi)
-        avg_gain = gain.ewm(com=lengthRSI-1, adjust=True).mean()
-        avg_loss = loss.ewm(com=lengthRSI-1, adjust=True).mean()
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        # 2. Stokastik RSI hesapla
-        min_rsi = rsi.rolling(window=lengthStoch).min()
-        max_rsi = rsi.rolling(window=lengthStoch).max()
-        stoch_rsi = (rsi - min_rsi) / (max_rsi - min_rsi)
+        rsi = ewm_rsi_series(df['close'], lengthRSI)
         
-        # 3. %K ve %D hesapla - SMA kullan
-        k = stoch_rsi.rolling(window=smoothK, center=False).mean() * 100
-        d = k.rolling(window=smoothD, center=False).mean()
+        # 2-3. Stokastik RSI, %K ve %D
+        k, d = stoch_rsi_series(rsi, lengthStoch, smoothK, smoothD)
         
         df['stoch_rsi_k'] = k
         df['stoch_rsi_d'] = d
@@ -1,8 +1,9 @@
 """
 Hacim analizi için özel modül
 """
-import pandas as pd
-import numpy as np
+from core.lazy_import import lazy_import
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
 from datetime import datetime
 
 class VolumeAnalyzer:
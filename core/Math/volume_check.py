@@ -1,13 +1,18 @@
-import ccxt
-import pandas as pd
+import os
+import sys
 from datetime import datetime
 
+# Proje kökünü path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from core.lazy_import import lazy_import
+from core.exchange_factory import get_exchange
+pd = lazy_import('pandas')
+
 def check_volume(symbol):
     try:
-        # Binance bağlantısı
-        exchange = ccxt.binance({
-            'enableRateLimit': True
-        })
+        # Binance bağlantısı - her sorguda yeni nesne yerine paylaşılan nesne
+        exchange = get_exchange(market_type='spot', authenticated=False, load_markets=False)
         
         print(f"\n{symbol} için hacim analizi yapılıyor...")
         
@@ -0,0 +1,281 @@
+"""
+Aşamalı aday hunisi - ucuz ön filtreler önce, tam indikatörler sadece kalanlara
+
+Aşamalar:
+    1. fetch      - OHLCV al, aktif mumu çıkar
+    2. prefilter  - son mum hacim tabanı + son mumda RangeFilter sinyali
+    3. indicators - RSI, StochRSI, Bollinger, EMA'lar
+    4. validator  - SignalValidator
+    5. score      - SignalScore
+"""
+import time
+import threading
+from datetime import datetime
+from core.lazy_import import lazy_import
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+from core.Math.indicator_registry import registry, frame_nbytes, MAX_FETCH_LIMIT
+from core.signal_validator import SignalValidator
+from core.signal_score import SignalScore
+from core.correlation_matrix import get_correlation
+from core.ranked_scan import TIMEFRAME_MS
+from core.signal_journal import (
+    get_journal, DECISION_VALIDATOR_REJECTED, DECISION_LOW_SCORE, DECISION_CANDIDATE
+)
+from Trade.trade_settings import TRADE_SETTINGS
+
+STAGES = ['fetch', 'prefilter', 'indicators', 'validator', 'score']
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+EMA_PERIODS = [5, 8, 13, 21, 34, 55, 89, 200]
+
+# Taramanın ihtiyaç duyduğu kolonlar (bb_position/bb_trend gibi metin kolonları istenmez)
+SCAN_COLUMNS = [
+    'rsi', 'stoch_rsi_k', 'stoch_rsi_d', 'bb_upper', 'bb_basis', 'bb_lower',
+] + [f'ema_{period}' for period in EMA_PERIODS]
+
+
+class CandidateFunnel:
+    def __init__(self, exchange, rf, min_score=9, limit=None, min_quote_volume=None):
+        self.exchange = exchange
+        self.rf = rf
+        self.min_score = min_score
+        if limit is None:
+            limit = self.plan_limit()
+        self.limit = limit
+        if min_quote_volume is None:
+            min_quote_volume = TRADE_SETTINGS['PREFILTER_MIN_QUOTE_VOLUME']
+        self.min_quote_volume = min_quote_volume
+        self.validator = SignalValidator(exchange)
+        self.scorer = SignalScore(exchange)
+        self.journal = get_journal(exchange)
+        # on_signals(symbol, df, signals): ön filtredeki RangeFilter sonucunu dinleyen (provisional mod)
+        self.on_signals = None
+        # ScanProfiler (isteğe bağlı profil) - None veya kapalıyken aşamalar doğrudan çalışır
+        self.profiler = None
+        # Kayan korelasyon matrisi her taramada kapanmış mumlarla beslenir (kapalıysa None)
+        self.correlation = get_correlation()
+        # ScanTiers (tarama katmanları) - ön filtredeki RangeFilter sonucuyla katman belirlenir
+        self.tiers = None
+        # Sembol başına kapanmış mumlar (limit - 1 satır, float64) - sonraki turlarda sadece eksikler istenir
+        self.candles = {}
+        self._lock = threading.Lock()
+        # Thread başına değerlendirme belirteci (sıralı taramada süresi dolan tur)
+        self._local = threading.local()
+        self.reset_stats()
+
+    def plan_limit(self, tolerance=None):
+        """RangeFilter ve tarama indikatörlerinin ısınmasına yetecek mum sayısı (+ aktif mum)"""
+        if tolerance is None:
+            tolerance = TRADE_SETTINGS['LOOKBACK_TOLERANCE']
+        needed = max(registry.lookback(SCAN_COLUMNS, tolerance), self.rf.warmup(tolerance))
+        return min(needed, MAX_FETCH_LIMIT - 1) + 1
+
+    def reset_stats(self):
+        """Aşama sayaçlarını sıfırla"""
+        self.stats = {name: {'in': 0, 'out': 0, 'time': 0.0} for name in STAGES}
+        # indicators aşamasından çıkan DataFrame boyutları (sembol başına bellek)
+        self.memory = {'frames': 0, 'bytes': 0, 'max': 0}
+
+    def expired(self):
+        """Bu thread'in değerlendirdiği tur süresi doldu mu (geç kalan iş yan etki bırakmaz)"""
+        token = getattr(self._local, 'expired', None)
+        return token is not None and token.is_set()
+
+    def _run(self, stage, symbol, func, *args):
+        """Aşamayı çalıştır, sayaç ve süreyi kaydet. None dönerse aday elenir"""
+        if self.expired():
+            return None
+        start = time.perf_counter()
+        result = None
+        profiler = self.profiler
+        try:
+            if profiler is not None and profiler.active:
+                result = profiler.call(stage, symbol, func, *args)
+            else:
+                result = func(*args)
+        finally:
+            # Paralel taramada (ranked mod) birden fazla thread aynı sayaçları günceller
+            if not self.expired():
+                with self._lock:
+                    stats = self.stats[stage]
+                    stats['in'] += 1
+                    stats['time'] += time.perf_counter() - start
+                    if result is not None and result is not False:
+                        stats['out'] += 1
+        return None if self.expired() else result
+
+    def fetch(self, symbol):
+        """Mumları al - aktif mum çıkarılmış DataFrame"""
+        candles = self.closed_candles(symbol)
+        if self.correlation is not None and not self.expired():
+            self.correlation.update(symbol, candles)
+
+        df = pd.DataFrame({column: candles[:, i] for i, column in enumerate(OHLCV_COLUMNS)})
+        df['timestamp'] = pd.to_datetime(df['timestamp'].astype('int64'), unit='ms').dt.tz_localize('UTC').dt.tz_convert('Europe/Istanbul')
+        df.set_index('timestamp', inplace=True)
+        return df
+
+    def closed_candles(self, symbol):
+        """
+        Sembolün kapanmış mumları (aktif mum hariç)
+
+        Tampon varsa sadece son mumdan sonrakiler istenir (küçük limit, ağırlık 1);
+        tampon yoksa veya boşluk limit kadar büyükse tam istek atılır.
+        """
+        candles = self.candles.get(symbol)
+        size = self.limit - 1
+        if candles is not None and len(candles):
+            last = int(candles[-1, 0])
+            # Tampondaki son mumdan sonra kapanan mum sayısı (last + TIMEFRAME_MS açılan mum now'da aktifse 0)
+            missing = (self.exchange.milliseconds() - last) // TIMEFRAME_MS - 1
+            if missing <= 0:
+                return candles
+            if missing < size:
+                # Eksik kapanmış mumlar + aktif mum
+                ohlcv = self.exchange.fetch_ohlcv(symbol, '5m', since=last + TIMEFRAME_MS, limit=missing + 1)
+                rows = [row for row in ohlcv[:-1] if row[0] > last]
+                if rows:
+                    candles = np.concatenate([candles, np.asarray(rows, dtype='float64')])[-size:]
+                    if not self.expired():
+                        self.candles[symbol] = candles
+                return candles
+
+        ohlcv = self.exchange.fetch_ohlcv(symbol, '5m', limit=self.limit)
+        # Aktif mumu çıkar
+        candles = np.asarray(ohlcv[:-1], dtype='float64').reshape(-1, len(OHLCV_COLUMNS))
+        if not self.expired():
+            self.candles[symbol] = candles
+        return candles
+
+    def prefilter(self, df, symbol=None):
+        """Aşama 2: sadece close/volume gerektiren ucuz kontroller"""
+        if self.min_quote_volume:
+            last_quote_volume = df['volume'].iloc[-1] * df['close'].iloc[-1]
+            if last_quote_volume < self.min_quote_volume:
+                return None
+
+        signals = self.rf.generate_signals(df)
+        if self.expired():
+            return None
+        if self.tiers is not None:
+            self.tiers.observe(symbol, df, signals)
+        if self.on_signals is not None:
+            self.on_signals(symbol, df, signals)
+
+        # Son kapanmış mumda sinyal var mı?
+        if not (signals['buy_signals'].iloc[-1] or signals['sell_signals'].iloc[-1]):
+            return None
+        return signals
+
+    def indicators(self, df, symbol):
+        """Aşama 3: tam indikatör seti"""
+        # Süresi dolan turun sonucu indikatör hafızasına yazılmaz
+        df = registry.compute(df, SCAN_COLUMNS, symbol=None if self.expired() else symbol)
+        size = frame_nbytes(df)
+        with self._lock:
+            self.memory['frames'] += 1
+            self.memory['bytes'] += size
+            self.memory['max'] = max(self.memory['max'], size)
+        return df
+
+    def build_signal(self, symbol, df, signals):
+        """Sinyal verisini oluştur"""
+        last_buy = signals['buy_signals'].iloc[-1]
+        return {
+            "symbol": symbol,
+            "time": datetime.now().strftime('%H:%M:%S'),
+            "price": float(df['close'].iloc[-1]),
+            "filter": float(signals['filter'].iloc[-1]),
+            "highTarget": float(signals['upper_band'].iloc[-1]),
+            "lowTarget": float(signals['lower_band'].iloc[-1]),
+            "type": "buy" if last_buy else "sell",
+            "rsi": float(df['rsi'].iloc[-1]),
+            "stoch_rsi_k": float(df['stoch_rsi_k'].iloc[-1]),
+            "stoch_rsi_d": float(df['stoch_rsi_d'].iloc[-1])
+        }
+
+    def score(self, signal_data, components=None):
+        """Aşama 5: skor eşiği"""
+        score = self.scorer.calculate_score(signal_data, components)
+        if score < self.min_score:
+            print(f"\n❌ DÜŞÜK KALİTE SİNYAL - Skor: {score}/18")
+            return None
+        return score
+
+    def evaluate(self, symbol, expired=None):
+        """
+        Sembolü huniden geçir
+
+        Args:
+            expired (threading.Event): İşaretlenirse değerlendirme sonraki aşamaya geçmez,
+                huni durumuna ve günlüğe yazmaz (sıralı taramada süresi dolan tur)
+
+        Returns:
+            dict: Skor eşiğini geçen aday {'signal_data': ..., 'score': ...} veya None
+        """
+        self._local.expired = expired
+        try:
+            return self._evaluate(symbol)
+        finally:
+            self._local.expired = None
+
+    def _evaluate(self, symbol):
+        df = self._run('fetch', symbol, self.fetch, symbol)
+        if df is None or df.empty:
+            return None
+
+        signals = self._run('prefilter', symbol, self.prefilter, df, symbol)
+        if signals is None:
+            return None
+
+        print("\n📊 Sinyal bulundu...")
+        df = self._run('indicators', symbol, self.indicators, df, symbol)
+        if df is None:
+            return None
+        signal_data = self.build_signal(symbol, df, signals)
+
+        # Önce validasyon yap
+        if not self._run('validator', symbol, self.validator.validate_signal, df, signal_data):
+            print("\n❌ Validasyon başarısız!")
+            self._journal(DECISION_VALIDATOR_REJECTED, df, signal_data)
+            return None
+
+        # Validasyon başarılıysa skor hesapla
+        components = {}
+        score = self._run('score', symbol, self.score, signal_data, components)
+        if score is None:
+            self._journal(DECISION_LOW_SCORE, df, signal_data, sum(components.values()), components)
+            return None
+
+        self._journal(DECISION_CANDIDATE, df, signal_data, score, components)
+        return {'signal_data': signal_data, 'score': score}
+
+    def _journal(self, decision, df, signal_data, score=None, components=None):
+        """Değerlendirilen adayı indikatör anlık görüntüsüyle günlüğe yaz"""
+        if self.journal is None or self.expired():
+            return
+        indicators = {column: df[column].iloc[-1] for column in SCAN_COLUMNS}
+        for key in ('price', 'filter', 'highTarget', 'lowTarget'):
+            indicators[key] = signal_data[key]
+        self.journal.record(
+            signal_data['symbol'], decision, side=signal_data['type'], score=score,
+            score_components=components, indicators=indicators,
+            candle_ts=int(df.index[-1].timestamp() * 1000)
+        )
+
+    def report(self):
+        """Aşama bazında sayı ve süre raporu"""
+        print("\n🔻 HUNİ RAPORU:")
+        print(f"{'Aşama':<12}{'Giren':>8}{'Kalan':>8}{'Süre (sn)':>12}")
+        for name in STAGES:
+            stats = self.stats[name]
+            print(f"{name:<12}{stats['in']:>8}{stats['out']:>8}{stats['time']:>12.3f}")
+        if self.memory['frames']:
+            memo = registry.memory_usage()
+            mode = "düşük bellek" if registry.low_memory else "normal"
+            print(f"💾 Bellek ({mode}): DataFrame ort. {self.memory['bytes'] / self.memory['frames'] / 1024:.1f} KB/sembol "
+                  f"(max {self.memory['max'] / 1024:.1f} KB), "
+                  f"indikatör hafızası {memo['per_symbol'] / 1024:.1f} KB/sembol")
+        return self.stats
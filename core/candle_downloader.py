@@ -0,0 +1,296 @@
+"""
+Geçmiş mum indirici - sayfalı, paralel, kaldığı yerden devam eder
+
+- Her (sembol, zaman dilimi) için istenen aralık geriye doğru sayfalanır
+- Semboller paralel indirilir, toplam istek ağırlığı dakikalık bütçeyi aşmaz
+- İlerleme her sayfadan sonra kaydedilir; yarıda kalan indirme kaldığı yerden sürer
+- Mumlar CandleStore'a (aylık kolon dosyaları) tekrarsız yazılır
+
+Kullanım:
+    python core/candle_downloader.py --symbols BTC/USDT ETH/USDT --timeframes 5m 1h --since 2022-01-01
+    python core/candle_downloader.py --all --since 2023-01-01 --workers 16
+    python core/candle_downloader.py --sim 50 --since 2024-01-01       # simüle borsa
+"""
+import sys
+import os
+import json
+import time
+import argparse
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Core klasörünü path'e ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from core.lazy_import import lazy_import
+ccxt = lazy_import('ccxt')
+from core.candle_store import CandleStore, exchange_market
+from core.sim_exchange import klines_weight, BINANCE_WEIGHT_LIMIT
+from core.ranked_scan import exchange_sleep
+
+# En iyi mum/ağırlık oranı: 499 mum = 2 ağırlık (1000 mum = 5, 1500 mum = 10)
+DEFAULT_PAGE_LIMIT = 499
+
+# Canlı bot için bütçenin bir kısmı boş bırakılır
+DEFAULT_BUDGET_SHARE = 0.8
+
+
+class WeightBudget:
+    """
+    Dakikalık istek ağırlığı bütçesi (Binance gibi sabit 1 dakikalık pencere)
+    Tüm thread'ler aynı bütçeyi paylaşır; bütçe dolarsa sonraki pencereye kadar beklenir.
+    """
+    def __init__(self, exchange, limit=None):
+        self.exchange = exchange
+        if limit is None:
+            limit = int(BINANCE_WEIGHT_LIMIT * DEFAULT_BUDGET_SHARE)
+        self.limit = limit
+        self.window = None
+        self.used = 0
+        self.waits = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, weight):
+        while True:
+            with self._lock:
+                now = self.exchange.milliseconds()
+                window = now // 60_000
+                if window != self.window:
+                    self.window = window
+                    self.used = 0
+                if self.used + weight <= self.limit:
+                    self.used += weight
+                    return
+                wait_ms = (window + 1) * 60_000 - now
+                self.waits += 1
+            exchange_sleep(self.exchange, wait_ms / 1000)
+
+
+def merge_intervals(intervals):
+    """[[a, b), ...] aralıklarını birleştir"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def missing_intervals(start, end, covered):
+    """[start, end) aralığının covered dışında kalan parçaları"""
+    gaps = []
+    cursor = start
+    for a, b in merge_intervals(covered):
+        if b <= cursor:
+            continue
+        if a >= end:
+            break
+        if a > cursor:
+            gaps.append([cursor, a])
+        cursor = max(cursor, b)
+    if cursor < end:
+        gaps.append([cursor, end])
+    return gaps
+
+
+def parse_date(value):
+    """'2023-01-01' -> ms (UTC)"""
+    return int(datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+class CandleDownloader:
+    """
+    Args:
+        exchange: ccxt exchange (veya SimExchange)
+        store (CandleStore): Hedef depo (exchange'in piyasasıyla aynı olmalı)
+        budget (WeightBudget): Paylaşılan istek bütçesi
+        page_limit (int): Sayfa başına mum
+        workers (int): Paralel sembol sayısı
+        checkpoint_path (str): İlerleme dosyası (varsayılan: <depo>/_progress.json)
+    """
+    def __init__(self, exchange, store=None, budget=None, page_limit=DEFAULT_PAGE_LIMIT,
+                 workers=8, checkpoint_path=None):
+        self.exchange = exchange
+        market = exchange_market(exchange)
+        self.store = store or CandleStore(market=market)
+        if self.store.market != market:
+            raise ValueError(f"Depo piyasası ({self.store.market}) exchange piyasasıyla ({market}) aynı değil")
+        self.budget = budget or WeightBudget(exchange)
+        self.page_limit = page_limit
+        self.workers = workers
+        self.checkpoint_path = checkpoint_path or os.path.join(self.store.root, '_progress.json')
+        self.progress = self._load_progress()
+        self.stats = {'requests': 0, 'candles': 0, 'weight': 0, 'errors': 0}
+        self._lock = threading.Lock()
+
+    def _load_progress(self):
+        try:
+            with open(self.checkpoint_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_progress(self):
+        """İlerlemeyi atomik kaydet (çağıran self._lock'u tutar)"""
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        tmp_path = f"{self.checkpoint_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.progress, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _mark(self, key, start, end, first_available=None):
+        """[start, end) indirildi olarak işaretle"""
+        with self._lock:
+            state = self.progress.setdefault(key, {'covered': [], 'first_available': None})
+            state['covered'] = merge_intervals(state['covered'] + [[start, end]])
+            if first_available is not None:
+                state['first_available'] = first_available
+            self._save_progress()
+
+    def _fetch_page(self, symbol, timeframe, since):
+        weight = klines_weight(self.page_limit)
+        for attempt in range(5):
+            self.budget.acquire(weight)
+            try:
+                rows = self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=self.page_limit)
+                with self._lock:
+                    self.stats['requests'] += 1
+                    self.stats['weight'] += weight
+                return rows
+            except (ccxt.NetworkError, ccxt.RateLimitExceeded) as e:
+                with self._lock:
+                    self.stats['errors'] += 1
+                print(f"⚠️ {symbol} {timeframe}: {str(e)} - tekrar deneniyor ({attempt + 1}/5)")
+                exchange_sleep(self.exchange, 2 ** attempt)
+        raise RuntimeError(f"{symbol} {timeframe} sayfası indirilemedi")
+
+    def _first_candle(self, symbol, timeframe, since, default):
+        """since'ten sonraki ilk mum (borsa kesintisi mi, listeleme mi ayırt etmek için - ağırlık 1)"""
+        self.budget.acquire(klines_weight(1))
+        rows = self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=1)
+        return rows[0][0] if rows else default
+
+    def download_one(self, symbol, timeframe, start, end):
+        """
+        Tek sembol/zaman dilimi için [start, end) aralığını geriye doğru indir
+
+        Returns:
+            int: Yazılan mum sayısı
+        """
+        tf_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+        key = f"{symbol}|{timeframe}"
+        state = self.progress.get(key, {})
+        covered = list(state.get('covered', []))
+        if state.get('first_available'):
+            # Listelenmeden önceki dönem için tekrar istek atılmaz
+            covered.append([start, state['first_available']])
+
+        total = 0
+        # En yeni boşluktan başla - geriye doğru
+        for gap_start, gap_end in reversed(missing_intervals(start, end, covered)):
+            cursor = gap_end
+            while cursor > gap_start:
+                since = max(gap_start, cursor - self.page_limit * tf_ms)
+                rows = [row for row in self._fetch_page(symbol, timeframe, since) if row[0] < cursor]
+                if rows:
+                    self.store.write_rows(symbol, timeframe, rows)
+                    total += len(rows)
+                first = rows[0][0] if rows else cursor
+                if first > since and self._first_candle(symbol, timeframe, gap_start, first) >= first:
+                    # Boşluğun başından bu mumdan önce veri yok - coin bu tarihte listelenmiş
+                    self._mark(key, since, cursor, first_available=first)
+                    break
+                self._mark(key, since, cursor)
+                cursor = since
+
+        with self._lock:
+            self.stats['candles'] += total
+        return total
+
+    def download(self, symbols, timeframes, since, until=None):
+        """
+        Tüm semboller ve zaman dilimleri için paralel indir
+
+        Args:
+            symbols (list): Semboller
+            timeframes (list): Zaman dilimleri ('5m', '1h', ...)
+            since (int): Başlangıç (ms)
+            until (int): Bitiş (ms, varsayılan: son kapanmış mum)
+        """
+        now = self.exchange.milliseconds()
+        jobs = []
+        for timeframe in timeframes:
+            tf_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+            # Aktif (kapanmamış) mum indirilmez
+            end = min(until or now, now - now % tf_ms)
+            jobs += [(symbol, timeframe, since, end) for symbol in symbols]
+
+        start_time = time.perf_counter()
+        done = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.download_one, *job): job for job in jobs}
+            for future in as_completed(futures):
+                symbol, timeframe = futures[future][:2]
+                done += 1
+                try:
+                    count = future.result()
+                    print(f"✅ [{done}/{len(jobs)}] {symbol} {timeframe}: {count} mum")
+                except Exception as e:
+                    print(f"❌ [{done}/{len(jobs)}] {symbol} {timeframe}: {str(e)}")
+
+        elapsed = time.perf_counter() - start_time
+        print(f"\n📦 {self.stats['candles']} mum, {self.stats['requests']} istek "
+              f"(ağırlık {self.stats['weight']}), {elapsed:.1f} sn, bütçe beklemesi {self.budget.waits}")
+        return self.stats
+
+
+def build_sim_exchange(count, since):
+    """Yerel test için since'ten beri mumu olan simüle borsa"""
+    from core.sim_exchange import SimExchange, SyntheticCandles, VirtualClock
+    pairs = [f"SIM{i:04d}/USDT" for i in range(count)]
+    clock = VirtualClock(speed=None)
+    # Her sembol since'ten biraz sonra listelenmiş gibi davranır (ilk mumlar origin'de başlar)
+    candles = SyntheticCandles(since)
+    exchange = SimExchange(pairs, candles=candles, clock=clock, on_rate_limit='raise')
+    exchange.load_markets()
+    return exchange, pairs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Geçmiş mum indirici")
+    parser.add_argument('--symbols', nargs='*', default=None)
+    parser.add_argument('--all', action='store_true', help="coinlist.json'daki tüm coinler")
+    parser.add_argument('--timeframes', nargs='+', default=['5m'])
+    parser.add_argument('--since', required=True, help="YYYY-MM-DD (UTC)")
+    parser.add_argument('--until', default=None, help="YYYY-MM-DD (UTC), varsayılan: şimdi")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--page-limit', type=int, default=DEFAULT_PAGE_LIMIT)
+    parser.add_argument('--store', default=None, help="Depo klasörü (varsayılan: data/candles)")
+    parser.add_argument('--sim', type=int, default=None, metavar='SEMBOL', help="Simüle borsa ile çalıştır")
+    args = parser.parse_args()
+
+    since = parse_date(args.since)
+    until = parse_date(args.until) if args.until else None
+
+    if args.sim:
+        exchange, symbols = build_sim_exchange(args.sim, since)
+    else:
+        from core.exchange_factory import get_exchange
+        exchange = get_exchange(market_type='future', authenticated=False)
+        if args.all:
+            from monitor_multiple import load_coin_list
+            symbols = load_coin_list() or []
+        else:
+            symbols = args.symbols or []
+    if not symbols:
+        print("❌ Sembol verilmedi (--symbols veya --all)")
+        sys.exit(1)
+
+    market = exchange_market(exchange)
+    store = CandleStore(args.store, market=market) if args.store else CandleStore(market=market)
+    downloader = CandleDownloader(exchange, store, page_limit=args.page_limit, workers=args.workers)
+    downloader.download(symbols, args.timeframes, since, until)
@@ -0,0 +1,277 @@
+"""
+Yerel mum deposu - sembol ve ay bazında kolon dosyaları
+
+Düzen:
+    data/candles/<market>/<timeframe>/<SEMBOL>/<YYYY-MM>.npz
+    (market: 'futures' veya 'spot'; timestamp int64 ms, open/high/low/close/volume float64)
+
+Spot 'BTC/USDT' ile futures 'BTC/USDT:USDT' aynı sembol anahtarına (BTCUSDT) düşer;
+piyasalar bu yüzden ayrı klasörlerde tutulur, her depo tek piyasaya aittir.
+
+Aynı timestamp tekrar yazılırsa yeni değer geçerli olur, dosyalar her zaman
+sıralı ve tekrarsızdır. Yazma atomiktir (geçici dosya + os.replace).
+
+Sembol x ay indeksi (data/candles/<market>/_index.sqlite) her yazmada güncellenir:
+mum sayısı, ilk/son mum ve boşluk sayısı dosya açmadan sorgulanır.
+"""
+import os
+import sqlite3
+import threading
+from core.lazy_import import lazy_import
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+DEFAULT_ROOT = os.path.join(DATA_DIR, 'candles')
+
+MARKET_FUTURES = 'futures'
+MARKET_SPOT = 'spot'
+MARKETS = (MARKET_FUTURES, MARKET_SPOT)
+
+COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+TIMEFRAME_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS months (
+    timeframe TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    month TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    first_ts INTEGER,
+    last_ts INTEGER,
+    gaps INTEGER NOT NULL,
+    PRIMARY KEY (timeframe, symbol, month)
+)
+"""
+
+
+def timeframe_ms(timeframe):
+    """'5m' -> 300000 ('1M' gibi düzensiz aralıklar için None)"""
+    unit = TIMEFRAME_UNITS.get(timeframe[-1])
+    if unit is None:
+        return None
+    return int(timeframe[:-1]) * unit * 1000
+
+
+def count_gaps(timestamps, step_ms):
+    """Ardışık mumlar arasında step_ms'den büyük boşluk sayısı"""
+    if step_ms is None or len(timestamps) < 2:
+        return 0
+    return int(np.count_nonzero(np.diff(timestamps) != step_ms))
+
+
+def symbol_key(symbol):
+    """'BTC/USDT', 'BTC/USDT:USDT' -> 'BTCUSDT' (piyasa depo klasöründen ayrılır)"""
+    return symbol.split(':')[0].replace('/', '')
+
+
+def exchange_market(exchange):
+    """ccxt defaultType -> depo piyasası ('future'/'swap' -> 'futures', 'spot' -> 'spot')"""
+    default_type = exchange.options.get('defaultType', 'spot')
+    return MARKET_SPOT if default_type == 'spot' else MARKET_FUTURES
+
+
+def month_of(timestamps):
+    """ms timestamp dizisi -> 'YYYY-MM' dizisi"""
+    return np.asarray(timestamps, dtype='int64').astype('datetime64[ms]').astype('datetime64[M]').astype(str)
+
+
+def empty_columns():
+    columns = {'timestamp': np.empty(0, dtype='int64')}
+    for name in COLUMNS[1:]:
+        columns[name] = np.empty(0, dtype='float64')
+    return columns
+
+
+class CandleStore:
+    """
+    Args:
+        root (str): Depo kök klasörü
+        market (str): 'futures' veya 'spot' - dosyalar <root>/<market>/ altında
+    """
+    def __init__(self, root=DEFAULT_ROOT, market=MARKET_FUTURES):
+        if market not in MARKETS:
+            raise ValueError(f"Bilinmeyen piyasa: {market} (beklenen: {', '.join(MARKETS)})")
+        self.market = market
+        self.root = os.path.join(root, market)
+        # Aynı dosyaya eşzamanlı oku-birleştir-yaz yapılmasın
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        self._index = None
+        self._index_pid = None
+        self._index_lock = threading.Lock()
+
+    def _index_conn(self):
+        if self._index is None or self._index_pid != os.getpid():
+            os.makedirs(self.root, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.root, '_index.sqlite'), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(INDEX_SCHEMA)
+            self._index = conn
+            self._index_pid = os.getpid()
+        return self._index
+
+    def _update_index(self, timeframe, symbol, month, timestamps):
+        with self._index_lock:
+            conn = self._index_conn()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO months VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (timeframe, symbol_key(symbol), month, len(timestamps),
+                     int(timestamps[0]) if len(timestamps) else None,
+                     int(timestamps[-1]) if len(timestamps) else None,
+                     count_gaps(timestamps, timeframe_ms(timeframe)))
+                )
+
+    def coverage(self, symbol=None, timeframe=None):
+        """
+        İndeksten sembol x ay özeti (dosya açılmaz)
+
+        Returns:
+            list: {'timeframe', 'symbol', 'month', 'rows', 'first_ts', 'last_ts', 'gaps'} dict'leri
+        """
+        where, params = [], []
+        if symbol is not None:
+            where.append("symbol = ?")
+            params.append(symbol_key(symbol))
+        if timeframe is not None:
+            where.append("timeframe = ?")
+            params.append(timeframe)
+        sql = "SELECT timeframe, symbol, month, rows, first_ts, last_ts, gaps FROM months"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY timeframe, symbol, month"
+        keys = ['timeframe', 'symbol', 'month', 'rows', 'first_ts', 'last_ts', 'gaps']
+        with self._index_lock:
+            return [dict(zip(keys, row)) for row in self._index_conn().execute(sql, params)]
+
+    def rebuild_index(self):
+        """İndeksi dosyalardan yeniden oluştur"""
+        with self._index_lock:
+            conn = self._index_conn()
+            with conn:
+                conn.execute("DELETE FROM months")
+        count = 0
+        for timeframe in sorted(os.listdir(self.root)) if os.path.isdir(self.root) else []:
+            if not os.path.isdir(os.path.join(self.root, timeframe)):
+                continue
+            for symbol in self.symbols(timeframe):
+                for month in self.months(symbol, timeframe):
+                    timestamps = self.load_month(symbol, timeframe, month)['timestamp']
+                    self._update_index(timeframe, symbol, month, timestamps)
+                    count += 1
+        return count
+
+    def _lock(self, path):
+        with self._locks_lock:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def path(self, symbol, timeframe, month):
+        return os.path.join(self.root, timeframe, symbol_key(symbol), f"{month}.npz")
+
+    def months(self, symbol, timeframe):
+        """Depodaki aylar (sıralı)"""
+        directory = os.path.join(self.root, timeframe, symbol_key(symbol))
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-4] for name in os.listdir(directory) if name.endswith('.npz'))
+
+    def symbols(self, timeframe):
+        """Zaman dilimindeki semboller (depo anahtarı: 'BTCUSDT')"""
+        directory = os.path.join(self.root, timeframe)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(os.listdir(directory))
+
+    def load_month(self, symbol, timeframe, month):
+        path = self.path(symbol, timeframe, month)
+        if not os.path.exists(path):
+            return empty_columns()
+        with np.load(path) as data:
+            return {name: data[name] for name in COLUMNS}
+
+    def _save(self, path, columns):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **columns)
+        os.replace(tmp_path, path)
+
+    def write(self, symbol, timeframe, columns):
+        """
+        Mumları ilgili aylara birleştir
+
+        Args:
+            columns (dict): COLUMNS anahtarlı diziler (sıralı olması gerekmez)
+
+        Returns:
+            dict: {ay: o ayın toplam mum sayısı}
+        """
+        timestamps = np.asarray(columns['timestamp'], dtype='int64')
+        if not len(timestamps):
+            return {}
+        months = month_of(timestamps)
+        written = {}
+        for month in np.unique(months):
+            mask = months == month
+            path = self.path(symbol, timeframe, month)
+            with self._lock(path):
+                existing = self.load_month(symbol, timeframe, month)
+                # Yeni değerler önce - np.unique ilk görüleni tutar
+                merged_ts = np.concatenate([timestamps[mask], existing['timestamp']])
+                merged_ts, index = np.unique(merged_ts, return_index=True)
+                merged = {'timestamp': merged_ts}
+                for name in COLUMNS[1:]:
+                    values = np.concatenate([np.asarray(columns[name], dtype='float64')[mask], existing[name]])
+                    merged[name] = values[index]
+                self._save(path, merged)
+                self._update_index(timeframe, symbol, str(month), merged_ts)
+            written[str(month)] = len(merged_ts)
+        return written
+
+    def write_rows(self, symbol, timeframe, rows):
+        """fetch_ohlcv satırlarını ([ts, o, h, l, c, v]) yaz"""
+        if not rows:
+            return {}
+        array = np.asarray(rows, dtype='float64')
+        columns = {'timestamp': array[:, 0].astype('int64')}
+        for i, name in enumerate(COLUMNS[1:], 1):
+            columns[name] = array[:, i]
+        return self.write(symbol, timeframe, columns)
+
+    def read(self, symbol, timeframe, start=None, end=None):
+        """
+        [start, end) aralığındaki mumlar (ms)
+
+        Returns:
+            dict: COLUMNS anahtarlı diziler
+        """
+        months = self.months(symbol, timeframe)
+        if start is not None:
+            first = str(month_of([start])[0])
+            months = [m for m in months if m >= first]
+        if end is not None:
+            last = str(month_of([end - 1])[0])
+            months = [m for m in months if m <= last]
+        if not months:
+            return empty_columns()
+
+        parts = [self.load_month(symbol, timeframe, month) for month in months]
+        columns = {name: np.concatenate([part[name] for part in parts]) for name in COLUMNS}
+        mask = np.ones(len(columns['timestamp']), dtype=bool)
+        if start is not None:
+            mask &= columns['timestamp'] >= start
+        if end is not None:
+            mask &= columns['timestamp'] < end
+        if not mask.all():
+            columns = {name: values[mask] for name, values in columns.items()}
+        return columns
+
+    def read_frame(self, symbol, timeframe, start=None, end=None):
+        """read() sonucunu tarama ile aynı formatta DataFrame olarak döndür"""
+        columns = self.read(symbol, timeframe, start, end)
+        df = pd.DataFrame({name: columns[name] for name in COLUMNS[1:]})
+        df.index = pd.to_datetime(columns['timestamp'], unit='ms', utc=True).tz_convert('Europe/Istanbul')
+        df.index.name = 'timestamp'
+        return df
@@ -0,0 +1,190 @@
+"""
+Sıcak yeniden başlatma - tarama durumunun periyodik anlık görüntüsü
+
+Kaydedilenler (tek sıkıştırılmış .npz, geçici dosya + os.replace ile atomik):
+    - sembol başına kapanmış mum tamponları (CandidateFunnel.candles)
+    - sembol başına RangeFilter filtre/trend ve katman durumu (ScanTiers)
+    - emir defteri: emirler, işlemler, pozisyonlar (OrderTracker)
+    - margin type'ı ISOLATED yapılmış semboller
+
+Yeniden başlatmada anlık görüntü yüklenir: margin type sadece yeni semboller için
+ayarlanır, huni her sembol için sadece kaydedildikten sonra kapanan mumları ister
+(tek küçük istek, ağırlık 1), emir defteri ilk reconcile ile borsaya eşitlenir.
+İndikatörler ve RangeFilter tampondaki mumlardan vektörel hesaplanır.
+
+Dosya: data/checkpoints/<exchange sınıfı>_<live|testnet>[_<süreç>].npz
+"""
+import os
+import json
+import time
+import threading
+from core.lazy_import import lazy_import
+np = lazy_import('numpy')
+from core.exchange_factory import exchange_environment
+from Trade.trade_settings import TRADE_SETTINGS
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+CHECKPOINT_DIR = os.path.join(DATA_DIR, 'checkpoints')
+
+# Format değişirse artır
+CHECKPOINT_VERSION = 1
+
+
+def checkpoint_path(exchange, name=None):
+    """Exchange, ortam ve süreç adına göre checkpoint dosyası"""
+    base = f"{type(exchange).__name__.lower()}_{exchange_environment(exchange)}"
+    if name:
+        base = f"{base}_{name}"
+    return os.path.join(CHECKPOINT_DIR, f"{base}.npz")
+
+
+class Checkpoint:
+    """
+    Args:
+        exchange: ccxt exchange - dosya adı ve kayıt zamanı için
+        name (str): Süreç adı (çok süreçli taramada her süreç kendi dosyasını yazar)
+        path (str): Dosya yolu (None ise checkpoint_path)
+        interval (float): maybe_save aralığı (saniye)
+    """
+    def __init__(self, exchange, name=None, path=None, interval=None):
+        self.exchange = exchange
+        self.path = path or checkpoint_path(exchange, name)
+        self.interval = TRADE_SETTINGS['CHECKPOINT_SECONDS'] if interval is None else interval
+        self.margin_symbols = set()
+        self._last_save = 0.0
+        self._writer = None
+        self.stats = {'saves': 0, 'skipped': 0, 'errors': 0, 'bytes': 0}
+
+    # ------------------------------------------------------------------
+    # Yükleme
+    # ------------------------------------------------------------------
+    def load(self):
+        """
+        Anlık görüntüyü oku
+
+        Returns:
+            dict: {'meta': {...}, 'candles': {sembol: dizi}} veya dosya yoksa/uyumsuzsa None
+        """
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with np.load(self.path) as data:
+                meta = json.loads(str(data['meta']))
+                if meta.get('version') != CHECKPOINT_VERSION:
+                    print(f"⚠️ Checkpoint sürümü uyumsuz, yok sayıldı: {self.path}")
+                    return None
+                symbols = data['symbols'].tolist()
+                offsets = np.concatenate([[0], np.cumsum(data['lengths'])])
+                timestamps = data['timestamps']
+                values = data['values']
+        except Exception as e:
+            print(f"⚠️ Checkpoint okunamadı: {str(e)}")
+            return None
+
+        candles = {}
+        for k, symbol in enumerate(symbols):
+            start, end = offsets[k], offsets[k + 1]
+            candles[symbol] = np.column_stack([timestamps[start:end].astype('float64'), values[start:end]])
+        self.margin_symbols.update(meta.get('margin_symbols', []))
+        return {'meta': meta, 'candles': candles}
+
+    def restore(self, state, funnel=None, tiers=None, tracker=None):
+        """
+        Yüklenen durumu tarama nesnelerine aktar
+
+        Tamponu hunideki limitten kısa olan semboller alınmaz (indikatör ısınması eksik kalır),
+        onlar için ilk turda tam istek atılır.
+        """
+        meta = state['meta']
+        restored = {'candles': 0, 'tiers': 0, 'orders': 0}
+        if funnel is not None:
+            size = funnel.limit - 1
+            for symbol, candles in state['candles'].items():
+                if len(candles) >= size:
+                    funnel.candles[symbol] = candles[-size:]
+                    restored['candles'] += 1
+        if tiers is not None:
+            restored['tiers'] = tiers.restore(meta.get('tiers', {}))
+        if tracker is not None:
+            restored['orders'] = tracker.restore(meta.get('orders', {}))
+        age = (self.exchange.milliseconds() - meta['saved_ms']) / 60000
+        print(f"♻️ Checkpoint yüklendi ({age:.1f} dk önce): {restored['candles']} coin mumları, "
+              f"{restored['tiers']} katman durumu, {restored['orders']} emir, "
+              f"{len(self.margin_symbols)} margin ayarı")
+        return restored
+
+    # ------------------------------------------------------------------
+    # Kayıt
+    # ------------------------------------------------------------------
+    def add_margin(self, symbol):
+        """Margin type'ı ayarlanmış (veya zaten ISOLATED olan) sembol"""
+        self.margin_symbols.add(symbol)
+
+    def maybe_save(self, funnel, tiers=None, tracker=None):
+        """Aralık dolduysa kaydet (döngüden her turda çağrılır)"""
+        if time.time() - self._last_save < self.interval:
+            return False
+        return self.save(funnel, tiers, tracker)
+
+    def save(self, funnel, tiers=None, tracker=None, background=True):
+        """
+        Anlık görüntüyü al ve yaz
+
+        Tampon dizileri yerinde değiştirilmez (yeni mumda yeni dizi atanır), bu yüzden
+        sözlüğün kopyası tutarlı bir görüntüdür; sıkıştırma ve yazma arka planda yapılır.
+        """
+        if self._writer is not None and self._writer.is_alive():
+            self.stats['skipped'] += 1
+            return False
+        candles = dict(funnel.candles)
+        meta = {
+            'version': CHECKPOINT_VERSION,
+            'saved_ms': int(self.exchange.milliseconds()),
+            'saved_at': time.time(),
+            'margin_symbols': sorted(self.margin_symbols),
+            'tiers': tiers.snapshot() if tiers is not None else {},
+            'orders': tracker.snapshot() if tracker is not None else {},
+        }
+        self._last_save = time.time()
+        if not background:
+            return self._write(candles, meta)
+        self._writer = threading.Thread(target=self._write, args=(candles, meta), name='checkpoint', daemon=True)
+        self._writer.start()
+        return True
+
+    def _write(self, candles, meta):
+        start = time.perf_counter()
+        symbols = sorted(symbol for symbol, rows in candles.items() if len(rows))
+        rows = [candles[symbol] for symbol in symbols]
+        stacked = np.concatenate(rows) if rows else np.empty((0, 6))
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez_compressed(
+                    f,
+                    meta=np.array(json.dumps(meta)),
+                    symbols=np.array(symbols, dtype=str),
+                    lengths=np.array([len(r) for r in rows], dtype='int64'),
+                    timestamps=stacked[:, 0].astype('int64'),
+                    values=stacked[:, 1:],
+                )
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"⚠️ Checkpoint yazılamadı: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        size = os.path.getsize(self.path)
+        self.stats['saves'] += 1
+        self.stats['bytes'] = size
+        print(f"💾 Checkpoint: {len(symbols)} coin, {size / 1024:.0f} KB ({(time.perf_counter() - start) * 1000:.0f} ms)")
+        return True
+
+    def wait(self):
+        """Arka plandaki yazmanın bitmesini bekle (çıkışta)"""
+        if self._writer is not None:
+            self._writer.join()
@@ -0,0 +1,317 @@
+"""
+Artımlı kayan korelasyon matrisi - tüm coin evreni için
+
+Her sembolün son CORRELATION_WINDOW mumluk log getirisi halka tamponda tutulur.
+Bir mum kapandığında sadece o sembolün satırı güncellenir (rank-1): aynı mumu
+taşıyan diğer sembollerle ortak mum sayısı, toplamlar, kare toplamları ve çapraz
+çarpımlar eklenir, pencereden düşen mumunki çıkarılır. Sembol başına O(n), mum
+başına toplam O(n²); matris hiçbir zaman baştan hesaplanmaz.
+
+Pearson korelasyonu her çift için sadece ortak mumlar üzerinden hesaplanır
+(eksik mumlu veya yeni listelenen coinler diğerlerini bozmaz). "Aday X'in açık
+pozisyonlarla en yüksek korelasyonu" sorgusu O(k)'dır (k = açık pozisyon).
+
+Besleme: CandidateFunnel.fetch her taramada kapanmış mumları update()'e verir
+(sadece yeni mumlar işlenir). Taranmayan açık pozisyon coinleri tur başında
+set_exposure() sonrası refresh() ile az mumlu fetch_ohlcv isteğiyle güncellenir;
+giriş filtresi (check) istek atmaz, emir yoluna gecikme eklemez.
+"""
+import math
+import threading
+from core.lazy_import import lazy_import
+np = lazy_import('numpy')
+from core.candle_store import timeframe_ms
+from Trade.trade_settings import TRADE_SETTINGS
+
+TIMEFRAME = '5m'
+
+
+def _position_side(position):
+    """ccxt pozisyon yönü ('long'/'short') -> sinyal yönü ('buy'/'sell')"""
+    return 'sell' if position.get('side') == 'short' else 'buy'
+
+
+def _pair(symbol):
+    """'BTC/USDT:USDT' -> 'BTC/USDT' (tarama sembolleriyle aynı anahtar)"""
+    return symbol.split(':')[0]
+
+
+class RollingCorrelation:
+    """
+    Args:
+        window (int): Korelasyon penceresi (mum)
+        min_bars (int): Korelasyon için gereken minimum ortak mum (azsa bilinmiyor sayılır)
+        timeframe (str): Mum aralığı
+        capacity (int): Başlangıç sembol kapasitesi (gerektikçe iki katına çıkar)
+    """
+    def __init__(self, window=None, min_bars=None, timeframe=TIMEFRAME, capacity=64):
+        self.window = window or TRADE_SETTINGS['CORRELATION_WINDOW']
+        self.min_bars = min_bars or TRADE_SETTINGS['CORRELATION_MIN_BARS']
+        self.timeframe = timeframe
+        self.step_ms = timeframe_ms(timeframe)
+        self.index = {}
+        self.symbols = []
+        self.last_ts = {}
+        self.last_close = {}
+        # Açık pozisyonlar: sembol -> 'buy'/'sell'
+        self.exposure = {}
+        self._lock = threading.RLock()
+        self._allocate(capacity)
+        self.metrics = {'updates': 0, 'checks': 0, 'rejected': 0, 'refreshed': 0}
+
+    def _allocate(self, capacity):
+        """Tamponları büyüt (mevcut değerler korunur)"""
+        old = getattr(self, '_capacity', 0)
+        returns = np.zeros((capacity, self.window))
+        bars = np.full((capacity, self.window), -1, dtype=np.int64)
+        heads = np.full(capacity, -1, dtype=np.int64)
+        pairs = {name: np.zeros((capacity, capacity)) for name in ('count', 'sum', 'sum_sq', 'cross')}
+        if old:
+            returns[:old] = self._returns
+            bars[:old] = self._bars
+            heads[:old] = self._heads
+            for name, matrix in pairs.items():
+                matrix[:old, :old] = self._pairs[name]
+        self._returns = returns
+        self._bars = bars
+        # Sembolün işlenen son mumu (halka tamponun başı)
+        self._heads = heads
+        self._pairs = pairs
+        self._capacity = capacity
+
+    def _slot(self, symbol):
+        i = self.index.get(symbol)
+        if i is None:
+            i = len(self.symbols)
+            if i == self._capacity:
+                self._allocate(self._capacity * 2)
+            self.index[symbol] = i
+            self.symbols.append(symbol)
+        return i
+
+    # ------------------------------------------------------------------
+    # Güncelleme
+    # ------------------------------------------------------------------
+    def update(self, symbol, rows):
+        """
+        Kapanmış mumları ekle (sadece son işlenenden yeni olanlar)
+
+        Args:
+            symbol (str): Coin
+            rows (list): [timestamp, open, high, low, close, volume] satırları (aktif mum hariç)
+
+        Returns:
+            int: Eklenen getiri sayısı
+        """
+        if not len(rows):
+            return 0
+        with self._lock:
+            i = self._slot(symbol)
+            last = self.last_ts.get(symbol)
+            start = len(rows)
+            # Sondan geriye: sadece yeni mumlar (pencereden eskisi zaten düşer)
+            while start > 0 and (last is None or rows[start - 1][0] > last) and len(rows) - start <= self.window:
+                start -= 1
+            added = 0
+            previous = self.last_close.get(symbol)
+            previous_ts = last
+            for row in rows[start:]:
+                timestamp, close = int(row[0]), float(row[4])
+                value = None
+                if previous is not None and timestamp - previous_ts == self.step_ms and previous > 0 and close > 0:
+                    value = math.log(close / previous)
+                    added += 1
+                self._push(i, timestamp // self.step_ms, value)
+                previous, previous_ts = close, timestamp
+            if previous_ts is not None:
+                self.last_ts[symbol] = previous_ts
+                self.last_close[symbol] = previous
+            self.metrics['updates'] += added
+            return added
+
+    def _push(self, i, bar, value):
+        """
+        Sembol i'nin mum getirisini yaz: pencereden düşeni çıkar, yeniyi ekle
+
+        Eksik mumların (boşluk, getirisi hesaplanamayan mum) slotları da boşaltılır;
+        pencerenin dışında kalan eski getiri ortak mum sayılmaz.
+        """
+        for skipped in range(max(self._heads[i] + 1, bar - self.window + 1), bar):
+            self._evict(i, skipped % self.window)
+        slot = bar % self.window
+        self._evict(i, slot)
+        self._heads[i] = bar
+        if value is None:
+            return
+        self._bars[i, slot] = bar
+        self._returns[i, slot] = value
+        self._apply(i, slot, bar, value, 1.0)
+
+    def _evict(self, i, slot):
+        old_bar = self._bars[i, slot]
+        if old_bar >= 0:
+            self._apply(i, slot, old_bar, self._returns[i, slot], -1.0)
+            self._bars[i, slot] = -1
+
+    def _apply(self, i, slot, bar, value, sign):
+        """Aynı mumu taşıyan tüm sembollerle (i, j) çift istatistiklerine katkı"""
+        n = len(self.symbols)
+        present = self._bars[:n, slot] == bar
+        present[i] = False
+        others = np.flatnonzero(present)
+        if not len(others):
+            return
+        other = self._returns[others, slot]
+        count, total, total_sq, cross = (self._pairs[name] for name in ('count', 'sum', 'sum_sq', 'cross'))
+        count[i, others] += sign
+        count[others, i] += sign
+        total[i, others] += sign * value
+        total[others, i] += sign * other
+        total_sq[i, others] += sign * value * value
+        total_sq[others, i] += sign * other * other
+        cross[i, others] += sign * value * other
+        cross[others, i] = cross[i, others]
+
+    def refresh(self, exchange, symbols):
+        """
+        Son mumu eksik olan sembolleri borsadan tamamla (taranmayan açık pozisyonlar)
+
+        Returns:
+            int: İstek atılan sembol sayısı
+        """
+        now = exchange.milliseconds()
+        last_closed = now - now % self.step_ms - self.step_ms
+        fetched = 0
+        for symbol in symbols:
+            last = self.last_ts.get(symbol)
+            if last is not None and last >= last_closed:
+                continue
+            missing = self.window + 1 if last is None else (last_closed - last) // self.step_ms + 1
+            try:
+                rows = exchange.fetch_ohlcv(symbol, self.timeframe, limit=int(min(missing, self.window + 1)) + 1)
+            except Exception as e:
+                print(f"⚠️ Korelasyon için mumlar alınamadı ({symbol}): {str(e)}")
+                continue
+            self.update(symbol, rows[:-1])
+            fetched += 1
+        self.metrics['refreshed'] += fetched
+        return fetched
+
+    # ------------------------------------------------------------------
+    # Sorgular
+    # ------------------------------------------------------------------
+    def correlation(self, a, b):
+        """İki sembolün ortak mumlar üzerinden korelasyonu (yetersiz veri: None)"""
+        with self._lock:
+            i, j = self.index.get(a), self.index.get(b)
+            if i is None or j is None or i == j:
+                return None
+            pairs = self._pairs
+            n = pairs['count'][i, j]
+            if n < self.min_bars:
+                return None
+            sx, sy = pairs['sum'][i, j], pairs['sum'][j, i]
+            var_x = pairs['sum_sq'][i, j] - sx * sx / n
+            var_y = pairs['sum_sq'][j, i] - sy * sy / n
+            if var_x <= 0 or var_y <= 0:
+                return None
+            cov = pairs['cross'][i, j] - sx * sy / n
+            return float(max(-1.0, min(1.0, cov / math.sqrt(var_x * var_y))))
+
+    def matrix(self, symbols=None):
+        """Korelasyon matrisi (rapor/analiz için; yetersiz veri NaN)"""
+        with self._lock:
+            symbols = list(self.symbols if symbols is None else symbols)
+            rows = [self.index[s] for s in symbols]
+            grid = np.ix_(rows, rows)
+            pairs = {name: matrix[grid] for name, matrix in self._pairs.items()}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            n = pairs['count']
+            mean_x = pairs['sum'] / n
+            mean_y = pairs['sum'].T / n
+            var_x = pairs['sum_sq'] - pairs['sum'] * mean_x
+            var_y = pairs['sum_sq'].T - pairs['sum'].T * mean_y
+            result = (pairs['cross'] - pairs['sum'] * mean_y) / np.sqrt(var_x * var_y)
+        result[(n < self.min_bars) | (var_x <= 0) | (var_y <= 0)] = np.nan
+        np.fill_diagonal(result, 1.0)
+        return symbols, np.clip(result, -1.0, 1.0)
+
+    def max_correlation(self, symbol, side, exposure=None):
+        """
+        Adayın açık pozisyonlarla yön düzeltilmiş en yüksek korelasyonu
+
+        Aynı yöndeki pozisyonla korelasyon olduğu gibi, ters yöndekiyle işareti
+        çevrilerek alınır (ters yönde negatif korelasyon da aynı riski taşır).
+
+        Returns:
+            tuple: (sembol, korelasyon) veya açık pozisyon/veri yoksa (None, None)
+        """
+        exposure = self.exposure if exposure is None else exposure
+        best = (None, None)
+        for other, other_side in exposure.items():
+            if other == symbol:
+                continue
+            corr = self.correlation(symbol, other)
+            if corr is None:
+                continue
+            if other_side != side:
+                corr = -corr
+            if best[1] is None or corr > best[1]:
+                best = (other, corr)
+        return best
+
+    # ------------------------------------------------------------------
+    # Açık pozisyonlar ve giriş filtresi
+    # ------------------------------------------------------------------
+    def set_exposure(self, positions):
+        """fetch_positions sonucundan açık pozisyon yönlerini al (ardından refresh ile mumları tamamla)"""
+        with self._lock:
+            self.exposure = {
+                _pair(p['symbol']): _position_side(p)
+                for p in positions if float(p.get('contracts') or 0) > 0
+            }
+
+    def add_exposure(self, symbol, side):
+        """Bu turda açılan pozisyonu ekle (sonraki adaylar buna karşı da kontrol edilir)"""
+        with self._lock:
+            self.exposure[_pair(symbol)] = side
+
+    def check(self, symbol, side, limit=None):
+        """
+        Giriş filtresi - sadece bellekteki matris (O(k), istek atılmaz)
+
+        Returns:
+            tuple: Limit aşıldıysa (sembol, korelasyon), yoksa None
+        """
+        limit = TRADE_SETTINGS['MAX_CORRELATION'] if limit is None else limit
+        self.metrics['checks'] += 1
+        exposure = dict(self.exposure)
+        if not exposure:
+            return None
+        other, corr = self.max_correlation(symbol, side, exposure)
+        if corr is None or corr <= limit:
+            return None
+        self.metrics['rejected'] += 1
+        return other, corr
+
+    def report(self):
+        """Korelasyon motoru metrikleri"""
+        print(f"\n🔗 KORELASYON ({len(self.symbols)} sembol, pencere {self.window} mum):")
+        for name, value in self.metrics.items():
+            print(f"• {name}: {value}")
+        return self.metrics
+
+
+_correlation = None
+_correlation_lock = threading.Lock()
+
+
+def get_correlation():
+    """Süreç genelinde tek korelasyon motoru (TRADE_SETTINGS['MAX_CORRELATION'] kapalıysa None)"""
+    global _correlation
+    if not TRADE_SETTINGS['MAX_CORRELATION']:
+        return None
+    with _correlation_lock:
+        if _correlation is None:
+            _correlation = RollingCorrelation()
+        return _correlation
@@ -0,0 +1,400 @@
+"""
+Borsa kasetleri - canlı çalışmanın istek/yanıtlarını kaydet, ağsız ve deterministik tekrar oynat
+
+- RecordingExchange: ccxt exchange'i (veya SimExchange'i) sarar, ağ isteği yapan metotların
+  argümanlarını, yanıtlarını (veya hatalarını), zamanını ve süresini kasete yazar
+- ReplayExchange: kaseti aynı arayüzle geri oynatır; check_coin -> SignalValidator ->
+  SignalScore -> open_futures_position yolu gerçek piyasa verisiyle, ağa çıkmadan çalışır
+- Gecikme: 'zero' (sadece CPU maliyeti ölçülür), 'original' (kayıttaki süreler beklenir)
+  veya çarpan (0.5 = yarı süre). Sanal saat her yanıtta kayıttaki zamana ilerler.
+
+Kaset: gzip'li JSON satırları (ilk satır başlık). Mumlar sembol başına tabloda bir kez
+yazılır; fetch_ohlcv kaydı sadece aralığı tutar (turlar arası tekrar eden mumlar yer kaplamaz).
+Aynı çağrı birden fazla kaydedildiyse sırayla, tükenince son yanıt verilir. Kod değişip çağrı biraz farklılaşırsa (başka limit,
+yeni clientOrderId) aynı metot + sembol için kayıtlı yanıt kullanılır; mumlar limite kırpılır.
+
+Kullanım:
+    python core/exchange_cassette.py record data/cassettes/run.jsonl.gz --passes 1
+    python core/exchange_cassette.py record data/cassettes/sim.jsonl.gz --sim 200
+    python core/exchange_cassette.py replay data/cassettes/run.jsonl.gz --latency zero --repeat 3
+"""
+import sys
+import os
+import gzip
+import json
+import time
+import inspect
+import argparse
+import threading
+
+# Core klasörünü path'e ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from core.lazy_import import lazy_import
+ccxt = lazy_import('ccxt')
+from core.sim_exchange import VirtualClock, quiet
+
+CASSETTE_VERSION = 1
+
+# Ağ isteği yapan metotlar (diğer attribute'lar doğrudan sarılan exchange'den gelir)
+RECORDED_METHODS = [
+    'load_markets', 'load_time_difference',
+    'fetch_ohlcv', 'fetch_ticker', 'fetch_tickers', 'fetch_balance', 'fetch_positions',
+    'fetch_open_orders', 'fetch_order',
+    'create_order', 'create_market_order', 'cancel_order',
+    'set_leverage', 'set_margin_mode', 'fapiPrivate_post_margintype', 'fapiPrivate_post_leverage',
+]
+
+# Her çalışmada değişen parametreler eşleştirme anahtarına girmez
+VOLATILE_PARAMS = {'newClientOrderId', 'clientOrderId'}
+
+_signatures = {}
+
+
+def _signature(method):
+    """ccxt.binance imzası - aynı çağrının farklı yazılışları (konumsal/isimli) aynı anahtarı verir"""
+    if method not in _signatures:
+        try:
+            _signatures[method] = inspect.signature(getattr(ccxt.binance, method))
+        except (AttributeError, TypeError, ValueError):
+            _signatures[method] = None
+    return _signatures[method]
+
+
+def call_arguments(method, args, kwargs):
+    """Çağrının isimli argümanları (varsayılanlar dahil, değişken parametreler hariç)"""
+    signature = _signature(method)
+    if signature is None:
+        arguments = {'args': list(args), **kwargs}
+    else:
+        try:
+            bound = signature.bind(None, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            arguments.pop('self', None)
+        except TypeError:
+            arguments = {'args': list(args), **kwargs}
+    for key, value in list(arguments.items()):
+        if isinstance(value, dict):
+            arguments[key] = {k: v for k, v in value.items() if k not in VOLATILE_PARAMS}
+    return arguments
+
+
+def _json_default(value):
+    # NumPy skalerleri (SimExchange, market filtreleri)
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def call_key(method, arguments):
+    return f"{method}:{json.dumps(arguments, sort_keys=True, default=_json_default)}"
+
+
+def _first_symbol(arguments):
+    """Eşleştirme yedeği için sembol (params içindeki 'symbol' dahil)"""
+    symbol = arguments.get('symbol')
+    if symbol is None and isinstance(arguments.get('params'), dict):
+        symbol = arguments['params'].get('symbol')
+    if symbol is None and arguments.get('args'):
+        symbol = arguments['args'][0]
+    return symbol if isinstance(symbol, str) else None
+
+
+class RecordingExchange:
+    """
+    Exchange sarmalayıcı - RECORDED_METHODS çağrılarını kasete yazar
+
+    Args:
+        exchange: ccxt.binance veya SimExchange
+        path (str): Kaset dosyası (.jsonl.gz)
+    """
+    def __init__(self, exchange, path):
+        object.__setattr__(self, '_exchange', exchange)
+        object.__setattr__(self, '_lock', threading.Lock())
+        object.__setattr__(self, 'records', 0)
+        object.__setattr__(self, '_candles', {})
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        stream = gzip.open(path, 'wt', encoding='utf-8')
+        object.__setattr__(self, '_stream', stream)
+        object.__setattr__(self, 'path', path)
+        self._write({
+            'version': CASSETTE_VERSION, 'exchange': getattr(exchange, 'id', None),
+            'ccxt': getattr(ccxt, '__version__', None), 'created': time.time(),
+        })
+
+    def _write(self, record):
+        with self._lock:
+            line = None
+            if record.get('m') == 'fetch_ohlcv' and record.get('r'):
+                # Mum tablosu ve çağrı kaydı aynı kilit altında (paralel taramada sıra bozulmaz)
+                line = self._compact_ohlcv(record)
+            if line is None:
+                line = json.dumps(record, separators=(',', ':'), default=_json_default)
+            self._stream.write(line + '\n')
+
+    def _compact_ohlcv(self, record):
+        """Yeni/değişen mumları tabloya yaz, kayıtta sadece aralığı tut"""
+        rows = record['r']
+        step = rows[1][0] - rows[0][0] if len(rows) > 1 else 0
+        if any(rows[i][0] != rows[0][0] + i * step for i in range(len(rows))):
+            return None
+        table = self._candles.setdefault((record['a'].get('symbol'), record['a'].get('timeframe')), {})
+        changed = [row for row in rows if table.get(row[0]) != row]
+        for row in changed:
+            table[row[0]] = row
+        compact = dict(record, r={'$ohlcv': [rows[0][0], step, len(rows)]})
+        lines = [json.dumps(compact, separators=(',', ':'), default=_json_default)]
+        if changed:
+            candles = {'c': [record['a'].get('symbol'), record['a'].get('timeframe')], 'rows': changed}
+            lines.insert(0, json.dumps(candles, separators=(',', ':'), default=_json_default))
+        return '\n'.join(lines)
+
+    def __getattr__(self, name):
+        value = getattr(self._exchange, name)
+        if name in RECORDED_METHODS:
+            return self._recorder(name, value)
+        return value
+
+    def __setattr__(self, name, value):
+        setattr(self._exchange, name, value)
+
+    def _recorder(self, method, func):
+        def call(*args, **kwargs):
+            record = {'m': method, 'a': call_arguments(method, args, kwargs), 'ts': self._exchange.milliseconds()}
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                record['e'] = [type(e).__name__, str(e)]
+                raise
+            else:
+                record['r'] = result
+                return result
+            finally:
+                record['ms'] = round((time.perf_counter() - start) * 1000, 3)
+                self._write(record)
+                object.__setattr__(self, 'records', self.records + 1)
+        return call
+
+    def close(self):
+        with self._lock:
+            self._stream.close()
+
+
+def read_cassette(path):
+    """Kaset dosyası -> (başlık, kayıtlar)"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        if header.get('version') != CASSETTE_VERSION:
+            raise ValueError(f"Desteklenmeyen kaset sürümü: {header.get('version')}")
+        records = []
+        candles = {}
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if 'c' in record:
+                table = candles.setdefault(tuple(record['c']), {})
+                for row in record['rows']:
+                    table[row[0]] = row
+                continue
+            reference = record.get('r')
+            if isinstance(reference, dict) and '$ohlcv' in reference:
+                # Mumlar kayıt anındaki tablo durumundan (aktif mum o anki haliyle)
+                first, step, count = reference['$ohlcv']
+                table = candles[(record['a'].get('symbol'), record['a'].get('timeframe'))]
+                record['r'] = [table[first + i * step] for i in range(count)]
+            records.append(record)
+    return header, records
+
+
+class ReplayExchange:
+    """
+    Kasetten yanıt veren exchange (ağ bağlantısı yok)
+
+    Args:
+        path (str): Kaset dosyası
+        latency: 'zero', 'original' veya kayıttaki sürelerin çarpanı (float)
+    """
+    def __init__(self, path, latency='zero'):
+        self.header, records = read_cassette(path)
+        self.latency = {'zero': 0.0, 'original': 1.0}.get(latency, latency)
+        self.latency = float(self.latency)
+
+        self._exact = {}
+        self._by_symbol = {}
+        self._served = {}
+        for record in records:
+            key = call_key(record['m'], record['a'])
+            self._exact.setdefault(key, []).append(record)
+            self._by_symbol.setdefault((record['m'], _first_symbol(record['a'])), []).append(record)
+        self._records = records
+        self._lock = threading.Lock()
+
+        # ccxt ile aynı public attribute'lar
+        self.id = self.header.get('exchange') or 'binance'
+        self.options = {'defaultType': 'future'}
+        self.enableRateLimit = True
+        self.rateLimit = 50
+        self.apiKey = None
+        self.secret = None
+        self.urls = {}
+        start = records[0]['ts'] if records else None
+        self.clock = VirtualClock(start_ms=start, speed=None)
+        self.markets = None
+        self.markets_by_id = None
+        self.currencies = None
+        self.symbols = []
+        self.stats = {'calls': 0, 'exact': 0, 'fallback': 0, 'missing': 0}
+        markets = next((r.get('r') for r in records if r['m'] == 'load_markets' and 'r' in r), None)
+        if markets:
+            self.set_markets(markets)
+
+    # ------------------------------------------------------------------
+    # Yardımcılar
+    # ------------------------------------------------------------------
+    def set_markets(self, markets, currencies=None):
+        self.markets = markets
+        self.symbols = sorted(markets)
+        self.markets_by_id = {}
+        for market in markets.values():
+            self.markets_by_id.setdefault(market['id'], []).append(market)
+        self.currencies = currencies or self.currencies or {}
+
+    def market(self, symbol):
+        if self.markets and symbol in self.markets:
+            return self.markets[symbol]
+        if self.markets_by_id and symbol in self.markets_by_id:
+            candidates = self.markets_by_id[symbol]
+            return next((m for m in candidates if m.get('contract')), candidates[0])
+        unified = symbol.split(':')[0]
+        if self.markets and unified in self.markets:
+            return self.markets[unified]
+        raise ccxt.BadSymbol(f'binance does not have market symbol {symbol}')
+
+    def milliseconds(self):
+        return self.clock.now_ms()
+
+    def subscribe_user_data(self, listener):
+        """Kasette user-data stream yok - emir durumları reconcile ile kasetten gelir"""
+
+    def unsubscribe_user_data(self, listener):
+        pass
+
+    def pairs(self):
+        """Kayıtta taranan coinler (fetch_ohlcv sırasıyla)"""
+        seen = {}
+        for record in self._records:
+            if record['m'] == 'fetch_ohlcv':
+                seen.setdefault(record['a'].get('symbol'), None)
+        return [symbol for symbol in seen if symbol]
+
+    def _next(self, queue_key, queue):
+        index = self._served.get(queue_key, 0)
+        self._served[queue_key] = index + 1
+        return queue[min(index, len(queue) - 1)]
+
+    def _find(self, method, arguments):
+        key = call_key(method, arguments)
+        with self._lock:
+            self.stats['calls'] += 1
+            queue = self._exact.get(key)
+            if queue:
+                self.stats['exact'] += 1
+                return self._next(key, queue), False
+            fallback_key = (method, _first_symbol(arguments))
+            queue = self._by_symbol.get(fallback_key)
+            if method == 'fetch_ohlcv' and queue:
+                # Aynı zaman dilimindeki en uzun kayıt, istenen limite kırpılır
+                queue = [r for r in queue if r['a'].get('timeframe') == arguments.get('timeframe')] or None
+                if queue:
+                    queue = [max(queue, key=lambda r: len(r.get('r') or []))]
+            if queue:
+                self.stats['fallback'] += 1
+                return self._next(fallback_key, queue), True
+            self.stats['missing'] += 1
+        raise ccxt.ExchangeNotAvailable(f'binance Kasette kayıt yok: {key[:200]}')
+
+    def _replay(self, method, args, kwargs):
+        arguments = call_arguments(method, args, kwargs)
+        record, fallback = self._find(method, arguments)
+        if self.latency:
+            time.sleep(record.get('ms', 0) / 1000 * self.latency)
+        # Sanal saat kayıttaki yanıt zamanına ilerler (geri gitmez)
+        target = record['ts'] + record.get('ms', 0)
+        now = self.clock.now_ms()
+        if target > now:
+            self.clock.advance(target - now)
+
+        if 'e' in record:
+            name, message = record['e']
+            error = getattr(ccxt, name, None)
+            if not (isinstance(error, type) and issubclass(error, Exception)):
+                error = ccxt.ExchangeError
+            raise error(message)
+        # Çağıran yanıtı değiştirebilir - kasetteki kayıt bozulmasın
+        result = json.loads(json.dumps(record['r']))
+        if method == 'fetch_ohlcv' and fallback and isinstance(result, list):
+            since = arguments.get('since')
+            if since is not None:
+                result = [row for row in result if row[0] >= since]
+            limit = arguments.get('limit')
+            if limit:
+                result = result[:limit] if since is not None else result[-limit:]
+        if method == 'load_markets' and result:
+            self.set_markets(result)
+        return result
+
+    def __getattr__(self, name):
+        if name in RECORDED_METHODS:
+            return lambda *args, **kwargs: self._replay(name, args, kwargs)
+        raise AttributeError(name)
+
+    def report(self):
+        s = self.stats
+        print(f"📼 Kaset: {s['calls']} çağrı, {s['exact']} birebir, {s['fallback']} yaklaşık, {s['missing']} eksik")
+
+
+if __name__ == "__main__":
+    from monitor_multiple import monitor_all_coins, load_config
+
+    parser = argparse.ArgumentParser(description="Borsa kaseti kaydet / oynat")
+    parser.add_argument('action', choices=['record', 'replay'])
+    parser.add_argument('path', help="Kaset dosyası (.jsonl.gz)")
+    parser.add_argument('--passes', type=int, default=1, help="Tarama turu sayısı")
+    parser.add_argument('--sim', type=int, default=None, metavar='SEMBOL', help="Canlı yerine SimExchange kaydet")
+    parser.add_argument('--latency', default='zero', help="'zero', 'original' veya çarpan")
+    parser.add_argument('--repeat', type=int, default=1, help="Oynatma tekrar sayısı")
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    if args.action == 'record':
+        pairs = None
+        if args.sim:
+            from core.sim_exchange import SimExchange
+            pairs = [f"SIM{i:04d}/USDT" for i in range(args.sim)]
+            exchange = SimExchange(pairs, clock=VirtualClock(speed=None), on_rate_limit='wait')
+        else:
+            from core.exchange_factory import get_exchange
+            exchange = get_exchange(load_config(), market_type='future')
+        recorder = RecordingExchange(exchange, args.path)
+        start = time.perf_counter()
+        try:
+            with quiet(args.verbose):
+                monitor_all_coins(recorder, pairs, max_passes=args.passes)
+        finally:
+            recorder.close()
+        print(f"📼 {recorder.records} çağrı kaydedildi ({time.perf_counter() - start:.1f} sn): {args.path} "
+              f"({os.path.getsize(args.path) / 1024:.0f} KB)")
+    else:
+        latency = args.latency if args.latency in ('zero', 'original') else float(args.latency)
+        for run in range(args.repeat):
+            replay = ReplayExchange(args.path, latency=latency)
+            start = time.perf_counter()
+            with quiet(args.verbose):
+                monitor_all_coins(replay, replay.pairs(), max_passes=args.passes)
+            print(f"▶️ Oynatma {run + 1}: {time.perf_counter() - start:.2f} sn")
+            replay.report()
@@ -0,0 +1,181 @@
+"""
+Süreç genelinde tek exchange fabrikası
+
+- Aynı ayarlar için tek ccxt.binance nesnesi (ve ortak HTTP oturumu) kullanılır
+- Market bilgisi (exchangeInfo) sürümlü bir disk önbelleğinde TTL ile tutulur
+- Önbellekte hazır symbol <-> exchange id eşlemesi bulunur
+
+Sıcak başlangıçta load_markets() ağa çıkmadan diskten yüklenir.
+"""
+import os
+import json
+import time
+import threading
+from core.lazy_import import lazy_import
+ccxt = lazy_import('ccxt')
+requests = lazy_import('requests')
+from Trade.trade_settings import TRADE_SETTINGS
+
+# Önbellek formatı değişirse artır
+CACHE_VERSION = 1
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache')
+
+_exchanges = {}
+_symbol_maps = {}
+_lock = threading.Lock()
+
+# Tüm exchange nesnelerinin paylaştığı HTTP oturumu (keep-alive bağlantıları yeniden kullanılır)
+_session = None
+
+
+def _get_session():
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
+
+def exchange_environment(exchange):
+    """'testnet' veya 'live' (önbellek ve checkpoint dosyaları ortama göre ayrılır)"""
+    urls = getattr(exchange, 'urls', {})
+    return 'testnet' if urls.get('test') and urls.get('api') == urls.get('test') else 'live'
+
+
+def _cache_path(exchange):
+    sandbox = exchange_environment(exchange)
+    market_type = exchange.options.get('defaultType', 'spot')
+    return os.path.join(CACHE_DIR, f"markets_{exchange.id}_{market_type}_{sandbox}.json")
+
+
+def _build_symbol_map(markets):
+    """Unified symbol <-> exchange id eşlemesi"""
+    to_id = {symbol: market['id'] for symbol, market in markets.items()}
+    to_symbol = {}
+    for symbol, market in markets.items():
+        # Aynı id birden fazla markette olabilir (spot/futures) - ilki yeterli
+        to_symbol.setdefault(market['id'], symbol)
+    return {'to_id': to_id, 'to_symbol': to_symbol}
+
+
+def _read_cache(path, ttl):
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('version') != CACHE_VERSION or data.get('ccxt') != ccxt.__version__:
+        return None
+    if time.time() - data.get('created', 0) > ttl:
+        return None
+    return data
+
+
+def _write_cache(path, exchange):
+    data = {
+        'version': CACHE_VERSION,
+        'ccxt': ccxt.__version__,
+        'created': time.time(),
+        'markets': exchange.markets,
+        'currencies': exchange.currencies,
+        'symbol_map': _build_symbol_map(exchange.markets),
+    }
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    # Yarım yazılmış dosya okunmasın
+    os.replace(tmp_path, path)
+    return data
+
+
+def load_markets_cached(exchange, ttl=None, reload=False):
+    """
+    Marketleri disk önbelleğinden yükle, yoksa/eskiyse borsadan al ve kaydet
+
+    Args:
+        exchange: ccxt exchange nesnesi
+        ttl (int): Önbellek geçerlilik süresi (saniye)
+        reload (bool): Önbelleği yok say
+
+    Returns:
+        dict: markets
+    """
+    if ttl is None:
+        ttl = TRADE_SETTINGS['MARKETS_CACHE_TTL']
+    path = _cache_path(exchange)
+
+    data = None if reload else _read_cache(path, ttl)
+    if data is not None:
+        exchange.set_markets(data['markets'], data['currencies'])
+        print(f"⚡ {len(exchange.markets)} market önbellekten yüklendi")
+    else:
+        exchange.load_markets(reload=True)
+        try:
+            data = _write_cache(path, exchange)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️ Market önbelleği yazılamadı: {str(e)}")
+            data = {'symbol_map': _build_symbol_map(exchange.markets)}
+
+    _symbol_maps[id(exchange)] = data['symbol_map']
+    return exchange.markets
+
+
+def get_exchange(config=None, market_type='future', authenticated=True, load_markets=True):
+    """
+    Paylaşılan exchange nesnesini döndür (yoksa oluştur)
+
+    Args:
+        config (dict): config.json içeriği (api_key, api_secret, testnet)
+        market_type (str): 'future' veya 'spot'
+        authenticated (bool): API anahtarları kullanılsın mı
+        load_markets (bool): Marketleri önbellekten/borsadan yükle
+    """
+    config = config or {}
+    api_key = config.get('api_key') if authenticated else None
+    testnet = bool(config.get('testnet', False))
+    key = (market_type, api_key, testnet)
+
+    with _lock:
+        exchange = _exchanges.get(key)
+        if exchange is None:
+            params = {
+                'enableRateLimit': True,
+                'options': {
+                    'defaultType': market_type,
+                    'adjustForTimeDifference': True
+                },
+                'timeout': 30000,
+                'session': _get_session(),
+            }
+            if api_key:
+                params['apiKey'] = api_key
+                params['secret'] = config.get('api_secret')
+            exchange = ccxt.binance(params)
+
+            if testnet:
+                exchange.set_sandbox_mode(True)
+                print("🔧 TESTNET modu aktif!")
+
+            _exchanges[key] = exchange
+
+        if load_markets and not exchange.markets:
+            load_markets_cached(exchange)
+
+    return exchange
+
+
+def to_exchange_symbol(exchange, symbol):
+    """'BTC/USDT' -> 'BTCUSDT'"""
+    symbol_map = _symbol_maps.get(id(exchange))
+    if symbol_map and symbol in symbol_map['to_id']:
+        return symbol_map['to_id'][symbol]
+    return symbol.replace('/', '')
+
+
+def to_unified_symbol(exchange, market_id):
+    """'BTCUSDT' -> 'BTC/USDT'"""
+    symbol_map = _symbol_maps.get(id(exchange))
+    if symbol_map and market_id in symbol_map['to_symbol']:
+        return symbol_map['to_symbol'][market_id]
+    return market_id
@@ -1,13 +1,18 @@
-import ccxt
 import pandas as pd
 from datetime import datetime, timezone, timedelta
 import json
 import os
+import sys
+
+# Proje kökünü path'e ekle (Math modülleri core.Math üzerinden import eder)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from Math.volume_analyzer import VolumeAnalyzer
 from Math.stoch_rsi import calculate_stoch_rsi, analyze_stoch_rsi_signals
 from Math.rsi_indicator import calculate_rsi, analyze_rsi_signals
 from Math.bollinger_bands import calculate_bollinger_bands, analyze_bb_signals
 from Math.ema_ribbon import calculate_ema_signals
+from core.exchange_factory import get_exchange
 import time
 
 def load_config():
@@ -28,16 +33,8 @@ def test_indicators():
         return
 
     try:
-        # Binance client'ı başlat
-        exchange = ccxt.binance({
-            'apiKey': config['api_key'],
-            'secret': config['api_secret'],
-            'enableRateLimit': True,
-            'options': {
-                'defaultType': 'spot',
-                'adjustForTimeDifference': True
-            }
-        })
+        # Binance client'ı başlat (her döngüde aynı nesne kullanılır)
+        exchange = get_exchange(config, market_type='spot')
         
         # BTC/USDT için veri al
         symbol = 'BTC/USDT'
@@ -0,0 +1,214 @@
+"""
+Binance kline dump arşivlerini (data.binance.vision) yerel mum deposuna aktar
+
+- <SEMBOL>-<tf>-YYYY-MM.zip (aylık) ve <SEMBOL>-<tf>-YYYY-MM-DD.zip (günlük) dosyaları
+- Zip diske açılmaz; CSV zip içinden akış olarak okunup doğrudan NumPy kolonlarına çevrilir
+- Süreklilik kontrol edilir (boşluk, tekrar, ay sınırı), sonuç CandleStore'a birleştirilir
+- Dosyalar paralel süreçlerde ayrıştırılır
+- Spot ve futures dump'ları aynı dosya adını kullanır; piyasa (--market) zorunludur,
+  yolu diğer piyasayı gösteren (.../spot/... veya .../futures/...) dosyalar atlanır
+
+Kullanım:
+    python core/kline_ingest.py --market futures ~/dumps/futures/um/monthly/klines
+    python core/kline_ingest.py --market spot ~/dumps/spot --workers 8 --store /data/candles
+"""
+import sys
+import os
+import re
+import time
+import zipfile
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+# Core klasörünü path'e ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from core.lazy_import import lazy_import
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+from core.candle_store import CandleStore, COLUMNS, MARKETS, timeframe_ms
+
+DUMP_PATTERN = re.compile(
+    r'^(?P<symbol>[A-Z0-9]+)-(?P<timeframe>\d+[smhdwM])-(?P<year>\d{4})-(?P<month>\d{2})(?:-(?P<day>\d{2}))?\.zip$'
+)
+
+# Binance kline CSV kolonları (ilk 6'sı kullanılır)
+CSV_DTYPES = {
+    'timestamp': 'int64', 'open': 'float64', 'high': 'float64',
+    'low': 'float64', 'close': 'float64', 'volume': 'float64',
+}
+
+# 2025'ten sonraki spot dump'ları mikrosaniye kullanır
+MICROSECOND_THRESHOLD = 10 ** 14
+
+
+def find_dumps(paths):
+    """Klasörlerdeki dump dosyaları: [(yol, sembol, tf, dönem)]"""
+    dumps = []
+    for path in paths:
+        if os.path.isfile(path):
+            candidates = [path]
+        else:
+            candidates = [
+                os.path.join(directory, name)
+                for directory, _, names in os.walk(path)
+                for name in names
+            ]
+        for candidate in candidates:
+            match = DUMP_PATTERN.match(os.path.basename(candidate))
+            if match:
+                period = f"{match['year']}-{match['month']}" + (f"-{match['day']}" if match['day'] else '')
+                dumps.append((candidate, match['symbol'], match['timeframe'], period))
+    return sorted(dumps, key=lambda d: (d[1], d[2], d[3]))
+
+
+def dump_market(path):
+    """data.binance.vision yolundan piyasa ('spot', 'futures' veya bilinmiyorsa None)"""
+    parts = os.path.normpath(os.path.abspath(path)).split(os.sep)
+    found = [market for market in MARKETS if market in parts]
+    return found[0] if len(found) == 1 else None
+
+
+def parse_dump(path):
+    """
+    Zip içindeki CSV'yi diske açmadan kolonlara çevir
+
+    Returns:
+        tuple: (COLUMNS anahtarlı NumPy dizileri, açılmış CSV boyutu)
+    """
+    with zipfile.ZipFile(path) as archive:
+        names = [name for name in archive.namelist() if name.endswith('.csv')]
+        if len(names) != 1:
+            raise ValueError(f"Zip içinde tek CSV bekleniyordu: {names}")
+        csv_size = archive.getinfo(names[0]).file_size
+        with archive.open(names[0]) as stream:
+            # Yeni dump'larda başlık satırı var, eskilerde yok
+            header = None if stream.peek(1)[:1].isdigit() else 0
+            frame = pd.read_csv(
+                stream, header=header, usecols=range(6), names=COLUMNS,
+                dtype=CSV_DTYPES, engine='c'
+            )
+    columns = {name: frame[name].to_numpy() for name in COLUMNS}
+    if len(columns['timestamp']) and columns['timestamp'][0] >= MICROSECOND_THRESHOLD:
+        columns['timestamp'] = columns['timestamp'] // 1000
+    return columns, csv_size
+
+
+def validate(columns, timeframe, period):
+    """
+    Süreklilik kontrolü
+
+    Returns:
+        list: Uyarı mesajları (boşsa veri sürekli)
+    """
+    issues = []
+    timestamps = columns['timestamp']
+    if not len(timestamps):
+        return ["boş dosya"]
+    step = timeframe_ms(timeframe)
+    diffs = np.diff(timestamps)
+    if (diffs <= 0).any():
+        issues.append(f"{int((diffs <= 0).sum())} sırasız/tekrarlı mum")
+    if step is not None:
+        gaps = np.flatnonzero(diffs > step)
+        if len(gaps):
+            missing = int(((diffs[gaps] // step) - 1).sum())
+            first_gap = pd.Timestamp(int(timestamps[gaps[0]]), unit='ms')
+            issues.append(f"{len(gaps)} boşluk ({missing} eksik mum, ilki {first_gap})")
+        if timestamps[0] % step:
+            issues.append("mum zamanları zaman dilimine hizalı değil")
+        # Aylık dosya ayın ilk mumuyla başlamalı (listeleme ayı hariç - uyarı)
+        period_start = pd.Timestamp(period).value // 10 ** 6
+        if timestamps[0] != period_start:
+            issues.append(f"dönem başı eksik ({pd.Timestamp(int(timestamps[0]), unit='ms')})")
+    return issues
+
+
+def _parse_job(job):
+    path, symbol, timeframe, period = job
+    try:
+        columns, csv_size = parse_dump(path)
+        return job, columns, csv_size, validate(columns, timeframe, period), None
+    except Exception as e:
+        return job, None, 0, [], str(e)
+
+
+def ingest(paths, market, store=None, workers=None):
+    """
+    Dump dosyalarını depoya aktar
+
+    Args:
+        paths (list): Dosya veya klasörler
+        market (str): Dump'ların piyasası ('futures' veya 'spot')
+        store (CandleStore): Hedef depo (aynı piyasa)
+        workers (int): Ayrıştırma süreç sayısı
+
+    Returns:
+        dict: {'files', 'rows', 'bytes' (zip), 'csv_bytes', 'errors', 'warnings', 'seconds'}
+    """
+    store = store or CandleStore(market=market)
+    if store.market != market:
+        raise ValueError(f"Depo piyasası ({store.market}) dump piyasasıyla ({market}) aynı değil")
+    stats = {'files': 0, 'rows': 0, 'bytes': 0, 'csv_bytes': 0, 'errors': 0, 'warnings': 0, 'seconds': 0.0}
+    dumps = []
+    for dump in find_dumps(paths):
+        other = dump_market(dump[0])
+        if other is not None and other != market:
+            stats['errors'] += 1
+            print(f"❌ {dump[0]}: {other} dump'ı, {market} deposuna yazılmadı")
+            continue
+        dumps.append(dump)
+    if not dumps:
+        print("❌ Dump dosyası bulunamadı")
+        return stats
+
+    print(f"📦 {len(dumps)} dump dosyası bulundu")
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+
+    def results():
+        if workers == 1:
+            yield from map(_parse_job, dumps)
+            return
+        # Havuz döngü bitince (veya hata olursa) kapatılır
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from pool.map(_parse_job, dumps, chunksize=4)
+
+    # Ayrıştırma süreçlerde, depoya yazma ana süreçte (aynı ay dosyasına tek yazıcı)
+    for (path, symbol, timeframe, period), columns, csv_size, issues, error in results():
+        if error:
+            stats['errors'] += 1
+            print(f"❌ {os.path.basename(path)}: {error}")
+            continue
+        for issue in issues:
+            stats['warnings'] += 1
+            print(f"⚠️ {symbol} {timeframe} {period}: {issue}")
+        store.write(symbol, timeframe, columns)
+        stats['files'] += 1
+        stats['rows'] += len(columns['timestamp'])
+        stats['bytes'] += os.path.getsize(path)
+        stats['csv_bytes'] += csv_size
+
+    stats['seconds'] = time.perf_counter() - start
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Binance kline dump aktarımı")
+    parser.add_argument('paths', nargs='+', help="Zip dosyaları veya klasörler")
+    parser.add_argument('--market', required=True, choices=MARKETS, help="Dump'ların piyasası")
+    parser.add_argument('--store', default=None, help="Depo klasörü (varsayılan: data/candles)")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    store = CandleStore(args.store, market=args.market) if args.store else CandleStore(market=args.market)
+    stats = ingest(args.paths, args.market, store, args.workers)
+
+    seconds = stats['seconds'] or 1e-9
+    print(f"\n✅ {stats['files']} dosya, {stats['rows']:,} mum, "
+          f"{stats['bytes'] / 1e6:.1f} MB zip / {stats['csv_bytes'] / 1e6:.1f} MB CSV - {seconds:.1f} sn "
+          f"({stats['rows'] / seconds:,.0f} mum/sn, {stats['csv_bytes'] / 1e6 / seconds:.1f} MB/sn CSV)")
+    if stats['warnings'] or stats['errors']:
+        print(f"⚠️ {stats['warnings']} uyarı, {stats['errors']} hata")
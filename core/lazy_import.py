@@ -0,0 +1,47 @@
+"""
+Tembel (lazy) import - ağır bağımlılıklar (ccxt, pandas, numpy) ilk kullanımda yüklenir
+
+Kullanım:
+    from core.lazy_import import lazy_import
+    pd = lazy_import('pandas')   # import pandas as pd yerine
+"""
+import sys
+import types
+import threading
+import importlib
+
+_load_lock = threading.RLock()
+
+
+def _load(proxy):
+    """Gerçek modülü yükle ve içeriğini proxy'ye kopyala"""
+    with _load_lock:
+        module = importlib.import_module(proxy.__name__)
+        # Sonraki erişimler __getattr__'a düşmeden doğrudan proxy'den okunur
+        proxy.__dict__.update(module.__dict__)
+    return module
+
+
+class LazyModule(types.ModuleType):
+    """İlk attribute erişiminde gerçek modülü yükleyen modül vekili"""
+    def __getattr__(self, attr):
+        # Sadece proxy'de bulunmayan attribute'lar için çağrılır
+        return getattr(_load(self), attr)
+
+    def __dir__(self):
+        return dir(_load(self))
+
+    def __repr__(self):
+        return f"<lazy module '{self.__name__}'>"
+
+
+def lazy_import(name):
+    """
+    Modülü tembel olarak import et
+
+    Modül zaten yüklenmişse gerçek modül döner (ek maliyet yok).
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
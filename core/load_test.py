@@ -0,0 +1,150 @@
+"""
+Simüle borsa üzerinde yük testi - Binance'e bağlanmadan
+tarama hızı ve emir yolu gecikmesini ölçer
+
+Kullanım:
+    python core/load_test.py --symbols 100 500 2000 --latency 40 10
+"""
+import sys
+import os
+import io
+import time
+import argparse
+import contextlib
+
+# Core klasörünü path'e ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from core.sim_exchange import SimExchange, VirtualClock, quiet
+from core.candidate_funnel import CandidateFunnel
+from core.Math.indicator_registry import registry
+from Trade.trade_settings import TRADE_SETTINGS
+from monitor_multiple import check_coin, load_coin_list, monitor_all_coins
+from core.Math.range_filter import RangeFilter
+from Trade.futures_position import open_futures_position
+
+
+def build_universe(size):
+    """coinlist.json'daki coinler + gerekirse sentetik semboller"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        coins = load_coin_list() or []
+    coins = list(dict.fromkeys(coins))[:size]
+    i = 0
+    while len(coins) < size:
+        coins.append(f"SIM{i:04d}/USDT")
+        i += 1
+    return coins
+
+
+def measure_scan(exchange, pairs, verbose=False):
+    """Tüm coinler için check_coin - duvar ve sanal süre"""
+    rf = RangeFilter(period=100, multiplier=3.0)
+    signals = 0
+    wall_start = time.perf_counter()
+    virtual_start = exchange.clock.now_ms()
+    with quiet(verbose):
+        for symbol in pairs:
+            if check_coin(exchange, symbol, rf):
+                signals += 1
+    wall = time.perf_counter() - wall_start
+    virtual = (exchange.clock.now_ms() - virtual_start) / 1000
+    return {
+        'wall_s': wall,
+        'virtual_s': virtual,
+        'symbols_per_s': len(pairs) / wall if wall else float('inf'),
+        'opened': signals,
+    }
+
+
+def measure_memory(exchange, pairs, count=50):
+    """Tam indikatör setiyle sembol başına bellek (byte)"""
+    funnel = CandidateFunnel(exchange, RangeFilter(period=100, multiplier=3.0))
+    registry.clear()
+    for symbol in pairs[:count]:
+        funnel.indicators(funnel.fetch(symbol), symbol)
+    memo = registry.memory_usage()
+    frames = funnel.memory['frames']
+    return {
+        'frame_bytes': funnel.memory['bytes'] / frames if frames else 0,
+        'memo_bytes': memo['per_symbol'],
+    }
+
+
+def measure_order_path(exchange, pairs, count, verbose=False):
+    """open_futures_position çağrısı başına gecikme (ms)"""
+    walls = []
+    virtuals = []
+    for symbol in pairs[:count]:
+        ticker = exchange.fetch_ticker(symbol)
+        signal_data = {'symbol': symbol, 'price': ticker['last'], 'type': 'buy'}
+        wall_start = time.perf_counter()
+        virtual_start = exchange.clock.now_ms()
+        with quiet(verbose):
+            open_futures_position(exchange, symbol, signal_data)
+        walls.append((time.perf_counter() - wall_start) * 1000)
+        virtuals.append(exchange.clock.now_ms() - virtual_start)
+    walls.sort()
+    virtuals.sort()
+    if not walls:
+        return None
+    return {
+        'wall_ms_p50': walls[len(walls) // 2],
+        'wall_ms_max': walls[-1],
+        'virtual_ms_p50': virtuals[len(virtuals) // 2],
+        'virtual_ms_max': virtuals[-1],
+    }
+
+
+def run(sizes, latency, speed, orders, monitor_passes, verbose):
+    print(f"\n{'='*60}")
+    print(f"🧪 YÜK TESTİ - gecikme {latency[0]}±{latency[1]} ms, hız {speed}x")
+    print(f"{'='*60}")
+
+    for size in sizes:
+        pairs = build_universe(size)
+        clock = VirtualClock(speed=speed)
+        exchange = SimExchange(pairs, clock=clock, latency_ms=tuple(latency), on_rate_limit='wait')
+        exchange.load_markets()
+
+        memory = measure_memory(exchange, pairs)
+        scan = measure_scan(exchange, pairs, verbose)
+        order_path = measure_order_path(exchange, pairs, orders, verbose)
+
+        print(f"\n📊 {size} sembol:")
+        print(f"• Tarama (duvar): {scan['wall_s']:.2f} sn ({scan['symbols_per_s']:.1f} sembol/sn)")
+        print(f"• Tarama (sanal/piyasa): {scan['virtual_s']:.1f} sn")
+        print(f"• Açılan işlem: {scan['opened']}")
+        print(f"• Bellek ({'düşük' if registry.low_memory else 'normal'} mod): "
+              f"DataFrame {memory['frame_bytes'] / 1024:.1f} KB/sembol, "
+              f"indikatör hafızası {memory['memo_bytes'] / 1024:.1f} KB/sembol")
+        print(f"• Rate limit beklemesi: {exchange.rate_limit_hits}")
+        print(f"• İstekler: {exchange.request_count}")
+        if order_path:
+            print(f"• Emir yolu (duvar): p50 {order_path['wall_ms_p50']:.1f} ms, max {order_path['wall_ms_max']:.1f} ms")
+            print(f"• Emir yolu (sanal): p50 {order_path['virtual_ms_p50']} ms, max {order_path['virtual_ms_max']} ms")
+
+        if monitor_passes:
+            wall_start = time.perf_counter()
+            with quiet(verbose):
+                monitor_all_coins(exchange=exchange, pairs=pairs, max_passes=monitor_passes)
+            print(f"• monitor_all_coins ({monitor_passes} tur): {time.perf_counter() - wall_start:.2f} sn")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simüle borsa ile yük testi")
+    parser.add_argument('--symbols', type=int, nargs='+', default=[100, 500, 1000, 2000])
+    parser.add_argument('--latency', type=float, nargs=2, default=[40, 10], metavar=('ORT', 'SAPMA'))
+    parser.add_argument('--speed', type=float, default=1000.0)
+    parser.add_argument('--orders', type=int, default=20)
+    parser.add_argument('--monitor-passes', type=int, default=0)
+    parser.add_argument('--verbose', action='store_true')
+    parser.add_argument('--low-memory', action='store_true', help="TRADE_SETTINGS['LOW_MEMORY_MODE'] ile çalıştır")
+    args = parser.parse_args()
+
+    if args.low_memory:
+        TRADE_SETTINGS['LOW_MEMORY_MODE'] = True
+        registry.low_memory = True
+
+    run(args.symbols, args.latency, args.speed, args.orders, args.monitor_passes, args.verbose)
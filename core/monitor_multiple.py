@@ -7,20 +7,23 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(current_dir)
 sys.path.append(project_root)
 
-import ccxt
-import pandas as pd
+# Ağır bağımlılıklar (ccxt, pandas) ilk kullanımda yüklenir
+from core.lazy_import import lazy_import
+pd = lazy_import('pandas')
 from core.Math.range_filter import RangeFilter
-from core.Math.rsi_indicator import calculate_rsi
-from core.Math.stoch_rsi import calculate_stoch_rsi
-from core.Math.bollinger_bands import calculate_bollinger_bands
 import time
 from datetime import datetime, timezone, timedelta
 import json
-from signal_validator import SignalValidator
-from signal_score import SignalScore
-from Trade.position_calculator import PositionCalculator
 from Trade.trade_settings import TRADE_SETTINGS, ORDER_TYPES, TRADE_SIDES
-from Trade.futures_position import open_futures_position
+from core.slot_coordinator import open_with_slot
+from core.candidate_funnel import CandidateFunnel
+from core.ranked_scan import RankedScanner
+from core.provisional_signals import ProvisionalSignals
+from Trade.order_tracker import get_order_tracker
+from core.scan_profiler import ScanProfiler
+from core.scan_tiers import ScanTiers
+from core.checkpoint import Checkpoint
+from core.exchange_factory import get_exchange
 
 active_trading_pairs = set()  # Global değişken olarak ekle
 
@@ -81,75 +84,29 @@ def get_usdt_pairs(exchange):
         send_log_to_backend(f"❌ USDT çiftleri alınırken hata: {str(e)}")
         return []
 
-def check_coin(exchange, symbol, rf):
-    """Tek bir coin için kontrol"""
+def check_coin(exchange, symbol, rf, funnel=None, coordinator=None):
+    """Tek bir coin için kontrol (coordinator verilirse işlem paylaşılan slotla açılır)"""
     try:
         print(f"\n🔍 {symbol} analiz ediliyor...")
         
-        ohlcv = exchange.fetch_ohlcv(symbol, '5m', limit=1000)
-        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms').dt.tz_localize('UTC').dt.tz_convert('Europe/Istanbul')
-        df.set_index('timestamp', inplace=True)
+        # Ucuz ön filtreler -> indikatörler -> validasyon -> skor
+        if funnel is None:
+            funnel = CandidateFunnel(exchange, rf)
+        candidate = funnel.evaluate(symbol)
         
-        # Aktif mumu çıkar
-        df = df.iloc[:-1]
-        
-        # İndikatörleri hesapla
-        df = calculate_rsi(df, period=14)
-        df = calculate_stoch_rsi(df)
-        df = calculate_bollinger_bands(df)
-        
-        # EMA'ları hesapla
-        for period in [5, 8, 13, 21, 34, 55, 89, 200]:
-            df[f'ema_{period}'] = df['close'].ewm(span=period, adjust=False).mean()
-        
-        signals = rf.generate_signals(df)
-        
-        # Son kapanmış mumda sinyal var mı?
-        last_buy = signals['buy_signals'].iloc[-1]
-        last_sell = signals['sell_signals'].iloc[-1]
-        
-        if last_buy or last_sell:
-            print("\n📊 Sinyal bulundu...")
-            signal_data = {
-                "symbol": symbol,
-                "time": datetime.now().strftime('%H:%M:%S'),
-                "price": float(df['close'].iloc[-1]),
-                "filter": float(signals['filter'].iloc[-1]),
-                "highTarget": float(signals['upper_band'].iloc[-1]),
-                "lowTarget": float(signals['lower_band'].iloc[-1]),
-                "type": "buy" if last_buy else "sell",
-                "rsi": float(df['rsi'].iloc[-1]),
-                "stoch_rsi_k": float(df['stoch_rsi_k'].iloc[-1]),
-                "stoch_rsi_d": float(df['stoch_rsi_d'].iloc[-1])
-            }
-            
-            # Önce validasyon yap
-            validator = SignalValidator(exchange)
-            validation_result = validator.validate_signal(df, signal_data)
-            
-            if validation_result:
-                # Validasyon başarılıysa skor hesapla
-                scorer = SignalScore(exchange)
-                score = scorer.calculate_score(signal_data)
-                
-                if score >= 9:
-                    print("\n🚀 YÜKSEK SKOR! İşlem açılıyor...")
-                    try:
-                        result = open_futures_position(exchange, symbol, signal_data)
-                        if result:
-                            print("✅ İşlem başarıyla açıldı!")
-                        else:
-                            print("❌ İşlem açılamadı!")
-                        return result
-                    except Exception as e:
-                        print(f"❌ İşlem açma hatası: {str(e)}")
-                        print(f"Hata tipi: {type(e).__name__}")
-                        return False
+        if candidate:
+            print("\n🚀 YÜKSEK SKOR! İşlem açılıyor...")
+            try:
+                result = open_with_slot(coordinator, exchange, symbol, candidate['signal_data'])
+                if result:
+                    print("✅ İşlem başarıyla açıldı!")
                 else:
-                    print(f"\n❌ DÜŞÜK KALİTE SİNYAL - Skor: {score}/18")
-            else:
-                print("\n❌ Validasyon başarısız!")
+                    print("❌ İşlem açılamadı!")
+                return result
+            except Exception as e:
+                print(f"❌ İşlem açma hatası: {str(e)}")
+                print(f"Hata tipi: {type(e).__name__}")
+                return False
             
         return False
             
@@ -179,37 +136,60 @@ def load_coin_list():
         print(f"❌ Coin listesi okunamadı: {str(e)}")
         return None
 
-def monitor_all_coins():
-    # Config'i yükle
-    config = load_config()
-    if not config:
-        print("❌ Config yüklenemedi! Program sonlandırılıyor...")
-        return
+def position_pair(position_symbol):
+    """Pozisyon sembolünü coin listesi formatına çevir ('BTCUSDT', 'BTC/USDT:USDT' -> 'BTC/USDT')"""
+    symbol = position_symbol.split(':')[0]
+    if '/' not in symbol and 'USDT' in symbol:
+        symbol = symbol.replace('USDT', '/USDT')
+    return symbol
 
+def monitor_all_coins(exchange=None, pairs=None, max_passes=None, coordinator=None):
+    """
+    Tüm coinleri izle
+
+    Args:
+        exchange: Hazır exchange nesnesi (örn. sim_exchange.SimExchange). None ise Binance'e bağlanır
+        pairs (list): İzlenecek coinler. None ise coinlist.json'dan okunur
+        max_passes (int): Tarama turu sınırı (yük testi için). None ise sonsuz döngü
+        coordinator (SlotCoordinator): Çok süreçli taramada paylaşılan pozisyon slotları
+            (pairs bu sürecin payı olur, margin type sadece bu coinler için ayarlanır)
+    """
+    scanner = checkpoint = funnel = tiers = tracker = None
     try:
-        # Exchange'i futures modunda başlat
-        exchange = ccxt.binance({
-            'apiKey': config['api_key'],
-            'secret': config['api_secret'],
-            'enableRateLimit': True,
-            'options': {
-                'defaultType': 'future',
-                'adjustForTimeDifference': True
-            },
-            'timeout': 30000
-        })
+        if exchange is None:
+            # Config'i yükle
+            config = load_config()
+            if not config:
+                print("❌ Config yüklenemedi! Program sonlandırılıyor...")
+                return
+
+            # Exchange'i futures modunda başlat (marketler disk önbelleğinden gelir)
+            exchange = get_exchange(config, market_type='future')
         
         exchange.load_time_difference()
         print("✅ Binance Futures bağlantısı başarılı")
         
-        # Önce marketleri yükle
+        # Önce marketleri yükle (fabrika yüklediyse tekrar istek atılmaz)
         print("📊 Marketler yükleniyor...")
         markets = exchange.load_markets()
         print(f"✅ {len(markets)} market yüklendi")
         
+        # Sıcak yeniden başlatma: önceki çalışmanın anlık görüntüsü (simülasyonda kullanılmaz)
+        checkpoint = None
+        state = None
+        if TRADE_SETTINGS['CHECKPOINT_ENABLED'] and getattr(exchange, 'clock', None) is None:
+            checkpoint = Checkpoint(exchange, name=getattr(coordinator, 'owner', None))
+            state = checkpoint.load()
+        
         # Margin type'ı ISOLATED yap
         try:
             futures_symbols = [symbol for symbol in markets if symbol.endswith('/USDT') and markets[symbol]['future']]
+            if coordinator is not None and pairs is not None:
+                # Diğer coinler kendi süreçlerinde ayarlanır
+                futures_symbols = [symbol for symbol in futures_symbols if symbol in pairs]
+            if checkpoint is not None:
+                # Önceki çalışmalarda ayarlananlar için istek atılmaz
+                futures_symbols = [symbol for symbol in futures_symbols if symbol not in checkpoint.margin_symbols]
             print(f"🔄 {len(futures_symbols)} futures çifti için margin type ayarlanıyor...")
             
             for symbol in futures_symbols:
@@ -221,45 +201,98 @@ def monitor_all_coins():
                 except Exception as e:
                     if "No need to change margin type" not in str(e):
                         print(f"⚠️ {symbol} için margin type hatası: {str(e)}")
+                        continue
+                if checkpoint is not None:
+                    checkpoint.add_margin(symbol)
             print("✅ Margin type ayarları tamamlandı")
         except Exception as e:
             print(f"⚠️ Margin type ayarlanamadı: {str(e)}")
         
         rf = RangeFilter(period=100, multiplier=3.0)
+        funnel = CandidateFunnel(exchange, rf)
+        ranked = TRADE_SETTINGS['SCAN_MODE'] == 'ranked'
+        scanner = RankedScanner(exchange, funnel, coordinator=coordinator) if ranked else None
+        # Aktif mumda ön sinyal: kapanışı bekleme süresi fiyat izlemeye kullanılır
+        provisional = ProvisionalSignals(exchange, funnel, coordinator) if TRADE_SETTINGS['PROVISIONAL_SIGNALS'] else None
+        # İsteğe bağlı profil: kill -USR1 <pid> veya data/profile_scan dosyası
+        profiler = ScanProfiler()
+        profiler.install_signal()
+        funnel.profiler = profiler
+        # Sakin coinler soğuk katmana düşer, fiyat RangeFilter'a yaklaşınca tekrar taranır
+        tiers = None
+        if TRADE_SETTINGS['SCAN_TIERS']:
+            tiers = ScanTiers(exchange)
+            funnel.tiers = tiers
+        # Emir durumları user-data stream olaylarıyla takip edilir
+        tracker = None
+        if TRADE_SETTINGS['ORDER_TRACKING']:
+            tracker = get_order_tracker(exchange)
+            tracker.start()
+        if state is not None:
+            # Mum tamponları, katman durumları ve emir defteri - ilk turda sadece eksik mumlar istenir
+            checkpoint.restore(state, funnel, tiers, tracker)
         
         # JSON'dan coin listesini oku
-        pairs = load_coin_list()
+        if pairs is None:
+            pairs = load_coin_list()
         if not pairs:
             print("❌ Coin listesi yüklenemedi!")
             return
             
         print(f"\n📊 Toplam {len(pairs)} coin izleniyor...")
         
-        while True:
+        passes = 0
+        while max_passes is None or passes < max_passes:
+            passes += 1
             try:
+                if provisional is not None:
+                    # Kapanışa kadar fiyatları izle, onaylanan ön sinyallerde işlemi hemen aç
+                    provisional.watch_until_close(skip=active_trading_pairs)
+                elif ranked:
+                    # Kapanan mum için tüm coinleri aynı anda değerlendir
+                    scanner.wait_for_next_close()
+                profiler.begin_pass()
+                
                 # Açık pozisyonları kontrol et
+                snapshot_time = time.time()
                 positions = exchange.fetch_positions()
                 active_positions = [p for p in positions if float(p['contracts']) > 0]
+                if tracker is not None:
+                    # Kaçan olaylar ve yetim SL/TP emirleri için periyodik toplu eşitleme
+                    tracker.maybe_reconcile()
+                if funnel.correlation is not None:
+                    # Korelasyon filtresi bu pozisyonlara karşı uygulanır; taranmayan pozisyon
+                    # coinlerinin mumları burada tamamlanır (emir yolunda istek atılmaz)
+                    funnel.correlation.set_exposure(positions)
+                    funnel.correlation.refresh(exchange, list(funnel.correlation.exposure))
                 
                 
                 active_trading_pairs.clear()
                 for pos in active_positions:
-                    symbol = pos['symbol'].split(':')[0]
-                    if 'USDT' in symbol:
-                        symbol = symbol.replace('USDT', '/USDT')
-                        active_trading_pairs.add(symbol)
+                    if 'USDT' in pos['symbol']:
+                        active_trading_pairs.add(position_pair(pos['symbol']))
+                
+                open_count = len(active_positions)
+                if coordinator is not None:
+                    # Diğer süreçlerin açtığı/açmakta olduğu coinler de sayılır
+                    coordinator.sync(active_trading_pairs, snapshot_time, owned=set(pairs))
+                    active_trading_pairs.update(coordinator.active_symbols())
+                    open_count = coordinator.count()
                 
-                print(f"\n📊 Aktif Pozisyonlar: {len(active_positions)}/{TRADE_SETTINGS['MAX_OPEN_POSITIONS']}")
+                print(f"\n📊 Aktif Pozisyonlar: {open_count}/{TRADE_SETTINGS['MAX_OPEN_POSITIONS']}")
                 print("🔒 İşlem Açık Olan Coinler:", active_trading_pairs)
                 
                 # Maksimum açık pozisyon kontrolü
-                if len(active_positions) >= TRADE_SETTINGS['MAX_OPEN_POSITIONS']:
+                if open_count >= TRADE_SETTINGS['MAX_OPEN_POSITIONS']:
                     print("\n⚠️ Maksimum açık pozisyon sayısına ulaşıldı!")
                     continue
                 
-                # Son kez pozisyon kontrolü
-                positions_final = exchange.fetch_positions()
-                final_count = len([p for p in positions_final if float(p['contracts']) > 0])
+                # Son kez pozisyon kontrolü (koordinatörde slot rezervasyonu bunu atomik yapar)
+                if coordinator is not None:
+                    final_count = coordinator.count()
+                else:
+                    positions_final = exchange.fetch_positions()
+                    final_count = len([p for p in positions_final if float(p['contracts']) > 0])
                 if final_count >= TRADE_SETTINGS['MAX_OPEN_POSITIONS']:
                     print("\n⚠️ Yeni pozisyon tespit edildi, tarama durduruluyor!")
                     continue
@@ -268,26 +301,56 @@ def monitor_all_coins():
                 signal_count = 0
                 print(f"\n⏰ {datetime.now().strftime('%H:%M:%S')} - Tarama başladı...")
                 
-                for symbol in pairs:
-                    # Eğer coin'de aktif işlem varsa atla
-                    if symbol in active_trading_pairs:
-                        continue
-                        
-                    if check_coin(exchange, symbol, rf):
-                        signal_count += 1
-                        # İşlem açıldıysa coin'i aktif listeye ekle
-                        active_trading_pairs.add(symbol)
-                        break
+                scan_pairs = [symbol for symbol in pairs if symbol not in active_trading_pairs]
+                if tiers is not None:
+                    scan_pairs = tiers.select(scan_pairs)
+                
+                if ranked:
+                    free_slots = TRADE_SETTINGS['MAX_OPEN_POSITIONS'] - final_count
+                    opened = scanner.scan(scan_pairs, free_slots)
+                    signal_count = len(opened)
+                    active_trading_pairs.update(opened)
+                else:
+                    for symbol in scan_pairs:
+                        if check_coin(exchange, symbol, rf, funnel, coordinator):
+                            signal_count += 1
+                            # İşlem açıldıysa coin'i aktif listeye ekle
+                            active_trading_pairs.add(symbol)
+                            break
                 
                 if signal_count == 0:
                     print("ℹ️ Sinyal yok.")
+                
+                funnel.report()
+                funnel.reset_stats()
+                if ranked:
+                    scanner.report()
+                if provisional is not None:
+                    provisional.report()
+                if tracker is not None:
+                    tracker.report()
+                if funnel.correlation is not None:
+                    funnel.correlation.report()
+                if tiers is not None:
+                    tiers.report()
                     
             except Exception as e:
                 print(f"\n❌ Döngü hatası: {str(e)}")
                 print(f"Hata tipi: {type(e).__name__}")
+            finally:
+                profiler.end_pass()
+                if checkpoint is not None:
+                    checkpoint.maybe_save(funnel, tiers, tracker)
                 
     except Exception as e:
         print(f"❌ Ana fonksiyon hatası: {str(e)}")
+    finally:
+        if scanner is not None:
+            scanner.close()
+        if checkpoint is not None and funnel is not None:
+            # Çıkışta (Ctrl+C, deploy) son durum beklenerek yazılır - arka plan yazıcısı yarıda kesilmez
+            checkpoint.wait()
+            checkpoint.save(funnel, tiers, tracker, background=False)
 
 def send_log_to_backend(message):
     """Backend'e log gönder"""
@@ -339,16 +402,7 @@ class MarketMonitor:
         self.pairs = None
         
     def initialize_exchange(self):
-        self.exchange = ccxt.binance({
-            'apiKey': self.config['api_key'],
-            'secret': self.config['api_secret'],
-            'enableRateLimit': True,
-            'options': {
-                'defaultType': 'future',
-                'adjustForTimeDifference': True
-            },
-            'timeout': 30000
-        })
+        self.exchange = get_exchange(self.config, market_type='future')
 
 if __name__ == "__main__":
     print("Program başlatılıyor...")
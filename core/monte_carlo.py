@@ -0,0 +1,349 @@
+"""
+TP/SL/kaldıraç Monte Carlo simülasyonu - geçmiş mumlardan bootstrap
+
+- Giriş noktaları geçmişten (rastgele veya RangeFilter sinyal mumları) tekrarlı örneklenir,
+  her işlemin yolu girişten sonraki gerçek `horizon` mum olur (blok bootstrap)
+- Mum içi sıra SyntheticTrades ile aynı varsayılır: yükselen mumda o -> l -> h -> c,
+  düşen mumda o -> h -> l -> c (TP ve SL aynı mumdaysa önce gelen kazanır)
+- Tüm TP/SL/kaldıraç ızgarası aynı yollar üzerinde dizi işlemleriyle değerlendirilir;
+  işlemler bellek bütçesine göre parçalara (chunk) bölünür, milyonlarca işlem sabit bellekle çalışır
+- İzole marjinde kaldıraçla tasfiye seviyesi de bariyerdir (SL tasfiyeden uzaksa marjin kaybedilir)
+
+Rapor: işlem başına PnL (USDT), run başına (ardışık run_trades işlem) toplam PnL ve
+maksimum düşüş dağılımları, işlemde kalma süresi (saniye) ve çıkış türleri.
+
+Kullanım:
+    python core/monte_carlo.py --timeframe 1m --trades 2000000 --sl 0.5 1 1.5 --tp 1 1.5 2 3 --leverage 5 10 20
+    python core/monte_carlo.py --sim 20 --entries rf --horizon 288
+"""
+import sys
+import os
+import time
+import argparse
+
+# Core klasörünü path'e ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from core.lazy_import import lazy_import
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+from core.candle_store import CandleStore, timeframe_ms
+from Trade.trade_settings import TRADE_SETTINGS
+
+# Binance USDT-M taker komisyonu (giriş ve çıkış market emri)
+DEFAULT_FEE_RATE = 0.0005
+# Tasfiye için en düşük bakım marjini oranı
+MAINTENANCE_MARGIN_RATE = 0.004
+
+EXIT_TYPES = ['tp', 'sl', 'liquidation', 'timeout']
+
+
+class PathPool:
+    """
+    Bootstrap havuzu - birleştirilmiş mum dizileri ve geçerli giriş noktaları
+
+    Args:
+        series (list): Sembol başına {'open', 'high', 'low', 'close'} dizileri
+        horizon (int): İşlem başına en fazla mum (zaman aşımında kapanışta çıkılır)
+        entries (str): 'random' (her mum) veya 'rf' (RangeFilter sinyal mumları ve yönleri)
+        side (str): 'random' girişlerde yön - 'both', 'long' veya 'short'
+    """
+    def __init__(self, series, horizon, entries='random', side='both'):
+        self.horizon = horizon
+        columns = {name: [] for name in ('open', 'high', 'low', 'close')}
+        starts, sides = [], []
+        offset = 0
+        for data in series:
+            n = len(data['close'])
+            if n <= horizon:
+                continue
+            for name in columns:
+                columns[name].append(np.asarray(data[name], dtype='float64'))
+            # Girişten sonra horizon mum olmalı (sembol sınırını geçmez)
+            valid = np.arange(n - horizon)
+            if entries == 'rf':
+                buy, sell = rf_entries(data)
+                index = np.concatenate([valid[buy[:n - horizon]], valid[sell[:n - horizon]]])
+                direction = np.concatenate([np.ones(buy[:n - horizon].sum(), dtype='int8'),
+                                            -np.ones(sell[:n - horizon].sum(), dtype='int8')])
+            elif side == 'both':
+                index = np.concatenate([valid, valid])
+                direction = np.repeat(np.array([1, -1], dtype='int8'), len(valid))
+            else:
+                index = valid
+                direction = np.full(len(valid), 1 if side == 'long' else -1, dtype='int8')
+            starts.append(index + offset)
+            sides.append(direction)
+            offset += n
+        if not starts or not sum(len(s) for s in starts):
+            raise ValueError("Yeterli mum veya giriş noktası yok")
+        self.data = {name: np.concatenate(parts) for name, parts in columns.items()}
+        # Yükselen mumda önce dip (o -> l -> h -> c)
+        self.low_first = self.data['close'] >= self.data['open']
+        self.starts = np.concatenate(starts)
+        self.sides = np.concatenate(sides)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def sample(self, rng, count):
+        """
+        count işlemlik yol örnekle
+
+        Returns:
+            tuple: (lehte hareket, aleyhte hareket, zaman aşımı getirisi, aleyhte önce mi) -
+                   ilk üçü girişe göre oran, hareketler (count, horizon) kümülatif maksimum
+        """
+        pick = rng.integers(0, len(self.starts), count)
+        entry = self.starts[pick]
+        side = self.sides[pick]
+        window = entry[:, None] + 1 + np.arange(self.horizon)
+        price = self.data['close'][entry][:, None]
+        high = self.data['high'][window] / price - 1
+        low = self.data['low'][window] / price - 1
+        long = side[:, None] > 0
+
+        favorable = np.where(long, high, -low).astype('float32')
+        adverse = np.where(long, -low, high).astype('float32')
+        np.maximum.accumulate(favorable, axis=1, out=favorable)
+        np.maximum.accumulate(adverse, axis=1, out=adverse)
+        final = self.data['close'][window[:, -1]] / price[:, 0] - 1
+        final = np.where(side > 0, final, -final)
+        low_first = self.low_first[window]
+        adverse_first = np.where(long, low_first, ~low_first)
+        return favorable, adverse, final, adverse_first
+
+
+def rf_entries(data, period=100, multiplier=3.0):
+    """RangeFilter sinyal mumları (alış, satış maskeleri)"""
+    from core.Math.range_filter import RangeFilter
+    df = pd.DataFrame({name: data[name] for name in ('open', 'high', 'low', 'close')})
+    signals = RangeFilter(period, multiplier).generate_signals(df)
+    return signals['buy_signals'].to_numpy(dtype=bool), signals['sell_signals'].to_numpy(dtype=bool)
+
+
+def first_cross(cummax, levels):
+    """
+    Kümülatif maksimumun her seviyeyi ilk geçtiği mum (geçmezse horizon)
+
+    Dizi monoton olduğu için ilk geçiş = seviyenin altında kalan mum sayısı.
+    """
+    return (cummax[:, :, None] < levels[None, None, :]).sum(axis=1, dtype='int32')
+
+
+class MonteCarlo:
+    """
+    TP/SL/kaldıraç ızgarası
+
+    Args:
+        sl_percents, tp_percents (list): Kaldıraçsız yüzdeler (TRADE_SETTINGS ile aynı anlam)
+        leverages (list): Kaldıraçlar
+        position_size (float): İşlem başına marjin (USDT)
+        timeframe (str): Mum zaman dilimi (süre hesabı için)
+        fee_rate (float): Taraf başına komisyon oranı
+        run_trades (int): Düşüş ve toplam PnL dağılımı için ardışık işlem sayısı
+        chunk_mb (float): Parça başına yaklaşık bellek
+    """
+    def __init__(self, sl_percents, tp_percents, leverages, position_size=None, timeframe='1m',
+                 fee_rate=DEFAULT_FEE_RATE, run_trades=100, chunk_mb=256, seed=42):
+        self.sl = np.asarray(sl_percents, dtype='float64') / 100
+        self.tp = np.asarray(tp_percents, dtype='float64') / 100
+        self.leverages = np.asarray(leverages, dtype='float64')
+        self.position_size = TRADE_SETTINGS['POSITION_SIZE'] if position_size is None else position_size
+        self.bar_seconds = timeframe_ms(timeframe) / 1000
+        self.fee_rate = fee_rate
+        self.run_trades = run_trades
+        self.chunk_bytes = chunk_mb * 1024 * 1024
+        self.rng = np.random.default_rng(seed)
+        # Tasfiye hareketi kaldıraca bağlı - SL seviyeleriyle birlikte aleyhte bariyerler
+        self.liquidation = 1 / self.leverages - MAINTENANCE_MARGIN_RATE
+        self.barriers = np.unique(np.concatenate([self.sl, self.liquidation]))
+        self.cells = [(s, t, l) for s in range(len(self.sl)) for t in range(len(self.tp))
+                      for l in range(len(self.leverages))]
+
+    def chunk_size(self, horizon):
+        """Bellek bütçesine sığan işlem sayısı (run_trades katı)"""
+        per_trade = horizon * (len(self.tp) + len(self.barriers) + 4 * 4 + 8 * 3)
+        size = max(self.run_trades, int(self.chunk_bytes // per_trade))
+        return size - size % self.run_trades
+
+    def run(self, pool, trades):
+        """
+        trades işlemi simüle et
+
+        Returns:
+            list: Hücre başına sonuç dict'leri (bkz. summarize)
+        """
+        horizon = pool.horizon
+        chunk = self.chunk_size(horizon)
+        trades = max(self.run_trades, trades - trades % self.run_trades)
+        accumulators = [{
+            'trades': 0, 'pnl_sum': 0.0, 'pnl_sq': 0.0, 'wins': 0,
+            'exits': np.zeros(len(EXIT_TYPES), dtype='int64'),
+            'bars': np.zeros(horizon + 1, dtype='int64'),
+            'run_pnl': [], 'run_drawdown': [],
+        } for _ in self.cells]
+
+        done = 0
+        while done < trades:
+            count = min(chunk, trades - done)
+            favorable, adverse, final, adverse_first = pool.sample(self.rng, count)
+            tp_bar = first_cross(favorable, self.tp.astype('float32'))
+            barrier_bar = first_cross(adverse, self.barriers.astype('float32'))
+            rows = np.arange(count)
+            del favorable, adverse
+
+            for cell, (s, t, l) in enumerate(self.cells):
+                leverage = self.leverages[l]
+                liquidation = self.liquidation[l]
+                # SL tasfiyeden uzaksa önce tasfiye olur
+                stop = min(self.sl[s], liquidation)
+                adverse_bar = barrier_bar[:, np.searchsorted(self.barriers, stop)]
+                win_bar = tp_bar[:, t]
+                tie = (win_bar == adverse_bar) & (win_bar < horizon)
+                first_adverse = adverse_first[rows, np.minimum(adverse_bar, horizon - 1)]
+                stopped = (adverse_bar < win_bar) | (tie & first_adverse)
+                took_profit = (win_bar < horizon) & ~stopped
+                timeout = ~stopped & ~took_profit
+
+                move = np.where(took_profit, self.tp[t], np.where(stopped, -stop, final))
+                pnl = self.position_size * leverage * (move - 2 * self.fee_rate)
+                liquidated = stopped & (liquidation <= self.sl[s])
+                pnl = np.where(liquidated, -self.position_size, pnl)
+                exit_bar = np.where(stopped, adverse_bar, np.where(took_profit, win_bar, horizon))
+
+                acc = accumulators[cell]
+                acc['trades'] += count
+                acc['pnl_sum'] += float(pnl.sum())
+                acc['pnl_sq'] += float((pnl * pnl).sum())
+                acc['wins'] += int((pnl > 0).sum())
+                acc['exits'] += [int(took_profit.sum()), int((stopped & ~liquidated).sum()),
+                                 int(liquidated.sum()), int(timeout.sum())]
+                acc['bars'] += np.bincount(exit_bar, minlength=horizon + 1)
+
+                runs = pnl.reshape(-1, self.run_trades)
+                equity = np.cumsum(runs, axis=1)
+                peak = np.maximum(np.maximum.accumulate(equity, axis=1), 0)
+                # Kopya: görünüm tüm equity dizisini bellekte tutardı
+                acc['run_pnl'].append(equity[:, -1].copy())
+                acc['run_drawdown'].append((peak - equity).max(axis=1))
+            done += count
+
+        return [self.summarize(cell, acc, horizon) for cell, acc in zip(self.cells, accumulators)]
+
+    def summarize(self, cell, acc, horizon):
+        s, t, l = cell
+        n = acc['trades']
+        mean = acc['pnl_sum'] / n
+        run_pnl = np.concatenate(acc['run_pnl'])
+        run_drawdown = np.concatenate(acc['run_drawdown'])
+        # Süre: çıkış mumu ortası (zaman aşımında horizon sonu)
+        seconds = (np.arange(horizon + 1) + 0.5) * self.bar_seconds
+        seconds[-1] = horizon * self.bar_seconds
+        cumulative = np.cumsum(acc['bars']) / n
+        return {
+            'sl_percent': self.sl[s] * 100, 'tp_percent': self.tp[t] * 100, 'leverage': int(self.leverages[l]),
+            'trades': n,
+            'win_rate': acc['wins'] / n,
+            'pnl_mean': mean,
+            'pnl_std': float(np.sqrt(max(acc['pnl_sq'] / n - mean * mean, 0.0))),
+            'exits': dict(zip(EXIT_TYPES, (acc['exits'] / n).tolist())),
+            'run_pnl': np.percentile(run_pnl, [5, 50, 95]).tolist(),
+            'run_drawdown': np.percentile(run_drawdown, [50, 95]).tolist(),
+            'time_mean': float((acc['bars'] * seconds).sum() / n),
+            'time_p50': float(seconds[np.searchsorted(cumulative, 0.5)]),
+            'time_p95': float(seconds[np.searchsorted(cumulative, 0.95)]),
+        }
+
+
+def load_series(symbols, timeframe, store=None):
+    """Depodaki mumlar (sembol verilmezse zaman dilimindeki tüm semboller)"""
+    store = store or CandleStore()
+    symbols = symbols or store.symbols(timeframe)
+    series = []
+    for symbol in symbols:
+        columns = store.read(symbol, timeframe)
+        if len(columns['timestamp']):
+            series.append(columns)
+    return series
+
+
+def sim_series(count, timeframe, bars):
+    """SyntheticCandles mumları (depo yoksa deneme için)"""
+    from core.sim_exchange import SyntheticCandles
+    candles = SyntheticCandles(0, timeframe=timeframe)
+    series = []
+    for i in range(count):
+        data = candles.bars(f"SIM{i:04d}/USDT", 0, bars)
+        series.append({name: data[:, j] for j, name in enumerate(('open', 'high', 'low', 'close'))})
+    return series
+
+
+def print_report(results, top=15, current=None):
+    """Beklenen PnL'e göre sıralı tablo"""
+    print(f"\n{'SL%':>5}{'TP%':>6}{'Kal':>5}{'Kazanç%':>9}{'Ort.PnL':>10}{'Std':>8}"
+          f"{'Run p5':>9}{'p50':>9}{'p95':>9}{'DD p50':>8}{'DD p95':>8}"
+          f"{'Süre ort':>10}{'p50':>8}{'p95':>8}{'TP%':>6}{'SL%':>6}{'Tasf%':>6}{'ZA%':>6}")
+    ranked = sorted(results, key=lambda r: -r['pnl_mean'])
+    rows = ranked[:top]
+    if current is not None:
+        rows += [r for r in ranked[top:] if (r['sl_percent'], r['tp_percent'], r['leverage']) == current]
+    for r in rows:
+        marker = ' ◀' if current == (r['sl_percent'], r['tp_percent'], r['leverage']) else ''
+        e = r['exits']
+        print(f"{r['sl_percent']:>5.2f}{r['tp_percent']:>6.2f}{r['leverage']:>5}{r['win_rate'] * 100:>9.1f}"
+              f"{r['pnl_mean']:>10.4f}{r['pnl_std']:>8.3f}"
+              f"{r['run_pnl'][0]:>9.2f}{r['run_pnl'][1]:>9.2f}{r['run_pnl'][2]:>9.2f}"
+              f"{r['run_drawdown'][0]:>8.2f}{r['run_drawdown'][1]:>8.2f}"
+              f"{r['time_mean']:>10.0f}{r['time_p50']:>8.0f}{r['time_p95']:>8.0f}"
+              f"{e['tp'] * 100:>6.1f}{e['sl'] * 100:>6.1f}{e['liquidation'] * 100:>6.1f}{e['timeout'] * 100:>6.1f}{marker}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TP/SL/kaldıraç Monte Carlo")
+    parser.add_argument('--symbols', nargs='*', default=None, help="Depo anahtarları (örn. BTCUSDT), boşsa hepsi")
+    parser.add_argument('--timeframe', default='1m')
+    parser.add_argument('--sim', type=int, default=None, metavar='SEMBOL', help="Depo yerine sentetik mumlar")
+    parser.add_argument('--sim-bars', type=int, default=20000)
+    parser.add_argument('--entries', choices=['random', 'rf'], default='random')
+    parser.add_argument('--side', choices=['both', 'long', 'short'], default='both')
+    parser.add_argument('--horizon', type=int, default=720, help="İşlem başına en fazla mum")
+    parser.add_argument('--trades', type=int, default=1_000_000)
+    parser.add_argument('--sl', nargs='+', type=float, default=[0.5, 1.0, 1.5, 2.0])
+    parser.add_argument('--tp', nargs='+', type=float, default=[0.75, 1.0, 1.5, 2.0, 3.0])
+    parser.add_argument('--leverage', nargs='+', type=int, default=[5, 10, 20, 50])
+    parser.add_argument('--position-size', type=float, default=TRADE_SETTINGS['POSITION_SIZE'])
+    parser.add_argument('--fee', type=float, default=DEFAULT_FEE_RATE, help="Taraf başına komisyon oranı")
+    parser.add_argument('--run-trades', type=int, default=100)
+    parser.add_argument('--chunk-mb', type=float, default=256)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.sim:
+        series = sim_series(args.sim, args.timeframe, args.sim_bars)
+    else:
+        series = load_series(args.symbols, args.timeframe)
+    if not series:
+        print(f"❌ {args.timeframe} mum bulunamadı (önce candle_downloader / kline_ingest)")
+        sys.exit(1)
+    pool = PathPool(series, args.horizon, args.entries, args.side)
+    print(f"📦 {len(series)} sembol, {sum(len(s['close']) for s in series):,} mum, "
+          f"{len(pool):,} giriş noktası ({time.perf_counter() - start:.1f} sn)")
+
+    mc = MonteCarlo(args.sl, args.tp, args.leverage, args.position_size, args.timeframe,
+                    args.fee, args.run_trades, args.chunk_mb, args.seed)
+    start = time.perf_counter()
+    results = mc.run(pool, args.trades)
+    elapsed = time.perf_counter() - start
+    simulated = results[0]['trades'] * len(results)
+    print(f"🎲 {results[0]['trades']:,} yol x {len(results)} ayar = {simulated:,} işlem, {elapsed:.1f} sn "
+          f"({simulated / elapsed:,.0f} işlem/sn, parça {mc.chunk_size(args.horizon):,} işlem)")
+
+    current = (TRADE_SETTINGS['STOP_LOSS_PERCENT'], TRADE_SETTINGS['TAKE_PROFIT_PERCENT'], TRADE_SETTINGS['LEVERAGE'])
+    print_report(results, args.top, current)
+    print(f"\nPnL: USDT / işlem (marjin {args.position_size}), Run: ardışık {args.run_trades} işlem, "
+          f"süre: saniye, ◀ mevcut ayar")
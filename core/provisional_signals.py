@@ -0,0 +1,333 @@
+"""
+Aktif mumda ön sinyal - kapanışta sadece onay veya iptal
+
+- Tarama ön filtresindeki RangeFilter sonucu (CandidateFunnel.on_signals) sembolün durumu
+  olarak saklanır; aktif mumda fiyat değiştikçe RangeFilter.step() ile O(1) değerlendirilir
+- Mum bu fiyatla kapanırsa sinyal oluşacaksa indikatörler, validasyon, skor, TP/SL ve hesap
+  ayarları (margin type, kaldıraç) kapanıştan önce hazırlanır
+- Kapanışta kesin kapanış fiyatı step()'e verilir: sinyal sürüyorsa kapanmış mumla
+  validasyon ve skor yeniden hesaplanır (kapanıştaki taramayla aynı karar), geçerse işlem
+  hemen açılır; sürmüyorsa ön sinyal iptal edilir - ön sinyalden sadece hesap hazırlığı kalır
+
+Fiyat kaynağı fetch_tickers (watch_until_close) veya aggTrade akışıdır (update/confirm).
+"""
+import threading
+from datetime import datetime
+from core.lazy_import import lazy_import
+pd = lazy_import('pandas')
+from Trade.trade_settings import TRADE_SETTINGS
+from Trade.position_calculator import PositionCalculator
+from Trade.futures_position import prepare_account
+from core.ranked_scan import exchange_sleep, TIMEFRAME_MS, CLOSE_GRACE_SECONDS
+from core.slot_coordinator import open_with_slot
+from core.signal_journal import get_journal, DECISION_PROVISIONAL, DECISION_CANCELLED
+from core.candidate_funnel import SCAN_COLUMNS
+
+
+class ProvisionalSignals:
+    """
+    Args:
+        exchange: ccxt exchange (veya SimExchange)
+        funnel (CandidateFunnel): Kapanıştaki tarama - durumlar bunun ön filtresinden alınır
+        coordinator (SlotCoordinator): Çok süreçli taramada paylaşılan slotlar
+        poll_seconds (float): fetch_tickers aralığı
+        refresh_seconds (float): Ön sinyalin validasyon/skoru bu süreden eskiyse yeniden hesaplanır
+    """
+    def __init__(self, exchange, funnel, coordinator=None, poll_seconds=None, refresh_seconds=None):
+        self.exchange = exchange
+        self.funnel = funnel
+        self.rf = funnel.rf
+        self.coordinator = coordinator
+        if poll_seconds is None:
+            poll_seconds = TRADE_SETTINGS['PROVISIONAL_POLL_SECONDS']
+        if refresh_seconds is None:
+            refresh_seconds = TRADE_SETTINGS['PROVISIONAL_REFRESH_SECONDS']
+        self.poll_seconds = poll_seconds
+        self.refresh_ms = refresh_seconds * 1000
+        self.calculator = PositionCalculator(leverage=TRADE_SETTINGS['LEVERAGE'])
+        self.journal = get_journal(exchange)
+        self.armed = {}
+        self._prepared = set()
+        self._lock = threading.Lock()
+        self.metrics = {
+            'armed': 0,
+            'updates': 0,
+            'provisional': 0,
+            'refreshed': 0,
+            'confirmed': 0,
+            'cancelled': 0,
+            'opened': 0,
+            'latency_ms': 0,
+        }
+        funnel.on_signals = self.arm
+
+    def arm(self, symbol, df, signals):
+        """Kapanmış mumlardan aktif mum için durumu hazırla (tarama thread'lerinden çağrılır)"""
+        if symbol is None or df.empty:
+            return
+        entry = {
+            'df': df,
+            'state': self.rf.state(df, signals),
+            'open_ts': int(df.index[-1].timestamp() * 1000) + TIMEFRAME_MS,
+            'provisional': {},
+        }
+        with self._lock:
+            self.armed[symbol] = entry
+            self.metrics['armed'] += 1
+
+    def update(self, symbol, price, now_ms=None, candle=None):
+        """
+        Aktif mumda yeni fiyat
+
+        Args:
+            candle (list): Biliniyorsa aktif mum [ts, o, h, l, c, v] (aggTrade akışı) -
+                verilmezse ön sinyal hazırlanırken borsadan alınır
+
+        Returns:
+            dict: Geçerli ön sinyal veya None
+        """
+        entry = self.armed.get(symbol)
+        if entry is None:
+            return None
+        now = self.exchange.milliseconds() if now_ms is None else now_ms
+        if not entry['open_ts'] <= now < entry['open_ts'] + TIMEFRAME_MS:
+            # Durum başka bir mum için - tarama yeniden hazırlayana kadar beklenir
+            return None
+
+        self.metrics['updates'] += 1
+        result = self.rf.step(entry['state'], price)
+        side = 'buy' if result['buy'] else 'sell' if result['sell'] else None
+        if side is None:
+            return None
+
+        provisional = entry['provisional'].get(side)
+        if provisional is None or now - provisional['computed_at'] > self.refresh_ms:
+            provisional = self._prepare(symbol, entry, side, price, result, now, candle)
+            entry['provisional'][side] = provisional
+        return provisional if provisional['valid'] else None
+
+    def _forming_frame(self, symbol, entry, price, now, candle):
+        """Kapanmış mumlar + aktif mum (close = price, hacim tam muma ölçeklenmiş)"""
+        if candle is None:
+            rows = self.exchange.fetch_ohlcv(symbol, '5m', since=entry['open_ts'], limit=1)
+            candle = rows[0] if rows and rows[0][0] == entry['open_ts'] else None
+        if candle is None:
+            candle = [entry['open_ts'], entry['state']['x'], price, price, price, 0.0]
+        _, o, h, l, _, v = candle
+        # Validasyon son mumun hacmini ortalamalarla karşılaştırır - kısmi hacim doğrusal ölçeklenir
+        elapsed = max(now - entry['open_ts'], 1000)
+        v = v * TIMEFRAME_MS / elapsed
+        return self._frame(entry, [entry['open_ts'], o, max(h, price), min(l, price), price, v])
+
+    @staticmethod
+    def _frame(entry, candle):
+        """Kapanmış mumlar + verilen mum [ts, o, h, l, c, v]"""
+        ts, o, h, l, c, v = candle
+        index = pd.to_datetime([int(ts)], unit='ms').tz_localize('UTC').tz_convert('Europe/Istanbul')
+        last = pd.DataFrame(
+            {'open': [float(o)], 'high': [float(h)], 'low': [float(l)], 'close': [float(c)], 'volume': [float(v)]},
+            index=index
+        )
+        last.index.name = 'timestamp'
+        base = entry['df'][['open', 'high', 'low', 'close', 'volume']]
+        return pd.concat([base, last])
+
+    @staticmethod
+    def _signal_data(symbol, df, side, price, result):
+        """CandidateFunnel.build_signal ile aynı alanlar"""
+        return {
+            "symbol": symbol,
+            "time": datetime.now().strftime('%H:%M:%S'),
+            "price": float(price),
+            "filter": result['filter'],
+            "highTarget": result['upper_band'],
+            "lowTarget": result['lower_band'],
+            "type": side,
+            "rsi": float(df['rsi'].iloc[-1]),
+            "stoch_rsi_k": float(df['stoch_rsi_k'].iloc[-1]),
+            "stoch_rsi_d": float(df['stoch_rsi_d'].iloc[-1])
+        }
+
+    def _evaluate(self, df, signal_data, components):
+        """Validasyon ve skor (kapanıştaki taramayla aynı sıra) - (geçerli mi, skor)"""
+        if not self.funnel.validator.validate_signal(df, signal_data):
+            return False, None
+        score = self.funnel.scorer.calculate_score(signal_data, components)
+        return score >= self.funnel.min_score, score
+
+    def _prepare(self, symbol, entry, side, price, result, now, candle):
+        """Ön sinyal: indikatör, validasyon, skor ve emir parametreleri kapanıştan önce"""
+        first = side not in entry['provisional']
+        self.metrics['provisional' if first else 'refreshed'] += 1
+        print(f"\n⏳ {symbol} ön sinyal ({side}) - fiyat {price}, filtre {result['filter']}")
+
+        df = self.funnel.indicators(self._forming_frame(symbol, entry, price, now, candle), symbol)
+        signal_data = self._signal_data(symbol, df, side, price, result)
+
+        components = {}
+        valid, score = self._evaluate(df, signal_data, components)
+
+        order = None
+        if valid:
+            order = self.calculator.calculate_tp_sl(
+                entry_price=price, side='LONG' if side == 'buy' else 'SHORT',
+                sl_percent=TRADE_SETTINGS['STOP_LOSS_PERCENT'],
+                tp_percent=TRADE_SETTINGS['TAKE_PROFIT_PERCENT']
+            )
+            order['amount'] = self.calculator.calculate_position_size(TRADE_SETTINGS['POSITION_SIZE'], price)
+            if symbol not in self._prepared:
+                prepare_account(self.exchange, symbol.replace('/', ''))
+                self._prepared.add(symbol)
+            signal_data['prepared'] = True
+
+        if self.journal is not None and first:
+            indicators = {column: df[column].iloc[-1] for column in SCAN_COLUMNS}
+            indicators.update(price=price, filter=result['filter'],
+                              highTarget=result['upper_band'], lowTarget=result['lower_band'])
+            self.journal.record(symbol, DECISION_PROVISIONAL, side=side, score=score,
+                                score_components=components, indicators=indicators,
+                                candle_ts=entry['open_ts'])
+
+        return {
+            'side': side,
+            'valid': valid,
+            'score': score,
+            'signal_data': signal_data,
+            'order': order,
+            'computed_at': now,
+        }
+
+    def confirm(self, symbol, candle):
+        """
+        Mum kapandı: kesin kapanışla onayla veya iptal et
+
+        Ön sinyalin validasyon/skoru aktif mumdan (kapanış öncesi fiyat, ölçeklenmiş hacim)
+        hesaplandığı için kapanmış mumla yeniden hesaplanır; ön sinyalden sadece hesap
+        hazırlığı (margin type, kaldıraç) kullanılır.
+
+        Args:
+            candle (list): Kapanan mum [ts, o, h, l, c, v]
+
+        Returns:
+            dict: Onaylanan aday {'signal_data', 'score'} veya None
+        """
+        with self._lock:
+            entry = self.armed.pop(symbol, None)
+        if entry is None or not entry['provisional']:
+            return None
+
+        close_price = float(candle[4])
+        result = self.rf.step(entry['state'], close_price)
+        side = 'buy' if result['buy'] else 'sell' if result['sell'] else None
+        provisional = entry['provisional'].get(side) if side else None
+        if provisional is None or not provisional['valid']:
+            cancelled = next(iter(entry['provisional'].values()))
+            return self._cancel(symbol, entry, cancelled['side'], cancelled['score'], close_price)
+
+        # Kapanıştaki taramayla aynı değerlendirme (son kapanmış mum)
+        df = self.funnel.indicators(self._frame(entry, candle), symbol)
+        signal_data = self._signal_data(symbol, df, side, close_price, result)
+        valid, score = self._evaluate(df, signal_data, {})
+        if not valid:
+            return self._cancel(symbol, entry, side, score, close_price)
+        signal_data['prepared'] = provisional['signal_data'].get('prepared', False)
+
+        self.metrics['confirmed'] += 1
+        return {'signal_data': signal_data, 'score': score}
+
+    def _cancel(self, symbol, entry, side, score, close_price):
+        self.metrics['cancelled'] += 1
+        print(f"🚫 {symbol} ön sinyal iptal (kapanış {close_price})")
+        if self.journal is not None:
+            self.journal.record(symbol, DECISION_CANCELLED, side=side, score=score, candle_ts=entry['open_ts'])
+        return None
+
+    def poll(self, skip=()):
+        """Tüm hazır coinler için tek fetch_tickers isteği"""
+        symbols = [symbol for symbol in self.armed if symbol not in skip]
+        if not symbols:
+            return 0
+        tickers = self.exchange.fetch_tickers(symbols)
+        now = self.exchange.milliseconds()
+        for symbol in symbols:
+            ticker = tickers.get(symbol)
+            if ticker and ticker.get('last'):
+                self.update(symbol, float(ticker['last']), now)
+        return len(symbols)
+
+    def _free_slots(self):
+        if self.coordinator is not None:
+            return TRADE_SETTINGS['MAX_OPEN_POSITIONS'] - self.coordinator.count()
+        positions = self.exchange.fetch_positions()
+        return TRADE_SETTINGS['MAX_OPEN_POSITIONS'] - len([p for p in positions if float(p['contracts']) > 0])
+
+    def confirm_all(self, skip=()):
+        """
+        Kapanan mumdaki ön sinyalleri onayla, en yüksek skorlulardan işlem aç
+
+        Returns:
+            list: İşlem açılan coinler
+        """
+        close_ms = self.exchange.milliseconds()
+        close_ms -= close_ms % TIMEFRAME_MS
+        pending = [
+            symbol for symbol, entry in list(self.armed.items())
+            if entry['provisional'] and entry['open_ts'] == close_ms - TIMEFRAME_MS and symbol not in skip
+        ]
+        confirmed = []
+        for symbol in pending:
+            # Sadece kapanan mum (ağırlık 1)
+            rows = self.exchange.fetch_ohlcv(symbol, '5m', since=close_ms - TIMEFRAME_MS, limit=1)
+            if rows and rows[0][0] == close_ms - TIMEFRAME_MS:
+                candidate = self.confirm(symbol, rows[0])
+                if candidate:
+                    confirmed.append(candidate)
+
+        # Bu mum için kalan durumlar eskidi - tarama yeniden hazırlar
+        with self._lock:
+            for symbol in [s for s, e in self.armed.items() if e['open_ts'] < close_ms]:
+                self.armed.pop(symbol)
+
+        opened = []
+        if not confirmed:
+            return opened
+        confirmed.sort(key=lambda c: c['score'], reverse=True)
+        free_slots = self._free_slots()
+        for candidate in confirmed[:max(free_slots, 0)]:
+            symbol = candidate['signal_data']['symbol']
+            print(f"\n⚡ {symbol} ön sinyal onaylandı (Skor: {candidate['score']}/18) - işlem açılıyor...")
+            try:
+                if open_with_slot(self.coordinator, self.exchange, symbol, candidate['signal_data']):
+                    opened.append(symbol)
+                    self.metrics['latency_ms'] = self.exchange.milliseconds() - close_ms
+            except Exception as e:
+                print(f"❌ İşlem açma hatası: {str(e)}")
+        self.metrics['opened'] += len(opened)
+        return opened
+
+    def watch_until_close(self, skip=()):
+        """
+        Mum kapanana kadar fiyatları izle, kapanışta onayla
+
+        Returns:
+            list: İşlem açılan coinler
+        """
+        now = self.exchange.milliseconds()
+        close_ms = now - now % TIMEFRAME_MS + TIMEFRAME_MS
+        while now < close_ms:
+            try:
+                self.poll(skip)
+            except Exception as e:
+                print(f"⚠️ Fiyat alınamadı: {str(e)}")
+            now = self.exchange.milliseconds()
+            exchange_sleep(self.exchange, max(min(self.poll_seconds, (close_ms - now) / 1000), 0))
+            now = self.exchange.milliseconds()
+        exchange_sleep(self.exchange, CLOSE_GRACE_SECONDS)
+        return self.confirm_all(skip)
+
+    def report(self):
+        """Ön sinyal metrikleri"""
+        print("\n⚡ ÖN SİNYAL:")
+        for name, value in self.metrics.items():
+            print(f"• {name}: {value}")
+        return self.metrics
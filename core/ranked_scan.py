@@ -0,0 +1,169 @@
+"""
+Sıralı tarama - kapanan mum için tüm coinleri paralel değerlendir,
+SignalScore'a göre sırala ve boş slotlara en iyi N adayı süre dolmadan aç
+"""
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from Trade.trade_settings import TRADE_SETTINGS
+from core.slot_coordinator import open_with_slot
+
+TIMEFRAME_MS = 5 * 60 * 1000
+
+# Mum kapanışından sonra borsanın mumu kesinleştirmesi için bekleme (saniye)
+CLOSE_GRACE_SECONDS = 1
+
+
+def exchange_sleep(exchange, seconds):
+    """Exchange'in saatine göre bekle (simülasyonda sanal saat)"""
+    clock = getattr(exchange, 'clock', None)
+    if clock is not None:
+        clock.sleep(seconds)
+    else:
+        time.sleep(seconds)
+
+
+class RankedScanner:
+    def __init__(self, exchange, funnel, workers=None, deadline_seconds=None, coordinator=None):
+        self.exchange = exchange
+        self.funnel = funnel
+        self.coordinator = coordinator
+        self.workers = workers or TRADE_SETTINGS['SCAN_WORKERS']
+        if deadline_seconds is None:
+            deadline_seconds = TRADE_SETTINGS['RANK_DEADLINE_SECONDS']
+        self.deadline_seconds = deadline_seconds
+        self.metrics = {
+            'passes': 0,
+            'evaluated': 0,
+            'candidates': 0,
+            'opened': 0,
+            'late_results': 0,
+            'missed_deadline': 0,
+        }
+        # Turlar arasında tek havuz; süresi dolan turun hâlâ çalışan işleri
+        self._pool = None
+        self._late = set()
+
+    def last_close_ms(self):
+        """Son kapanan mumun kapanış zamanı (ms)"""
+        now = self.exchange.milliseconds()
+        return now - now % TIMEFRAME_MS
+
+    def wait_for_next_close(self):
+        """Bir sonraki mum kapanışına kadar bekle"""
+        now = self.exchange.milliseconds()
+        next_close = self.last_close_ms() + TIMEFRAME_MS
+        exchange_sleep(self.exchange, (next_close - now) / 1000 + CLOSE_GRACE_SECONDS)
+
+    def _evaluate(self, symbol, expired):
+        if expired.is_set():
+            return None
+        try:
+            return self.funnel.evaluate(symbol, expired)
+        except Exception as e:
+            print(f"❌ Analiz hatası ({symbol}): {str(e)}")
+            return None
+
+    def collect(self, pairs, deadline_ms):
+        """
+        Tüm coinleri paralel değerlendir, süre dolana kadar gelen adayları topla
+
+        Adaylar thread bitiş sırasıyla değil coin listesindeki sırayla döner. Süre dolunca
+        turun belirteci (expired) işaretlenir: geç kalan işler sonraki aşamaya geçmez ve
+        huni durumuna (sayaçlar, mum tamponu, günlük, indikatör hafızası) yazmaz.
+        """
+        if self._late:
+            # Önceki turun geç kalanları bitmeden yeni tur başlamaz (aynı coin iki thread'de işlenmez)
+            wait(self._late)
+            self._late = set()
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ranked-scan')
+        expired = threading.Event()
+        candidates = []
+        pending = {self._pool.submit(self._evaluate, symbol, expired): index for index, symbol in enumerate(pairs)}
+
+        try:
+            while pending:
+                remaining = (deadline_ms - self.exchange.milliseconds()) / 1000
+                if remaining <= 0:
+                    break
+                done, _ = wait(pending, timeout=min(remaining, 0.5), return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    self.metrics['evaluated'] += 1
+                    candidate = future.result()
+                    if candidate:
+                        candidates.append((index, candidate))
+        finally:
+            # Süre doldu - başlamamış işleri iptal et, çalışanlar yan etkisiz biter
+            expired.set()
+            for future in pending:
+                future.cancel()
+            self.metrics['late_results'] += len(pending)
+            self._late = {future for future in pending if not future.done()}
+
+        if pending:
+            print(f"⏱️ Süre doldu: {len(pending)} coin sonucu geç kaldı ve atıldı")
+        return [candidate for _, candidate in sorted(candidates, key=lambda item: item[0])]
+
+    def close(self):
+        """Havuzu kapat (çıkışta)"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        self._late = set()
+
+    def scan(self, pairs, free_slots):
+        """
+        Kapanan mum için sıralı tarama
+
+        Args:
+            pairs (list): Değerlendirilecek coinler (aktif işlem olanlar hariç)
+            free_slots (int): Boş pozisyon slotu sayısı
+
+        Returns:
+            list: İşlem açılan coinler
+        """
+        self.metrics['passes'] += 1
+        deadline_ms = self.last_close_ms() + self.deadline_seconds * 1000
+
+        candidates = self.collect(pairs, deadline_ms)
+        self.metrics['candidates'] += len(candidates)
+
+        # En yüksek skor önce (eşitlikte coin listesindeki sıra korunur)
+        candidates.sort(key=lambda c: c['score'], reverse=True)
+        if candidates:
+            print("\n🏆 ADAY SIRALAMASI:")
+            for rank, candidate in enumerate(candidates, 1):
+                signal_data = candidate['signal_data']
+                print(f"{rank}. {signal_data['symbol']} {signal_data['type']} - Skor: {candidate['score']}/18")
+
+        opened = []
+        for candidate in candidates:
+            if len(opened) >= free_slots:
+                break
+            if self.exchange.milliseconds() > deadline_ms:
+                self.metrics['missed_deadline'] += 1
+                print("⏱️ Süre doldu, kalan adaylar için işlem açılmadı")
+                break
+
+            symbol = candidate['signal_data']['symbol']
+            print(f"\n🚀 {symbol} işlem açılıyor (Skor: {candidate['score']}/18)...")
+            try:
+                if open_with_slot(self.coordinator, self.exchange, symbol, candidate['signal_data']):
+                    print("✅ İşlem başarıyla açıldı!")
+                    opened.append(symbol)
+                else:
+                    print("❌ İşlem açılamadı!")
+            except Exception as e:
+                print(f"❌ İşlem açma hatası: {str(e)}")
+
+        self.metrics['opened'] += len(opened)
+        return opened
+
+    def report(self):
+        """Sıralı tarama metrikleri"""
+        print("\n🏁 SIRALI TARAMA:")
+        for name, value in self.metrics.items():
+            print(f"• {name}: {value}")
+        return self.metrics
@@ -0,0 +1,271 @@
+"""
+Canlı taramada isteğe bağlı CPU profili - yeniden başlatmadan
+
+Kapalıyken maliyeti yoktur: huni aşamaları sadece bir None/bayrak kontrolü yapar, döngü
+tur başına kontrol dosyasına bir kez bakar. Açıldığında sonraki N tur profillenir ve
+aşama + sembol bazında gruplanmış collapsed-stack çıktısı yazılır
+(flamegraph.pl, speedscope.app veya inferno ile açılır).
+
+Açmak için:
+    kill -USR1 <pid>                               # ayarlardaki mod ve tur sayısı
+    echo "sampling 3" > data/profile_scan          # veya: echo "deterministic" > data/profile_scan
+
+Modlar:
+    sampling      - arka plan thread'i PROFILE_INTERVAL_MS aralıkla yığınları örnekler (düşük ek yük)
+    deterministic - her aşama çağrısı cProfile ile ölçülür; ayrıca aşama başına .pstats yazılır
+
+Çıktı: data/profiles/scan-<zaman>-<pid>-<mod>.collapsed
+    'aşama;sembol;modül:fonksiyon;... değer' satırları (sampling: örnek sayısı, deterministic: µs)
+"""
+import os
+import sys
+import time
+import signal
+import threading
+from datetime import datetime
+from Trade.trade_settings import TRADE_SETTINGS
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+OUTPUT_DIR = os.path.join(DATA_DIR, 'profiles')
+CONTROL_FILE = os.path.join(DATA_DIR, 'profile_scan')
+
+MODES = ('sampling', 'deterministic')
+
+# Tarama turunun huni dışındaki kısmı (pozisyon kontrolü, sıralama, işlem açma)
+PASS_STAGE = 'pass'
+
+
+def _frame_label(code):
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}"
+
+
+class ScanProfiler:
+    """
+    Tarama turları için profil
+
+    Args:
+        control_file (str): Varlığı profili açan dosya (içerik: mod ve/veya tur sayısı)
+        output_dir (str): Çıktı klasörü
+    """
+    def __init__(self, control_file=CONTROL_FILE, output_dir=OUTPUT_DIR):
+        self.control_file = control_file
+        self.output_dir = output_dir
+        self.active = False
+        self.mode = None
+        self.remaining = 0
+        self._requested = None
+        self._contexts = {}
+        self._stacks = {}
+        self._labels = {}
+        self._profiles = {}
+        self._lock = threading.Lock()
+        self._sampler = None
+        self._stop = threading.Event()
+        self.skipped = 0
+
+    # ------------------------------------------------------------------
+    # Açma
+    # ------------------------------------------------------------------
+    def request(self, passes=None, mode=None):
+        """Sonraki begin_pass'te profili başlat (sinyal işleyicisinden de çağrılır)"""
+        self._requested = (passes or TRADE_SETTINGS['PROFILE_PASSES'], mode or TRADE_SETTINGS['PROFILE_MODE'])
+
+    def install_signal(self, signum=None):
+        """SIGUSR1 ile açılır (sadece ana thread'de ve destekleyen sistemlerde)"""
+        signum = signum or getattr(signal, 'SIGUSR1', None)
+        if signum is None or threading.current_thread() is not threading.main_thread():
+            return False
+        signal.signal(signum, lambda *_: self.request())
+        return True
+
+    def _read_control_file(self):
+        try:
+            with open(self.control_file, 'r') as f:
+                words = f.read().split()
+            os.remove(self.control_file)
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            print(f"⚠️ Profil kontrol dosyası okunamadı: {str(e)}")
+            return
+        passes = next((int(w) for w in words if w.isdigit()), None)
+        mode = next((w for w in words if w in MODES), None)
+        self.request(passes, mode)
+
+    # ------------------------------------------------------------------
+    # Turlar
+    # ------------------------------------------------------------------
+    def begin_pass(self):
+        """Tur başında çağrılır - istek varsa profili başlat"""
+        if not self.active:
+            if os.path.exists(self.control_file):
+                self._read_control_file()
+            if self._requested is None:
+                return
+            passes, mode = self._requested
+            self._requested = None
+            self._start(passes, mode)
+        if self.mode == 'sampling':
+            self._contexts[threading.main_thread().ident] = (PASS_STAGE, '-')
+
+    def end_pass(self):
+        """Tur sonunda çağrılır - tur sayısı dolunca çıktıyı yaz"""
+        if not self.active:
+            return None
+        self._contexts.pop(threading.main_thread().ident, None)
+        self.remaining -= 1
+        if self.remaining > 0:
+            return None
+        return self._finish()
+
+    def _start(self, passes, mode):
+        if mode not in MODES:
+            print(f"⚠️ Bilinmeyen profil modu: {mode}")
+            return
+        self.mode = mode
+        self.remaining = max(1, int(passes))
+        self._stacks = {}
+        self._profiles = {}
+        self.skipped = 0
+        self._started = time.perf_counter()
+        if mode == 'sampling':
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name='scan-profiler', daemon=True)
+            self._sampler.start()
+        self.active = True
+        print(f"🔬 Profil başladı: {mode}, {self.remaining} tur")
+
+    def _finish(self):
+        self.active = False
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+        self._contexts.clear()
+        elapsed = time.perf_counter() - self._started
+        path = self.write()
+        print(f"🔬 Profil bitti ({elapsed:.1f} sn): {path}")
+        self.report()
+        return path
+
+    # ------------------------------------------------------------------
+    # Ölçüm
+    # ------------------------------------------------------------------
+    def call(self, stage, symbol, func, *args):
+        """Huni aşamasını profil altında çalıştır (sadece active iken çağrılır)"""
+        ident = threading.get_ident()
+        previous = self._contexts.get(ident)
+        self._contexts[ident] = (stage, symbol or '-')
+        try:
+            if self.mode == 'deterministic':
+                return self._call_deterministic(stage, symbol or '-', func, args)
+            return func(*args)
+        finally:
+            if previous is None:
+                self._contexts.pop(ident, None)
+            else:
+                self._contexts[ident] = previous
+
+    def _call_deterministic(self, stage, symbol, func, args):
+        import cProfile
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+: aynı anda tek profil (paralel taramada diğer thread ölçülüyor)
+            self.skipped += 1
+            return func(*args)
+        try:
+            return func(*args)
+        finally:
+            profile.disable()
+            with self._lock:
+                self._profiles.setdefault((stage, symbol), []).append(profile)
+
+    def _sample_loop(self):
+        interval = TRADE_SETTINGS['PROFILE_INTERVAL_MS'] / 1000
+        sampler = threading.get_ident()
+        while not self._stop.wait(interval):
+            frames = sys._current_frames()
+            for ident, context in list(self._contexts.items()):
+                frame = frames.get(ident)
+                if frame is None or ident == sampler:
+                    continue
+                key = self._collapse(context, frame)
+                self._stacks[key] = self._stacks.get(key, 0) + 1
+
+    def _collapse(self, context, frame):
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = _frame_label(code)
+            labels.append(label)
+            frame = frame.f_back
+        labels.reverse()
+        return ';'.join((context[0], context[1], *labels))
+
+    def _deterministic_stacks(self):
+        """cProfile sonuçları: aşama;sembol;fonksiyon -> kendi süresi (µs)"""
+        import pstats
+        stacks = {}
+        for (stage, symbol), profiles in self._profiles.items():
+            stats = pstats.Stats(*profiles)
+            for (filename, _, name), (_, _, self_time, _, _) in stats.stats.items():
+                module = os.path.splitext(os.path.basename(filename))[0] if filename != '~' else 'builtins'
+                key = f"{stage};{symbol};{module}:{name}"
+                stacks[key] = stacks.get(key, 0) + int(self_time * 1_000_000)
+        return stacks
+
+    # ------------------------------------------------------------------
+    # Çıktı
+    # ------------------------------------------------------------------
+    def stacks(self):
+        if self.mode == 'deterministic':
+            return self._deterministic_stacks()
+        return dict(self._stacks)
+
+    def write(self):
+        """Collapsed-stack dosyasını (ve deterministic modda aşama başına .pstats) yaz"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        base = os.path.join(self.output_dir, f"scan-{stamp}-{os.getpid()}-{self.mode}")
+        with open(f"{base}.collapsed", 'w') as f:
+            for key, value in sorted(self.stacks().items()):
+                if value > 0:
+                    f.write(f"{key} {value}\n")
+        if self.mode == 'deterministic':
+            import pstats
+            by_stage = {}
+            for (stage, _), profiles in self._profiles.items():
+                by_stage.setdefault(stage, []).extend(profiles)
+            for stage, profiles in by_stage.items():
+                pstats.Stats(*profiles).dump_stats(f"{base}-{stage}.pstats")
+        return f"{base}.collapsed"
+
+    def report(self, top=10):
+        """Aşama ve sembol bazında toplamlar"""
+        stacks = self.stacks()
+        total = sum(stacks.values()) or 1
+        unit = 'ms' if self.mode == 'deterministic' else 'örnek'
+        scale = 1000 if self.mode == 'deterministic' else 1
+        stages, symbols = {}, {}
+        for key, value in stacks.items():
+            stage, symbol = key.split(';', 2)[:2]
+            stages[stage] = stages.get(stage, 0) + value
+            if symbol != '-':
+                symbols[symbol] = symbols.get(symbol, 0) + value
+
+        print(f"\n🔬 PROFİL ({self.mode}):")
+        print(f"{'Aşama':<12}{unit:>12}{'%':>8}")
+        for stage, value in sorted(stages.items(), key=lambda x: -x[1]):
+            print(f"{stage:<12}{value / scale:>12.1f}{100 * value / total:>8.1f}")
+        if symbols:
+            print(f"\n🐢 En pahalı {min(top, len(symbols))} sembol:")
+            for symbol, value in sorted(symbols.items(), key=lambda x: -x[1])[:top]:
+                print(f"{symbol:<16}{value / scale:>12.1f}{100 * value / total:>8.1f}")
+        if self.skipped:
+            print(f"ℹ️ {self.skipped} aşama çağrısı ölçülemedi (eşzamanlı profil)")
+        return stages
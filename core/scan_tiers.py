@@ -0,0 +1,159 @@
+"""
+Uyarlanabilir tarama katmanları - sıcak coinler her mumda, soğuklar uyanınca
+
+Her tam değerlendirmede (huni ön filtresi) sembolün ucuz istatistikleri saklanır:
+RangeFilter değeri ve trend yönü, son kapanış, tipik mum hareketi (volatilite) ve
+fiyat aralığı sıkışması (ConsolidationAnalyzer eşikleri). Sinyal, kapanışın filtreyi
+trendin tersine geçmesiyle oluşur; fiyatın filtreye uzaklığı tipik mum hareketi
+cinsinden ölçülür:
+
+    adım = (kapanış - filtre) * trend / ortalama |Δkapanış|
+
+Adım sayısı COLD_STEPS'ten büyükse (sıkışmada WAKE_STEPS'ten büyükse) coin soğuk
+katmana düşer ve tam değerlendirilmez. Soğuk coinler her turda tek fetch_tickers
+isteğiyle (ağırlık 40) kontrol edilir: son fiyatla adım WAKE_STEPS'e inerse ve 24s
+hacmi MIN_VOLUME üstündeyse uyanır. Hiç uyanmasa da en fazla MAX_SKIP mumda bir
+tam değerlendirilir (durum tazelenir). Tur maliyeti böylece piyasa hareketliliğiyle
+ölçeklenir.
+"""
+import threading
+from core.lazy_import import lazy_import
+np = lazy_import('numpy')
+from core.Math.consolidation_analyzer import ConsolidationAnalyzer
+from core.ranked_scan import TIMEFRAME_MS
+from Trade.trade_settings import TRADE_SETTINGS
+
+TIER_HOT = 'hot'
+TIER_COLD = 'cold'
+
+
+class ScanTiers:
+    """
+    Args:
+        exchange: ccxt exchange (veya SimExchange) - soğuk coinler için fetch_tickers
+        cold_steps (float): Bu kadar tipik mum hareketinden uzak coin soğuk katmana düşer
+        wake_steps (float): Soğuk coin bu uzaklığa inince uyanır (sıkışmadaki coinler için soğuma eşiği)
+        max_skip (int): Soğuk coin en fazla bu kadar mum atlanır
+        min_volume (float): 24s USDT hacmi bunun altındaki soğuk coin fiyatla uyanmaz
+    """
+    def __init__(self, exchange, cold_steps=None, wake_steps=None, max_skip=None, min_volume=None):
+        self.exchange = exchange
+        self.cold_steps = cold_steps if cold_steps is not None else TRADE_SETTINGS['TIER_COLD_STEPS']
+        self.wake_steps = wake_steps if wake_steps is not None else TRADE_SETTINGS['TIER_WAKE_STEPS']
+        self.max_skip = max_skip if max_skip is not None else TRADE_SETTINGS['TIER_MAX_SKIP']
+        self.min_volume = min_volume if min_volume is not None else TRADE_SETTINGS['MIN_VOLUME']
+        self.analyzer = ConsolidationAnalyzer()
+        self.entries = {}
+        self._lock = threading.Lock()
+        self.metrics = {'passes': 0, 'hot': 0, 'woken': 0, 'cold': 0, 'stale': 0, 'ticker_errors': 0}
+
+    def observe(self, symbol, df, signals):
+        """Ön filtredeki RangeFilter sonucundan sembolün katmanını belirle (tarama thread'lerinden)"""
+        if symbol is None or df.empty:
+            return
+        window = self.analyzer.window_size
+        close = df['close'].to_numpy()[-(window + 1):]
+        high = df['high'].to_numpy()[-window:]
+        low = df['low'].to_numpy()[-window:]
+        entry = {
+            'filter': float(signals['raw_filter'].iloc[-1]),
+            'trend': int(signals['trend'].iloc[-1]),
+            'move': float(np.abs(np.diff(close)).mean()) if len(close) > 1 else 0.0,
+            'consolidating': bool((high.max() - low.min()) / low.min() < self.analyzer.price_threshold),
+            'evaluated_ms': int(self.exchange.milliseconds()),
+        }
+        fired = bool(signals['buy_signals'].iloc[-1] or signals['sell_signals'].iloc[-1])
+        entry['steps'] = self.steps(entry, float(close[-1]))
+        limit = self.wake_steps if entry['consolidating'] else self.cold_steps
+        entry['tier'] = TIER_HOT if fired or entry['steps'] <= limit else TIER_COLD
+        with self._lock:
+            self.entries[symbol] = entry
+
+    @staticmethod
+    def steps(entry, price):
+        """Fiyatın sinyal tarafına geçmesi için gereken tipik mum hareketi sayısı"""
+        if entry['trend'] == 0:
+            return 0.0
+        gap = (price - entry['filter']) * entry['trend']
+        if gap <= 0:
+            return 0.0
+        if entry['move'] <= 0:
+            return float('inf')
+        return gap / entry['move']
+
+    def select(self, symbols):
+        """
+        Bu turda tam değerlendirilecek coinler (sıra korunur)
+
+        Sıcak, hiç değerlendirilmemiş, MAX_SKIP'i dolmuş ve fiyatı uyanma eşiğine gelmiş
+        soğuk coinler seçilir.
+        """
+        now = self.exchange.milliseconds()
+        stale_ms = self.max_skip * TIMEFRAME_MS
+        selected, cold = set(), []
+        with self._lock:
+            entries = dict(self.entries)
+        for symbol in symbols:
+            entry = entries.get(symbol)
+            if entry is None or entry['tier'] == TIER_HOT:
+                selected.add(symbol)
+            elif now - entry['evaluated_ms'] >= stale_ms:
+                selected.add(symbol)
+                self.metrics['stale'] += 1
+            else:
+                cold.append(symbol)
+        hot = len(selected)
+
+        woken = self._wake(cold, entries) if cold else []
+        selected.update(woken)
+
+        self.metrics['passes'] += 1
+        self.metrics['hot'] += hot
+        self.metrics['woken'] += len(woken)
+        self.metrics['cold'] += len(cold) - len(woken)
+        if cold:
+            print(f"🧊 Katmanlar: {hot} sıcak, {len(woken)} uyanan, {len(cold) - len(woken)} soğuk (atlandı)")
+        return [symbol for symbol in symbols if symbol in selected]
+
+    def _wake(self, cold, entries):
+        """Tek fetch_tickers ile soğuk coinlerden uyananlar (istek başarısızsa hepsi)"""
+        try:
+            tickers = self.exchange.fetch_tickers(cold)
+        except Exception as e:
+            print(f"⚠️ Soğuk coinler için fiyat alınamadı, hepsi taranacak: {str(e)}")
+            self.metrics['ticker_errors'] += 1
+            return cold
+        woken = []
+        for symbol in cold:
+            ticker = tickers.get(symbol)
+            if not ticker or not ticker.get('last'):
+                woken.append(symbol)
+                continue
+            volume = ticker.get('quoteVolume')
+            if volume is not None and volume < self.min_volume:
+                continue
+            if self.steps(entries[symbol], float(ticker['last'])) <= self.wake_steps:
+                woken.append(symbol)
+        return woken
+
+    def snapshot(self):
+        """Sembol durumları (checkpoint için)"""
+        with self._lock:
+            return {symbol: dict(entry) for symbol, entry in self.entries.items()}
+
+    def restore(self, entries):
+        """Kaydedilmiş durumları yükle - MAX_SKIP'i dolanlar ilk turda zaten taranır"""
+        with self._lock:
+            for symbol, entry in entries.items():
+                self.entries.setdefault(symbol, dict(entry))
+        return len(entries)
+
+    def report(self):
+        """Katman metrikleri"""
+        with self._lock:
+            cold = sum(1 for entry in self.entries.values() if entry['tier'] == TIER_COLD)
+            total = len(self.entries)
+        print(f"\n🧊 TARAMA KATMANLARI ({total - cold} sıcak, {cold} soğuk):")
+        for name, value in self.metrics.items():
+            print(f"• {name}: {value}")
+        return self.metrics
@@ -0,0 +1,152 @@
+"""
+Çok süreçli tarama - coin listesi N sürece bölünür
+
+- Her süreç kendi exchange nesnesini ve rate limit payını kullanır
+- Pozisyon slotları ve aktif coinler SlotCoordinator (SQLite) ile paylaşılır,
+  süreçler toplamda MAX_OPEN_POSITIONS'ı asla aşmaz
+
+Kullanım:
+    python core/sharded_scan.py --workers 4
+    python core/sharded_scan.py --workers 4 --sim 400 --passes 1   # simüle borsa
+"""
+import sys
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+
+# Core klasörünü path'e ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from core.slot_coordinator import SlotCoordinator
+from Trade.trade_settings import TRADE_SETTINGS
+
+
+def split_pairs(pairs, workers):
+    """Coinleri süreçlere dağıt (sıralı dağıtım - listenin başındaki hacimli coinler dengelenir)"""
+    return [pairs[i::workers] for i in range(workers)]
+
+
+def build_exchange(index, workers, sim_pairs=None, speed=1000.0):
+    """
+    Sürecin exchange nesnesi
+
+    Canlıda ccxt rateLimit (istekler arası ms) süreç sayısıyla çarpılır, simülasyonda
+    ağırlık limiti bölünür - toplam istek hızı tek süreçle aynı kalır.
+    """
+    if sim_pairs is not None:
+        from core.sim_exchange import SimExchange, VirtualClock, BINANCE_WEIGHT_LIMIT
+        exchange = SimExchange(
+            sim_pairs, clock=VirtualClock(speed=speed),
+            weight_limit=BINANCE_WEIGHT_LIMIT // workers, on_rate_limit='wait', seed=index
+        )
+        exchange.load_markets()
+        return exchange
+
+    from monitor_multiple import load_config
+    from core.exchange_factory import get_exchange
+    config = load_config()
+    if not config:
+        return None
+    exchange = get_exchange(config, market_type='future')
+    exchange.rateLimit = exchange.rateLimit * workers
+    return exchange
+
+
+def run_worker(index, workers, pairs, coordinator, max_passes=None, sim=False, speed=1000.0):
+    """Tek sürecin tarama döngüsü"""
+    from monitor_multiple import monitor_all_coins
+
+    coordinator.owner = f"worker-{index}"
+    exchange = build_exchange(index, workers, pairs if sim else None, speed)
+    if exchange is None:
+        print(f"❌ worker-{index}: exchange oluşturulamadı")
+        return
+    print(f"🧵 worker-{index}: {len(pairs)} coin")
+    monitor_all_coins(exchange=exchange, pairs=pairs, max_passes=max_passes, coordinator=coordinator)
+
+
+def run_sharded(workers, pairs=None, max_passes=None, sim=False, speed=1000.0, coordinator=None, reset=False):
+    """
+    Coinleri N sürece bölüp tara
+
+    Args:
+        workers (int): Süreç sayısı
+        pairs (list): Coinler (None ise coinlist.json)
+        max_passes (int): Süreç başına tarama turu (None ise sonsuz)
+        sim (bool): Her süreç kendi SimExchange'ini kullanır
+        speed (float): Simülasyon saat hızı
+        coordinator (SlotCoordinator): Paylaşılan slotlar (None ise canlıda varsayılan dosya,
+            simülasyonda geçici dosya - canlı süreçlerin slotlarına dokunulmaz)
+        reset (bool): Başlamadan önce tüm slotları temizle (sadece açıkça istenirse)
+    """
+    if pairs is None:
+        from monitor_multiple import load_coin_list
+        pairs = load_coin_list()
+    if not pairs:
+        print("❌ Coin listesi yüklenemedi!")
+        return
+
+    sim_dir = None
+    if coordinator is None:
+        if sim:
+            sim_dir = tempfile.mkdtemp(prefix='slots_sim_')
+            coordinator = SlotCoordinator(path=os.path.join(sim_dir, 'slots.sqlite'))
+        else:
+            coordinator = SlotCoordinator()
+    if reset:
+        # Ölü süreçlerin rezervasyonları zaten düşer, açık slotları ilk sync'te devralınır
+        coordinator.reset()
+
+    # spawn: çocuk süreçler ebeveynin exchange/HTTP oturumlarını devralmaz
+    context = multiprocessing.get_context('spawn')
+    processes = []
+    for index, shard in enumerate(split_pairs(pairs, workers)):
+        process = context.Process(
+            target=run_worker, name=f"worker-{index}",
+            args=(index, workers, shard, coordinator, max_passes, sim, speed)
+        )
+        process.start()
+        processes.append(process)
+
+    print(f"\n🚀 {len(pairs)} coin {workers} sürece bölündü "
+          f"(toplam slot: {coordinator.max_slots})")
+
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        print("\n⏹️ Süreçler durduruluyor...")
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+    print(f"\n📊 Kullanılan slot: {coordinator.count()}/{coordinator.max_slots} - {sorted(coordinator.active_symbols())}")
+    if sim_dir is not None:
+        shutil.rmtree(sim_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Çok süreçli coin tarama")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--passes', type=int, default=None, help="Süreç başına tarama turu")
+    parser.add_argument('--sim', type=int, default=None, metavar='SEMBOL',
+                        help="Binance yerine bu kadar sembollü simüle borsa kullan")
+    parser.add_argument('--speed', type=float, default=1000.0)
+    parser.add_argument('--reset-slots', action='store_true',
+                        help="Paylaşılan slot tablosunu temizle (başka süreç çalışmıyorken)")
+    args = parser.parse_args()
+
+    pairs = None
+    if args.sim:
+        pairs = [f"SIM{i:04d}/USDT" for i in range(args.sim)]
+
+    start = time.perf_counter()
+    run_sharded(args.workers, pairs, args.passes, sim=args.sim is not None, speed=args.speed, reset=args.reset_slots)
+    print(f"⏱️ Toplam süre: {time.perf_counter() - start:.1f} sn "
+          f"(MAX_OPEN_POSITIONS={TRADE_SETTINGS['MAX_OPEN_POSITIONS']})")
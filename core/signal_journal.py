@@ -0,0 +1,260 @@
+"""
+Sinyal ve karar günlüğü - SQLite (WAL), sadece ekleme
+
+Her değerlendirilen aday (indikatör anlık görüntüsü, skor bileşenleri, karar)
+ve her işlem sonucu (emir ID'leri) bir satır olarak yazılır. Yazma işini arka
+plan thread'i toplu (batch) yapar; record() kuyruğa koyar ve hemen döner,
+kuyruk doluysa kayıt atılır (tarama döngüsü asla beklemez).
+
+Her satır ortamıyla (live/testnet/sim) yazılır. Simülasyon ve kaset oynatmaları
+(sanal saatli exchange) ayrı dosyaya yazar, canlı geçmişe karışmaz.
+
+Kullanım:
+    from core.signal_journal import get_journal
+    journal = get_journal(exchange)
+    journal.record('BTC/USDT', 'candidate', score=12, indicators={...})
+    journal.query(symbol='BTC/USDT', since=time.time() - 86400, environment='live')
+"""
+import os
+import json
+import time
+import queue
+import atexit
+import sqlite3
+import threading
+from core.exchange_factory import exchange_environment
+from Trade.trade_settings import TRADE_SETTINGS
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+DEFAULT_PATH = os.path.join(DATA_DIR, 'journal.sqlite')
+SIM_PATH = os.path.join(DATA_DIR, 'journal_sim.sqlite')
+
+# Sanal saatli exchange (SimExchange, ReplayExchange) ortamı
+ENVIRONMENT_SIM = 'sim'
+
+# Kararlar
+DECISION_VALIDATOR_REJECTED = 'validator_rejected'
+DECISION_LOW_SCORE = 'low_score'
+DECISION_CANDIDATE = 'candidate'
+DECISION_OPENED = 'opened'
+DECISION_OPEN_FAILED = 'open_failed'
+DECISION_NO_SLOT = 'no_slot'
+DECISION_PROVISIONAL = 'provisional'
+DECISION_CANCELLED = 'cancelled'
+DECISION_CORRELATED = 'correlated'
+
+COLUMNS = [
+    'ts', 'candle_ts', 'symbol', 'side', 'decision', 'score',
+    'score_components', 'indicators', 'order_ids', 'worker', 'environment',
+]
+JSON_COLUMNS = {'score_components', 'indicators', 'order_ids'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    candle_ts INTEGER,
+    symbol TEXT NOT NULL,
+    side TEXT,
+    decision TEXT NOT NULL,
+    score REAL,
+    score_components TEXT,
+    indicators TEXT,
+    order_ids TEXT,
+    worker TEXT,
+    environment TEXT
+);
+CREATE INDEX IF NOT EXISTS journal_symbol_ts ON journal (symbol, ts);
+CREATE INDEX IF NOT EXISTS journal_ts ON journal (ts);
+"""
+
+
+def _connect(path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # WAL'da NORMAL: her commit'te fsync yok, çökmede son batch kaybolabilir ama dosya bozulmaz
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    # Ortam kolonundan önce oluşturulmuş günlükler
+    if 'environment' not in {row[1] for row in conn.execute("PRAGMA table_info(journal)")}:
+        conn.execute("ALTER TABLE journal ADD COLUMN environment TEXT")
+    return conn
+
+
+def journal_environment(exchange):
+    """'sim' (sanal saat), 'testnet' veya 'live'"""
+    if getattr(exchange, 'clock', None) is not None:
+        return ENVIRONMENT_SIM
+    return exchange_environment(exchange)
+
+
+class SignalJournal:
+    """
+    Args:
+        path (str): SQLite dosyası
+        batch_size (int): Tek transaction'da yazılan en fazla satır
+        flush_interval (float): Kuyrukta bekleyen satırların en geç yazılma süresi (saniye)
+        max_queue (int): Kuyruk kapasitesi - doluysa yeni kayıtlar atılır
+        environment (str): Satırlara yazılan ortam (live/testnet/sim)
+    """
+    def __init__(self, path=DEFAULT_PATH, batch_size=500, flush_interval=1.0, max_queue=100000, environment=None):
+        self.path = path
+        self.environment = environment
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.worker = f"pid-{os.getpid()}"
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._read_conn = None
+        self.written = 0
+        self.dropped = 0
+
+    def _ensure_writer(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._writer, name='signal-journal', daemon=True)
+                self._thread.start()
+
+    def record(self, symbol, decision, side=None, score=None, score_components=None,
+               indicators=None, order_ids=None, candle_ts=None):
+        """Satırı kuyruğa ekle (beklemez)"""
+        self._ensure_writer()
+        row = (
+            time.time(), candle_ts, symbol, side, decision, score,
+            score_components, indicators, order_ids, self.worker, self.environment,
+        )
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def _encode(self, row):
+        # JSON dönüşümü tarama thread'inde değil, yazıcıda yapılır
+        return tuple(
+            json.dumps(value, default=float) if column in JSON_COLUMNS and value is not None else value
+            for column, value in zip(COLUMNS, row)
+        )
+
+    def _write(self, conn, batch):
+        try:
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO journal ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                    [self._encode(row) for row in batch]
+                )
+            self.written += len(batch)
+        except sqlite3.Error as e:
+            self.dropped += len(batch)
+            print(f"⚠️ Günlük yazılamadı ({len(batch)} satır): {str(e)}")
+
+    def _writer(self):
+        conn = _connect(self.path)
+        while True:
+            row = self._queue.get()
+            if row is None:
+                self._queue.task_done()
+                break
+            batch = [row]
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    row = self._queue.get(timeout=max(remaining, 0)) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if row is None:
+                    stop = True
+                    break
+                batch.append(row)
+            self._write(conn, batch)
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                break
+        conn.close()
+
+    def flush(self):
+        """Kuyruktaki tüm satırlar yazılana kadar bekle"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self):
+        """Kalanları yaz ve yazıcıyı durdur"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self._read_conn is not None:
+            self._read_conn.close()
+            self._read_conn = None
+
+    def query(self, symbol=None, since=None, until=None, decision=None, environment=None, limit=1000):
+        """
+        Günlükten oku (en yeni önce)
+
+        Args:
+            symbol (str): Coin
+            since, until (float): Unix zamanı (saniye)
+            decision (str): Karar filtresi
+            environment (str): Ortam filtresi (live/testnet/sim)
+        Returns:
+            list: Satır dict'leri (JSON kolonları çözülmüş)
+        """
+        if self._read_conn is None:
+            self._read_conn = _connect(self.path)
+        where, params = [], []
+        if symbol is not None:
+            where.append("symbol = ?")
+            params.append(symbol)
+        if since is not None:
+            where.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("ts < ?")
+            params.append(until)
+        if decision is not None:
+            where.append("decision = ?")
+            params.append(decision)
+        if environment is not None:
+            where.append("environment = ?")
+            params.append(environment)
+        sql = f"SELECT {', '.join(COLUMNS)} FROM journal"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY ts DESC LIMIT ?"
+        params.append(limit)
+
+        rows = []
+        for values in self._read_conn.execute(sql, params):
+            row = dict(zip(COLUMNS, values))
+            for column in JSON_COLUMNS:
+                if row[column] is not None:
+                    row[column] = json.loads(row[column])
+            rows.append(row)
+        return rows
+
+
+_journals = {}
+_journal_lock = threading.Lock()
+
+
+def get_journal(exchange):
+    """
+    Süreç genelinde ortam başına tek günlük (TRADE_SETTINGS['JOURNAL_ENABLED'] kapalıysa None)
+
+    Sanal saatli exchange'ler SIM_PATH'e yazar, üretim günlüğüne dokunmaz.
+    """
+    if not TRADE_SETTINGS['JOURNAL_ENABLED']:
+        return None
+    environment = journal_environment(exchange)
+    with _journal_lock:
+        journal = _journals.get(environment)
+        if journal is None:
+            path = SIM_PATH if environment == ENVIRONMENT_SIM else DEFAULT_PATH
+            journal = _journals[environment] = SignalJournal(path, environment=environment)
+            atexit.register(journal.close)
+        return journal
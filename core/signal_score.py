@@ -1,10 +1,69 @@
-import pandas as pd
+from core.lazy_import import lazy_import
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
 from datetime import datetime, timezone, timedelta
 from core.Math.volume_analyzer import VolumeAnalyzer
-from core.Math.stoch_rsi import calculate_stoch_rsi, stoch_rsi_points
-from core.Math.rsi_indicator import calculate_rsi, rsi_points
-from core.Math.bollinger_bands import calculate_bollinger_bands,  bb_points
-from core.Math.ema_ribbon import calculate_ema_signals
+from core.Math.stoch_rsi import stoch_rsi_points
+from core.Math.rsi_indicator import rsi_points
+from core.Math.bollinger_bands import bb_points
+from core.Math.indicator_registry import registry
+
+# Skorun kullandığı indikatör kolonları
+SCORE_COLUMNS = [
+    'rsi', 'stoch_rsi_k', 'stoch_rsi_d', 'bb_upper', 'bb_lower',
+] + [f'ema_{period}' for period in [5, 8, 13, 21, 34, 55, 89]]
+
+EMA_COLUMNS = SCORE_COLUMNS[5:]
+
+# Bileşenler (calculate_score'daki components anahtarları)
+SCORE_COMPONENTS = ['rsi', 'stoch_rsi', 'bb', 'ema_ribbon']
+
+
+def score_history(df, price=None):
+    """
+    Tüm mumlar ve iki yön için skor - calculate_score'un vektörel versiyonu
+
+    Kurallar calculate_score ile birebir aynıdır (NaN karşılaştırmaları da 0 puan verir),
+    son mumda aynı sonucu döndürür. Eşik çalışmaları için yüz binlerce mum tek seferde skorlanır.
+
+    Args:
+        df (DataFrame): OHLCV (SCORE_COLUMNS yoksa hesaplanır)
+        price (array): BB karşılaştırmasındaki fiyat (varsayılan: kapanış)
+
+    Returns:
+        DataFrame: buy_rsi, buy_stoch_rsi, buy_bb, buy_ema_ribbon, buy_score ve sell_* kolonları (int8)
+    """
+    if any(column not in df for column in SCORE_COLUMNS):
+        df = registry.compute(df.copy(), SCORE_COLUMNS)
+    rsi = df['rsi'].to_numpy()
+    stoch_k = df['stoch_rsi_k'].to_numpy()
+    stoch_d = df['stoch_rsi_d'].to_numpy()
+    upper_band = df['bb_upper'].to_numpy()
+    lower_band = df['bb_lower'].to_numpy()
+    emas = [df[column].to_numpy() for column in EMA_COLUMNS]
+    # Tekil versiyonda fiyat Python float'u: float32 bantlarla (düşük bellek modu) bant hassasiyetinde karşılaştırılır
+    price = np.asarray(df['close'].to_numpy() if price is None else price, dtype='float64')
+    price = price.astype(np.result_type(lower_band.dtype, upper_band.dtype), copy=False)
+
+    def points(best, good, best_points=3, good_points=2):
+        return np.where(best, best_points, np.where(good, good_points, 0)).astype('int8')
+
+    falling = [emas[i] > emas[i + 1] for i in range(len(emas) - 1)]
+    rising = [emas[i] < emas[i + 1] for i in range(len(emas) - 1)]
+
+    result = {
+        'buy_rsi': points((30 <= rsi) & (rsi <= 70), rsi < 30),
+        'buy_stoch_rsi': points((stoch_k < 20) & (stoch_d < 20), (stoch_k < 30) & (stoch_d < 30)),
+        'buy_bb': points(price <= lower_band, price <= lower_band * 1.01),
+        'buy_ema_ribbon': points(np.logical_and.reduce(falling), np.logical_and.reduce(falling[:3]), 9, 6),
+        'sell_rsi': points(rsi >= 70, rsi > 30),
+        'sell_stoch_rsi': points((stoch_k > 80) & (stoch_d > 80), (stoch_k > 70) & (stoch_d > 70)),
+        'sell_bb': points(price >= upper_band, price >= upper_band * 0.99),
+        'sell_ema_ribbon': points(np.logical_and.reduce(rising), np.logical_and.reduce(rising[:3]), 9, 6),
+    }
+    for side in ('buy', 'sell'):
+        result[f'{side}_score'] = sum(result[f'{side}_{name}'] for name in SCORE_COMPONENTS).astype('int8')
+    return pd.DataFrame(result, index=df.index)
 
 class SignalScore:
     def __init__(self, exchange):
@@ -61,27 +120,28 @@ class SignalScore:
             print(f"❌ EMA Ribbon skor hesaplama hatası: {str(e)}")
             return 0
 
-    def calculate_score(self, signal_data):
-        """Sinyal skorunu hesapla (toplam 18 puan)"""
+    def calculate_score(self, signal_data, components=None):
+        """
+        Sinyal skorunu hesapla (toplam 18 puan)
+
+        components (dict) verilirse bileşen puanları içine yazılır (rsi, stoch_rsi, bb, ema_ribbon)
+        """
+        if components is None:
+            components = {}
         try:
             score = 0
             print("\n📊 SKOR HESAPLAMA:")
             print("="*40)
 
             # OHLCV verilerini al
-            ohlcv = self.exchange.fetch_ohlcv(signal_data['symbol'], '5m', limit=100)
+            # Mum sayısı skor indikatörlerinin ısınmasına göre planlanır (EMA89 için 100 mum yetmez)
+            ohlcv = self.exchange.fetch_ohlcv(signal_data['symbol'], '5m', limit=registry.lookback(SCORE_COLUMNS))
             df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
             df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
             df.set_index('timestamp', inplace=True)
             
             # İndikatörleri hesapla
-            df = calculate_rsi(df)
-            df = calculate_stoch_rsi(df)
-            df = calculate_bollinger_bands(df)
-            
-            # EMA'ları hesapla
-            for period in [5, 8, 13, 21, 34, 55, 89]:
-                df[f'ema_{period}'] = df['close'].ewm(span=period, adjust=False).mean()
+            df = registry.compute(df, SCORE_COLUMNS, symbol=signal_data['symbol'])
             
             # RSI Analizi (0-3 puan)
             rsi_value = df['rsi'].iloc[-1]
@@ -99,6 +159,7 @@ class SignalScore:
                     rsi_score = 2
                     
             score += rsi_score
+            components['rsi'] = rsi_score
             print(f"• RSI Skoru: {rsi_score}/3 (RSI: {rsi_value:.1f})")
             
             # Stochastic RSI Analizi (0-3 puan)
@@ -118,6 +179,7 @@ class SignalScore:
                     stoch_score = 2
                     
             score += stoch_score
+            components['stoch_rsi'] = stoch_score
             print(f"• Stoch RSI Skoru: {stoch_score}/3 (K: {stoch_k:.1f}, D: {stoch_d:.1f})")
             
             # Bollinger Bands Analizi (0-3 puan)
@@ -138,6 +200,7 @@ class SignalScore:
                     bb_score = 2
                     
             score += bb_score
+            components['bb'] = bb_score
             print(f"• BB Skoru: {bb_score}/3")
             
             # EMA Ribbon Analizi (0-9 puan)
@@ -165,6 +228,7 @@ class SignalScore:
                         ema_score = 6
                         
                 score += ema_score
+                components['ema_ribbon'] = ema_score
                 print(f"• EMA Ribbon Skoru: {ema_score}/9")
                 
             except Exception as e:
@@ -179,6 +243,10 @@ class SignalScore:
             print(f"❌ Skor hesaplama hatası: {str(e)}")
             return 0
 
+    def score_history(self, df, price=None):
+        """Geçmişteki her mum için iki yönlü skor (bkz. score_history)"""
+        return score_history(df, price)
+
     def calculate_ema_score(self, ema_values, signal_type):
         """EMA Ribbon skoru hesapla"""
         try:
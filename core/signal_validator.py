@@ -1,8 +1,9 @@
-from core.Math.bollinger_bands import calculate_bollinger_bands
-from core.Math.stoch_rsi import calculate_stoch_rsi
-from core.Math.rsi_indicator import calculate_rsi
+from core.Math.indicator_registry import registry
 from core.Math.consolidation_analyzer import ConsolidationAnalyzer
 
+# Validasyonun kullandığı indikatör kolonları
+VALIDATOR_COLUMNS = ['bb_upper', 'bb_basis', 'bb_lower', 'stoch_rsi_k', 'stoch_rsi_d', 'rsi']
+
 class SignalValidator:
     def __init__(self, exchange):
         self.exchange = exchange
@@ -12,10 +13,8 @@ class SignalValidator:
         try:
             print("\n--------------------------------------------------")
             
-            # İndikatörleri hesapla
-            df = calculate_bollinger_bands(df)
-            df = calculate_stoch_rsi(df)
-            df = calculate_rsi(df)
+            # İndikatörleri hesapla (tarama sırasında hesaplandıysa hafızadan gelir)
+            df = registry.compute(df, VALIDATOR_COLUMNS, symbol=signal_data.get('symbol'))
             
             # Konsolidasyon Analizi
             cons_result = self.consolidation_analyzer.analyze(df)
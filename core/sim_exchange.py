@@ -0,0 +1,716 @@
+"""
+Simüle Binance Futures borsası - ağa çıkmadan yük testi için
+ccxt.binance ile aynı metod isimlerini ve dönüş formatlarını kullanır
+"""
+import io
+import time
+import random
+import zlib
+import contextlib
+from core.lazy_import import lazy_import
+ccxt = lazy_import('ccxt')
+np = lazy_import('numpy')
+
+# Binance Futures REQUEST_WEIGHT limiti (dakikalık)
+BINANCE_WEIGHT_LIMIT = 2400
+
+# Endpoint ağırlıkları (Binance USDⓈ-M dokümantasyonu)
+ENDPOINT_WEIGHTS = {
+    'exchangeInfo': 1,
+    'ticker': 1,
+    'tickers': 40,
+    'positionRisk': 5,
+    'balance': 5,
+    'order': 1,
+    'openOrders': 1,
+    'leverage': 1,
+    'marginType': 1,
+    'time': 1,
+}
+
+
+# ccxt durumu -> Binance emir durumu (user-data stream 'X' alanı)
+ORDER_STATUS_CODES = {
+    'open': 'NEW',
+    'closed': 'FILLED',
+    'canceled': 'CANCELED',
+    'expired': 'EXPIRED',
+    'rejected': 'REJECTED',
+}
+
+
+def klines_weight(limit):
+    """fetch_ohlcv ağırlığı limit'e göre değişir"""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+def quiet(verbose):
+    """Monitor çıktısını bastır (yük testi ve kaset oynatma; print maliyeti yine ölçüme dahil)"""
+    if verbose:
+        return contextlib.nullcontext()
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+class VirtualClock:
+    """
+    Sanal saat
+
+    speed=1000 ise gerçek 1 saniye sanal 1000 saniyeye denk gelir.
+    speed=None ise saat sadece advance() ile ilerler (tam deterministik).
+    """
+    def __init__(self, start_ms=None, speed=1000.0):
+        self.start_ms = int(start_ms if start_ms is not None else time.time() * 1000)
+        self.speed = speed
+        self._real_start = time.perf_counter()
+        self._offset_ms = 0.0
+
+    def now_ms(self):
+        """Sanal zaman (ms)"""
+        elapsed = 0.0
+        if self.speed:
+            elapsed = (time.perf_counter() - self._real_start) * 1000 * self.speed
+        return int(self.start_ms + elapsed + self._offset_ms)
+
+    def advance(self, ms):
+        """Sanal saati beklemeden ileri al"""
+        self._offset_ms += ms
+
+    def sleep(self, seconds):
+        """Sanal süre kadar bekle - gerçekte seconds/speed kadar uyur"""
+        if self.speed:
+            time.sleep(seconds / self.speed)
+        else:
+            self.advance(seconds * 1000)
+
+
+class SyntheticCandles:
+    """
+    Sembol başına deterministik rastgele yürüyüş mumları
+
+    Trend rejimleri arasında geçiş yaptığı için RangeFilter sinyalleri de üretir.
+    Mumlar ihtiyaç oldukça parça parça üretilir.
+    """
+    def __init__(self, origin_ms, timeframe='5m', seed=42, volatility=0.004, chunk=1024):
+        self.origin_ms = origin_ms
+        self.timeframe_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+        self.seed = seed
+        self.volatility = volatility
+        self.chunk = chunk
+        self._series = {}
+
+    def _generate(self, symbol, count):
+        state = self._series.get(symbol)
+        if state is None:
+            rng = np.random.default_rng([self.seed, zlib.crc32(symbol.encode())])
+            price = float(10 ** rng.uniform(-2, 4))
+            state = {'rng': rng, 'last': price, 'data': np.empty((0, 5))}
+            self._series[symbol] = state
+
+        rng = state['rng']
+        vol = self.volatility
+        # Her 50-300 mumda bir değişen trend rejimi
+        drift = np.repeat(rng.normal(0, vol / 4, count // 50 + 1), 50)[:count]
+        returns = rng.normal(drift, vol, count)
+        closes = state['last'] * np.exp(np.cumsum(returns))
+        opens = np.concatenate(([state['last']], closes[:-1]))
+        wick = np.abs(rng.normal(0, vol / 2, (2, count)))
+        highs = np.maximum(opens, closes) * (1 + wick[0])
+        lows = np.minimum(opens, closes) * (1 - wick[1])
+        volumes = rng.lognormal(8, 1, count) * (1 + np.abs(returns) / vol)
+
+        block = np.column_stack([opens, highs, lows, closes, volumes])
+        state['data'] = np.vstack([state['data'], block])
+        state['last'] = float(closes[-1])
+
+    def bars(self, symbol, start_index, end_index):
+        """[start_index, end_index) aralığındaki mumlar (o, h, l, c, v)"""
+        start_index = max(start_index, 0)
+        state = self._series.get(symbol)
+        have = 0 if state is None else len(state['data'])
+        if end_index > have:
+            need = end_index - have
+            self._generate(symbol, -(-need // self.chunk) * self.chunk)
+        return self._series[symbol]['data'][start_index:end_index]
+
+
+class RecordedCandles:
+    """
+    Kaydedilmiş mumlar - {symbol: [[timestamp, o, h, l, c, v], ...]}
+
+    Tüm semboller aynı zaman eksenini paylaşmalı (ilk mumun timestamp'i origin olur).
+    """
+    def __init__(self, ohlcv_by_symbol, timeframe='5m'):
+        self.timeframe_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+        self._data = {}
+        self.origin_ms = None
+        for symbol, rows in ohlcv_by_symbol.items():
+            arr = np.asarray(rows, dtype='float64')
+            if self.origin_ms is None or arr[0, 0] < self.origin_ms:
+                self.origin_ms = int(arr[0, 0])
+            self._data[symbol] = arr
+
+    def bars(self, symbol, start_index, end_index):
+        arr = self._data[symbol]
+        offset = int((arr[0, 0] - self.origin_ms) // self.timeframe_ms)
+        lo = max(start_index - offset, 0)
+        hi = max(end_index - offset, 0)
+        return arr[lo:hi, 1:6]
+
+
+class SyntheticTrades:
+    """
+    Mumlardan türetilen aggTrade akışı - canlı WebSocket yerine yerel test için
+
+    Her mum açılış -> (düşüş mumunda önce tepe, yükselişte önce dip) -> diğer uç -> kapanış
+    yolunu izleyen işlemlere bölünür; aynı zaman diliminde toplanan işlemler mumu birebir verir.
+    """
+    def __init__(self, candles, trades_per_bar=20):
+        self.candles = candles
+        self.trades_per_bar = max(trades_per_bar, 4)
+
+    def trades(self, symbol, start_ms, end_ms):
+        """[start_ms, end_ms) aralığındaki işlemler: (timestamp, fiyat, miktar, alıcı_maker)"""
+        tf_ms = self.candles.timeframe_ms
+        origin = self.candles.origin_ms
+        first = max((start_ms - origin) // tf_ms, 0)
+        last = -(-(end_ms - origin) // tf_ms)
+        n = self.trades_per_bar
+        offsets = np.arange(n) * tf_ms // n
+        # Tepe ve dip işlem olarak mutlaka görülsün
+        positions = np.linspace(0, 3, n)
+        for vertex in (1, 2):
+            positions[np.abs(positions - vertex).argmin()] = vertex
+        for k, (o, h, l, c, v) in enumerate(self.candles.bars(symbol, first, last)):
+            bar_ts = origin + (first + k) * tf_ms
+            path = [o, h, l, c] if c < o else [o, l, h, c]
+            prices = np.interp(positions, [0, 1, 2, 3], path)
+            quantity = float(v) / n
+            for offset, price, previous in zip(offsets, prices, np.concatenate(([prices[0]], prices[:-1]))):
+                ts = int(bar_ts + offset)
+                if start_ms <= ts < end_ms:
+                    yield ts, float(price), quantity, bool(price < previous)
+
+
+class SimExchange:
+    """
+    ccxt.binance uyumlu sahte futures borsası
+
+    Args:
+        symbols (list): 'BTC/USDT' formatında semboller
+        candles: SyntheticCandles veya RecordedCandles
+        clock (VirtualClock): Sanal saat
+        latency_ms (tuple): (ortalama, sapma) - her istek için sanal gecikme
+        weight_limit (int): Dakikalık istek ağırlığı limiti
+        on_rate_limit (str): 'raise' (429 gibi hata) veya 'wait' (pencereyi bekle)
+        balance (float): Başlangıç USDT bakiyesi
+    """
+    def __init__(self, symbols, candles=None, clock=None, latency_ms=(0, 0),
+                 weight_limit=BINANCE_WEIGHT_LIMIT, on_rate_limit='raise',
+                 balance=10000.0, slippage_bps=1.0, seed=42):
+        self.clock = clock or VirtualClock()
+        self.candles = candles or SyntheticCandles(
+            self.clock.now_ms() - 1500 * 300_000, seed=seed
+        )
+        self.timeframe_ms = self.candles.timeframe_ms
+        self.latency_ms = latency_ms
+        self.weight_limit = weight_limit
+        self.on_rate_limit = on_rate_limit
+        self.slippage_bps = slippage_bps
+        self._rng = random.Random(seed)
+
+        # ccxt ile aynı public attribute'lar
+        self.id = 'binance'
+        self.options = {'defaultType': 'future'}
+        self.enableRateLimit = True
+        self.rateLimit = 50
+        self.markets = None
+        self.markets_by_id = None
+        self.last_response_headers = {}
+
+        self.symbols = list(symbols)
+        self._markets = {s: self._build_market(s) for s in self.symbols}
+        self._by_id = {m['id']: m for m in self._markets.values()}
+
+        self.balance = float(balance)
+        self.positions = {}
+        self.orders = {}
+        self.leverage = {}
+        self.margin_mode = {}
+        self._order_seq = 0
+        # Kullanıcı veri akışı (user-data stream) dinleyicileri - Binance WebSocket olay formatı
+        self._user_data_listeners = []
+
+        # İstatistikler
+        self.weight_window = None
+        self.weight_used = 0
+        self.request_count = {}
+        self.rate_limit_hits = 0
+
+    # ------------------------------------------------------------------
+    # İç yardımcılar
+    # ------------------------------------------------------------------
+    def _build_market(self, symbol):
+        base, quote = symbol.split('/')
+        seed = zlib.crc32(symbol.encode())
+        tick_exp = 2 + seed % 5
+        step_exp = seed % 4
+        tick = 10 ** -tick_exp
+        step = 10 ** -step_exp
+        return {
+            'id': base + quote,
+            'symbol': symbol,
+            'base': base,
+            'quote': quote,
+            'settle': quote,
+            'type': 'future',
+            'spot': False,
+            'future': True,
+            'swap': True,
+            'linear': True,
+            'contract': True,
+            'active': True,
+            'precision': {'amount': step, 'price': tick},
+            'limits': {
+                'amount': {'min': step, 'max': 1e7},
+                'price': {'min': tick, 'max': 1e7},
+                'cost': {'min': 5.0, 'max': None},
+                'leverage': {'min': 1, 'max': 125},
+            },
+            'info': {
+                'symbol': base + quote,
+                'filters': [
+                    {'filterType': 'PRICE_FILTER', 'tickSize': f'{tick:.{tick_exp}f}',
+                     'minPrice': f'{tick:.{tick_exp}f}', 'maxPrice': '10000000'},
+                    {'filterType': 'LOT_SIZE', 'stepSize': f'{step:.{step_exp}f}',
+                     'minQty': f'{step:.{step_exp}f}', 'maxQty': '10000000'},
+                    {'filterType': 'MARKET_LOT_SIZE', 'stepSize': f'{step:.{step_exp}f}',
+                     'minQty': f'{step:.{step_exp}f}', 'maxQty': '10000000'},
+                    {'filterType': 'MIN_NOTIONAL', 'notional': '5'},
+                ],
+            },
+        }
+
+    def _request(self, endpoint, weight=None):
+        """Gecikme ve ağırlık limitini simüle et"""
+        weight = ENDPOINT_WEIGHTS.get(endpoint, 1) if weight is None else weight
+        self.request_count[endpoint] = self.request_count.get(endpoint, 0) + 1
+
+        mean, jitter = self.latency_ms
+        if mean or jitter:
+            delay = max(0.0, self._rng.gauss(mean, jitter))
+            self.clock.sleep(delay / 1000)
+
+        # Binance sabit dakikalık pencere kullanır
+        window = self.clock.now_ms() // 60_000
+        if window != self.weight_window:
+            self.weight_window = window
+            self.weight_used = 0
+
+        if self.weight_used + weight > self.weight_limit:
+            self.rate_limit_hits += 1
+            if self.on_rate_limit == 'wait':
+                wait_ms = (window + 1) * 60_000 - self.clock.now_ms()
+                self.clock.sleep(wait_ms / 1000)
+                return self._request(endpoint, weight)
+            raise ccxt.RateLimitExceeded(
+                f'binance 429 Too Many Requests (weight {self.weight_used}/{self.weight_limit})'
+            )
+
+        self.weight_used += weight
+        self.last_response_headers = {'x-mbx-used-weight-1m': str(self.weight_used)}
+
+    def market(self, symbol):
+        """Symbol ('BTC/USDT', 'BTC/USDT:USDT') veya id ('BTCUSDT') ile market bul"""
+        if symbol in self._markets:
+            return self._markets[symbol]
+        if symbol in self._by_id:
+            return self._by_id[symbol]
+        unified = symbol.split(':')[0]
+        if unified in self._markets:
+            return self._markets[unified]
+        raise ccxt.BadSymbol(f'binance does not have market symbol {symbol}')
+
+    def _bar_index(self, ts_ms):
+        return int((ts_ms - self.candles.origin_ms) // self.timeframe_ms)
+
+    def _price(self, symbol):
+        """Aktif mumun o anki fiyatı (açılıştan kapanışa doğrusal)"""
+        now = self.clock.now_ms()
+        i = self._bar_index(now)
+        o, h, l, c, v = self.candles.bars(symbol, i, i + 1)[0]
+        frac = (now - self.candles.origin_ms - i * self.timeframe_ms) / self.timeframe_ms
+        return float(o + (c - o) * frac)
+
+    def _forming_bar(self, symbol, i, now):
+        o, h, l, c, v = self.candles.bars(symbol, i, i + 1)[0]
+        frac = (now - self.candles.origin_ms - i * self.timeframe_ms) / self.timeframe_ms
+        price = o + (c - o) * frac
+        return [float(o), float(max(o, price)), float(min(o, price)), float(price), float(v * frac)]
+
+    def _next_order_id(self):
+        self._order_seq += 1
+        return str(10_000_000 + self._order_seq)
+
+    def _process_triggers(self):
+        """Açık STOP_MARKET / TAKE_PROFIT_MARKET emirlerini kontrol et - O(açık emir)"""
+        now = self.clock.now_ms()
+        for order in list(self.orders.values()):
+            if order['status'] != 'open' or order['stopPrice'] is None:
+                continue
+            symbol = order['symbol']
+            # Emrin verildiği mumdan sonra kapanan mumlar + anlık fiyat
+            start = self._bar_index(order['timestamp']) + 1
+            end = self._bar_index(now)
+            bars = self.candles.bars(symbol, start, end)
+            highs = [float(b[1]) for b in bars] + [self._price(symbol)]
+            lows = [float(b[2]) for b in bars] + [self._price(symbol)]
+            stop = order['stopPrice']
+
+            # Long SL / Short TP fiyat düşünce, Long TP / Short SL fiyat yükselince tetiklenir
+            falling = (order['type'] == 'STOP_MARKET') == (order['side'] == 'sell')
+            if falling and min(lows) <= stop or not falling and max(highs) >= stop:
+                self._fill(order, stop)
+
+    def _fill(self, order, price):
+        symbol = order['symbol']
+        pos = self.positions.get(symbol, {'contracts': 0.0, 'side': None, 'entryPrice': 0.0})
+        signed = pos['contracts'] if pos['side'] == 'long' else -pos['contracts']
+        delta = order['amount'] if order['side'] == 'buy' else -order['amount']
+
+        if order['reduceOnly']:
+            # Reduce-only emir pozisyonu büyütemez veya ters çeviremez
+            if signed == 0 or (signed > 0) == (delta > 0):
+                order['status'] = 'expired'
+                order['remaining'] = order['amount']
+                self._emit_order(order, 'EXPIRED')
+                return
+            delta = max(-abs(signed), min(abs(signed), delta))
+
+        slip = self.slippage_bps / 10_000
+        fill_price = price * (1 + slip) if delta > 0 else price * (1 - slip)
+        leverage = self.leverage.get(symbol, 20)
+
+        new_signed = signed + delta
+        if signed == 0 or (signed > 0) == (delta > 0):
+            margin = abs(delta) * fill_price / leverage
+            if margin > self.balance:
+                order['status'] = 'rejected'
+                raise ccxt.InsufficientFunds('binance Margin is insufficient.')
+            self.balance -= margin
+            entry = (abs(signed) * pos['entryPrice'] + abs(delta) * fill_price) / abs(new_signed)
+        else:
+            closed = min(abs(delta), abs(signed))
+            direction = 1 if signed > 0 else -1
+            pnl = (fill_price - pos['entryPrice']) * closed * direction
+            self.balance += closed * pos['entryPrice'] / leverage + pnl
+            entry = pos['entryPrice']
+            if abs(delta) > abs(signed):
+                # Pozisyon ters yöne döndü
+                self.balance -= (abs(delta) - closed) * fill_price / leverage
+                entry = fill_price
+
+        self.positions[symbol] = {
+            'contracts': abs(new_signed),
+            'side': None if new_signed == 0 else ('long' if new_signed > 0 else 'short'),
+            'entryPrice': entry if new_signed else 0.0,
+        }
+        order.update({
+            'status': 'closed',
+            'filled': abs(delta),
+            'remaining': order['amount'] - abs(delta),
+            'average': fill_price,
+            'lastTradeTimestamp': self.clock.now_ms(),
+        })
+        self._emit_order(order, 'TRADE', abs(delta), fill_price)
+        self._emit_account(symbol)
+
+    def _emit_order(self, order, execution, last_qty=0.0, last_price=0.0):
+        """ORDER_TRADE_UPDATE olayı (fapi user-data stream formatı)"""
+        if not self._user_data_listeners:
+            return
+        now = self.clock.now_ms()
+        status = ORDER_STATUS_CODES[order['status']]
+        if status == 'FILLED' and order['remaining'] > 0:
+            status = 'PARTIALLY_FILLED'
+        event = {
+            'e': 'ORDER_TRADE_UPDATE', 'E': now, 'T': now,
+            'o': {
+                's': self.market(order['symbol'])['id'],
+                'c': order['clientOrderId'],
+                'S': order['side'].upper(),
+                'o': order['type'].upper(),
+                'q': str(order['amount']),
+                'p': str(order['price'] or 0),
+                'ap': str(order['average'] or 0),
+                'sp': str(order['stopPrice'] or 0),
+                'x': execution,
+                'X': status,
+                'i': int(order['id']),
+                'l': str(last_qty),
+                'z': str(order['filled']),
+                'L': str(last_price),
+                'T': now,
+                't': self._order_seq if execution == 'TRADE' else 0,
+                'R': order['reduceOnly'],
+            },
+        }
+        for listener in list(self._user_data_listeners):
+            listener(event)
+
+    def _emit_account(self, symbol):
+        """ACCOUNT_UPDATE olayı (pozisyon değişti)"""
+        if not self._user_data_listeners:
+            return
+        now = self.clock.now_ms()
+        pos = self.positions.get(symbol, {'contracts': 0.0, 'side': None, 'entryPrice': 0.0})
+        amount = pos['contracts'] if pos['side'] == 'long' else -pos['contracts']
+        event = {
+            'e': 'ACCOUNT_UPDATE', 'E': now, 'T': now,
+            'a': {
+                'm': 'ORDER',
+                'B': [{'a': 'USDT', 'wb': str(self.balance)}],
+                'P': [{'s': self.market(symbol)['id'], 'pa': str(amount), 'ep': str(pos['entryPrice'])}],
+            },
+        }
+        for listener in list(self._user_data_listeners):
+            listener(event)
+
+    def subscribe_user_data(self, listener):
+        """Binance futures user-data stream yerine - listener(olay) her emir/pozisyon değişiminde çağrılır"""
+        self._user_data_listeners.append(listener)
+
+    def unsubscribe_user_data(self, listener):
+        if listener in self._user_data_listeners:
+            self._user_data_listeners.remove(listener)
+
+    def tick(self):
+        """Tetik emirlerini kontrol et (borsanın eşleştirme motoru gibi, istek ağırlığı yok)"""
+        self._process_triggers()
+
+    # ------------------------------------------------------------------
+    # ccxt uyumlu public API
+    # ------------------------------------------------------------------
+    def milliseconds(self):
+        return self.clock.now_ms()
+
+    def load_time_difference(self, params={}):
+        self._request('time')
+        return 0
+
+    def load_markets(self, reload=False, params={}):
+        if self.markets is None or reload:
+            self._request('exchangeInfo')
+            self.markets = dict(self._markets)
+            self.markets_by_id = {k: [v] for k, v in self._by_id.items()}
+        return self.markets
+
+    def set_markets(self, markets, currencies=None):
+        self.markets = markets
+        self.markets_by_id = {m['id']: [m] for m in markets.values()}
+        return self.markets
+
+    def fetch_ohlcv(self, symbol, timeframe='5m', since=None, limit=None, params={}):
+        limit = 500 if limit is None else limit
+        self._request('klines', klines_weight(limit))
+        market = self.market(symbol)
+
+        tf_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+        if tf_ms % self.timeframe_ms:
+            raise ccxt.BadRequest(f'Simülasyon {timeframe} zaman dilimini desteklemiyor')
+        ratio = tf_ms // self.timeframe_ms
+
+        now = self.clock.now_ms()
+        origin = self.candles.origin_ms
+        last = (now - origin) // tf_ms
+        first = last - limit + 1 if since is None else -(-(since - origin) // tf_ms)
+        first = max(first, 0)
+        end = min(first + limit, last + 1)
+
+        rows = []
+        base = self.candles.bars(market['symbol'], first * ratio, end * ratio)
+        for k in range(end - first):
+            ts = origin + (first + k) * tf_ms
+            chunk = base[k * ratio:(k + 1) * ratio]
+            if first + k == last:
+                # Aktif (kapanmamış) mum
+                i = self._bar_index(now)
+                done = chunk[:i - (first + k) * ratio]
+                forming = self._forming_bar(market['symbol'], i, now)
+                o = float(done[0, 0]) if len(done) else forming[0]
+                h = max([forming[1]] + [float(x) for x in done[:, 1]])
+                l = min([forming[2]] + [float(x) for x in done[:, 2]])
+                v = float(done[:, 4].sum()) + forming[4]
+                rows.append([ts, o, h, l, forming[3], v])
+            elif len(chunk):
+                rows.append([ts, float(chunk[0, 0]), float(chunk[:, 1].max()),
+                             float(chunk[:, 2].min()), float(chunk[-1, 3]), float(chunk[:, 4].sum())])
+        return rows
+
+    def _ticker(self, symbol):
+        now = self.clock.now_ms()
+        i = self._bar_index(now)
+        day = self.candles.bars(symbol, i - 288, i)
+        last = self._price(symbol)
+        open_ = float(day[0, 0]) if len(day) else last
+        quote_volume = float((day[:, 4] * day[:, 3]).sum()) if len(day) else 0.0
+        return {
+            'symbol': symbol,
+            'timestamp': now,
+            'last': last,
+            'close': last,
+            'bid': last,
+            'ask': last,
+            'open': open_,
+            'high': float(day[:, 1].max()) if len(day) else last,
+            'low': float(day[:, 2].min()) if len(day) else last,
+            'change': last - open_,
+            'percentage': (last - open_) / open_ * 100,
+            'baseVolume': float(day[:, 4].sum()) if len(day) else 0.0,
+            'quoteVolume': quote_volume,
+        }
+
+    def fetch_ticker(self, symbol, params={}):
+        self._request('ticker')
+        return self._ticker(self.market(symbol)['symbol'])
+
+    def fetch_tickers(self, symbols=None, params={}):
+        self._request('tickers')
+        symbols = symbols or self.symbols
+        return {s: self._ticker(self.market(s)['symbol']) for s in symbols}
+
+    def fetch_balance(self, params={}):
+        self._request('balance')
+        self._process_triggers()
+        used = sum(
+            p['contracts'] * p['entryPrice'] / self.leverage.get(s, 20)
+            for s, p in self.positions.items()
+        )
+        return {
+            'USDT': {'free': self.balance, 'used': used, 'total': self.balance + used},
+            'free': {'USDT': self.balance},
+            'used': {'USDT': used},
+            'total': {'USDT': self.balance + used},
+        }
+
+    def fetch_positions(self, symbols=None, params={}):
+        self._request('positionRisk')
+        self._process_triggers()
+        result = []
+        for symbol, pos in self.positions.items():
+            if symbols and symbol not in symbols:
+                continue
+            mark = self._price(symbol)
+            direction = 1 if pos['side'] == 'long' else -1
+            result.append({
+                'symbol': symbol,
+                'contracts': pos['contracts'],
+                'contractSize': 1.0,
+                'side': pos['side'],
+                'entryPrice': pos['entryPrice'],
+                'markPrice': mark,
+                'notional': pos['contracts'] * mark,
+                'leverage': self.leverage.get(symbol, 20),
+                'unrealizedPnl': (mark - pos['entryPrice']) * pos['contracts'] * direction,
+                'marginMode': self.margin_mode.get(symbol, 'cross'),
+                'info': {'symbol': self.market(symbol)['id'], 'positionAmt': str(pos['contracts'] * direction)},
+            })
+        return result
+
+    def set_leverage(self, leverage, symbol=None, params={}):
+        self._request('leverage')
+        self.leverage[self.market(symbol)['symbol']] = int(leverage)
+        return {'leverage': int(leverage), 'symbol': symbol}
+
+    def set_margin_mode(self, marginMode, symbol=None, params={}):
+        self._request('marginType')
+        market = self.market(symbol)
+        if self.margin_mode.get(market['symbol']) == marginMode.lower():
+            raise ccxt.MarginModeAlreadySet('binance {"code":-4046,"msg":"No need to change margin type."}')
+        self.margin_mode[market['symbol']] = marginMode.lower()
+        return {'code': 200, 'msg': 'success'}
+
+    def fapiPrivate_post_margintype(self, params={}):
+        return self.set_margin_mode(params['marginType'], params['symbol'])
+
+    def fapiPrivate_post_leverage(self, params={}):
+        return self.set_leverage(params['leverage'], params['symbol'])
+
+    def create_order(self, symbol, type, side, amount, price=None, params={}):
+        self._request('order')
+        market = self.market(symbol)
+        amount = float(amount)
+        if amount <= 0:
+            raise ccxt.InvalidOrder('binance Quantity less than or equal to zero.')
+
+        order_type = type.upper()
+        now = self.clock.now_ms()
+        order = {
+            'id': self._next_order_id(),
+            'clientOrderId': params.get('newClientOrderId', params.get('clientOrderId')),
+            'timestamp': now,
+            'datetime': ccxt.Exchange.iso8601(now),
+            'lastTradeTimestamp': None,
+            'symbol': market['symbol'],
+            'type': order_type if order_type in ('STOP_MARKET', 'TAKE_PROFIT_MARKET') else type.lower(),
+            'side': side.lower(),
+            'price': price,
+            'stopPrice': params.get('stopPrice'),
+            'amount': amount,
+            'filled': 0.0,
+            'remaining': amount,
+            'average': None,
+            'status': 'open',
+            'reduceOnly': bool(params.get('reduceOnly', False)),
+            'info': {'symbol': market['id']},
+        }
+        if order['clientOrderId'] is None:
+            order['clientOrderId'] = f"sim_{order['id']}"
+        self.orders[order['id']] = order
+        self._emit_order(order, 'NEW')
+
+        if order_type == 'MARKET':
+            self._fill(order, self._price(market['symbol']))
+        elif order_type in ('STOP_MARKET', 'TAKE_PROFIT_MARKET'):
+            if order['stopPrice'] is None:
+                raise ccxt.InvalidOrder('binance stopPrice zorunlu')
+        elif order_type == 'LIMIT':
+            last = self._price(market['symbol'])
+            if (order['side'] == 'buy' and price >= last) or (order['side'] == 'sell' and price <= last):
+                self._fill(order, last)
+        else:
+            raise ccxt.InvalidOrder(f'binance Simülasyon {type} emir tipini desteklemiyor')
+        return dict(order)
+
+    def create_market_order(self, symbol, side, amount, price=None, params={}):
+        return self.create_order(symbol, 'market', side, amount, price, params)
+
+    def fetch_order(self, id, symbol=None, params={}):
+        self._request('order')
+        self._process_triggers()
+        if id not in self.orders:
+            raise ccxt.OrderNotFound(f'binance Order does not exist. ({id})')
+        return dict(self.orders[id])
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None, params={}):
+        self._request('openOrders', 1 if symbol else 40)
+        self._process_triggers()
+        wanted = self.market(symbol)['symbol'] if symbol else None
+        return [
+            dict(o) for o in self.orders.values()
+            if o['status'] == 'open' and (wanted is None or o['symbol'] == wanted)
+        ]
+
+    def cancel_order(self, id, symbol=None, params={}):
+        self._request('order')
+        order = self.orders.get(id)
+        if order is None or order['status'] != 'open':
+            raise ccxt.OrderNotFound(f'binance Unknown order sent. ({id})')
+        order['status'] = 'canceled'
+        self._emit_order(order, 'CANCELED')
+        return dict(order)
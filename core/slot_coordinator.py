@@ -0,0 +1,250 @@
+"""
+Pozisyon slot koordinatörü - birden fazla tarama süreci aynı MAX_OPEN_POSITIONS
+limitini paylaşır. Harici servis yok: tek bir SQLite dosyası, rezervasyonlar
+BEGIN IMMEDIATE (yazma kilidi) içinde sayılıp eklenir, limit asla aşılmaz.
+
+Slot durumları:
+    reserved - işlem açılıyor (open_futures_position öncesi)
+    open     - pozisyon açık (borsadan doğrulandı veya emir başarılı)
+"""
+import os
+import time
+import sqlite3
+import threading
+from Trade.trade_settings import TRADE_SETTINGS
+from Trade.futures_position import open_futures_position
+from core.signal_journal import (
+    get_journal, DECISION_OPENED, DECISION_OPEN_FAILED, DECISION_NO_SLOT, DECISION_CORRELATED
+)
+from core.correlation_matrix import get_correlation
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache')
+DEFAULT_PATH = os.path.join(CACHE_DIR, 'slots.sqlite')
+
+# Sahibi bilinmeyen (elle veya başka bir programla açılmış) pozisyonlar
+EXTERNAL_OWNER = 'external'
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SlotCoordinator:
+    """
+    Args:
+        path (str): SQLite dosyası (tüm süreçler aynı dosyayı kullanır)
+        owner (str): Bu sürecin adı (örn. 'worker-2')
+        max_slots (int): Toplam pozisyon limiti (None ise TRADE_SETTINGS['MAX_OPEN_POSITIONS'])
+        reserve_timeout (float): Bu süreden eski 'reserved' kayıtlar düşürülür (saniye)
+    """
+    def __init__(self, path=DEFAULT_PATH, owner=None, max_slots=None, reserve_timeout=None):
+        self.path = path
+        self.owner = owner or f"pid-{os.getpid()}"
+        if max_slots is None:
+            max_slots = TRADE_SETTINGS['MAX_OPEN_POSITIONS']
+        self.max_slots = max_slots
+        if reserve_timeout is None:
+            reserve_timeout = TRADE_SETTINGS['ORDER_TIMEOUT']
+        self.reserve_timeout = reserve_timeout
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Bağlantı süreçler arasında taşınmaz, her süreç kendi bağlantısını açar
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        state['_pid'] = None
+        state['_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            # isolation_level=None: işlemler BEGIN IMMEDIATE ile elle yönetilir
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS slots (
+                    symbol TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    pid INTEGER NOT NULL,
+                    state TEXT NOT NULL,
+                    updated REAL NOT NULL
+                )
+            """)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def _transaction(self, func, *args):
+        """func(conn, *args) yazma kilidi altında çalışır"""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(conn, *args)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+
+    def _expire(self, conn):
+        """Süresi dolmuş veya sahibi ölmüş rezervasyonları düşür"""
+        cutoff = time.time() - self.reserve_timeout
+        rows = conn.execute("SELECT symbol, pid, updated FROM slots WHERE state = 'reserved'").fetchall()
+        for symbol, pid, updated in rows:
+            if updated < cutoff or not _pid_alive(pid):
+                conn.execute("DELETE FROM slots WHERE symbol = ?", (symbol,))
+
+    def _adopt(self, conn):
+        """
+        Sahibi ölmüş açık slotları bu sürece devral
+
+        Pozisyon borsada hâlâ açık olabilir, slot silinmez (limit aşılmaz); devralan
+        süreç sync'te fetch_positions kapandığını gösterince bırakır.
+        """
+        rows = conn.execute("SELECT symbol, pid FROM slots WHERE state = 'open' AND owner != ?",
+                            (EXTERNAL_OWNER,)).fetchall()
+        for symbol, pid in rows:
+            if pid != os.getpid() and not _pid_alive(pid):
+                conn.execute("UPDATE slots SET owner = ?, pid = ? WHERE symbol = ?",
+                             (self.owner, os.getpid(), symbol))
+
+    def _reserve(self, conn, symbol):
+        self._expire(conn)
+        if conn.execute("SELECT 1 FROM slots WHERE symbol = ?", (symbol,)).fetchone():
+            return False
+        (used,) = conn.execute("SELECT COUNT(*) FROM slots").fetchone()
+        if used >= self.max_slots:
+            return False
+        conn.execute(
+            "INSERT INTO slots (symbol, owner, pid, state, updated) VALUES (?, ?, ?, 'reserved', ?)",
+            (symbol, self.owner, os.getpid(), time.time())
+        )
+        return True
+
+    def reserve(self, symbol):
+        """
+        İşlem açmadan önce slot ayır
+
+        Returns:
+            bool: Slot ayrıldıysa True (coin başka süreçte aktifse veya limit doluysa False)
+        """
+        return self._transaction(self._reserve, symbol)
+
+    def confirm(self, symbol):
+        """İşlem açıldı - rezervasyonu açık pozisyona çevir"""
+        self._transaction(lambda conn: conn.execute(
+            "UPDATE slots SET state = 'open', updated = ? WHERE symbol = ?", (time.time(), symbol)
+        ))
+
+    def release(self, symbol):
+        """İşlem açılamadı veya pozisyon kapandı - slotu bırak"""
+        self._transaction(lambda conn: conn.execute("DELETE FROM slots WHERE symbol = ?", (symbol,)))
+
+    def _sync(self, conn, open_symbols, snapshot_time, owned):
+        self._expire(conn)
+        self._adopt(conn)
+        # Snapshot'tan sonra açılan pozisyonlar (başka süreçten) silinmez
+        rows = conn.execute(
+            "SELECT symbol, owner FROM slots WHERE state = 'open' AND updated < ?", (snapshot_time,)
+        ).fetchall()
+        for symbol, owner in rows:
+            if symbol not in open_symbols and owner in (self.owner, EXTERNAL_OWNER):
+                conn.execute("DELETE FROM slots WHERE symbol = ?", (symbol,))
+        for symbol in open_symbols:
+            owner = self.owner if owned is None or symbol in owned else EXTERNAL_OWNER
+            conn.execute(
+                "INSERT INTO slots (symbol, owner, pid, state, updated) VALUES (?, ?, ?, 'open', ?) "
+                "ON CONFLICT(symbol) DO UPDATE SET state = 'open'",
+                (symbol, owner, os.getpid(), snapshot_time)
+            )
+
+    def sync(self, open_symbols, snapshot_time, owned=None):
+        """
+        Borsadaki açık pozisyonlarla eşitle (TP/SL ile kapananların slotu boşalır)
+
+        Args:
+            open_symbols (set): fetch_positions'tan gelen açık coinler
+            snapshot_time (float): fetch_positions çağrılmadan önceki time.time()
+            owned (set): Bu sürecin taradığı coinler; diğerleri 'external' kaydedilir
+        """
+        self._transaction(self._sync, set(open_symbols), snapshot_time, owned)
+
+    def active_symbols(self):
+        """Tüm süreçlerde açık veya açılmakta olan coinler"""
+        with self._lock:
+            return {row[0] for row in self._connection().execute("SELECT symbol FROM slots")}
+
+    def count(self):
+        """Kullanılan slot sayısı"""
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM slots").fetchone()[0]
+
+    def reset(self):
+        """Tüm slotları temizle (yeni oturum başlangıcı)"""
+        self._transaction(lambda conn: conn.execute("DELETE FROM slots"))
+
+
+def _journal_outcome(exchange, symbol, signal_data, decision):
+    journal = get_journal(exchange)
+    if journal is not None:
+        journal.record(symbol, decision, side=signal_data.get('type'), order_ids=signal_data.get('order_ids'))
+
+
+def open_with_slot(coordinator, exchange, symbol, signal_data):
+    """
+    Slot ayırıp işlem aç; koordinatör yoksa doğrudan open_futures_position
+    Açık pozisyonlarla aynı yönde yüksek korelasyonlu aday açılmaz (MAX_CORRELATION).
+    Sonuç (emir ID'leriyle) sinyal günlüğüne yazılır.
+
+    Returns:
+        bool: İşlem açıldıysa True
+    """
+    correlation = get_correlation()
+    if correlation is not None:
+        correlated = correlation.check(symbol, signal_data.get('type'))
+        if correlated:
+            print(f"🔗 {symbol}: açık {correlated[0]} pozisyonuyla korelasyon {correlated[1]:.2f} - işlem açılmadı")
+            _journal_outcome(exchange, symbol, signal_data, DECISION_CORRELATED)
+            return False
+
+    result = _open(coordinator, exchange, symbol, signal_data)
+    if result and correlation is not None:
+        correlation.add_exposure(symbol, signal_data.get('type'))
+    return result
+
+
+def _open(coordinator, exchange, symbol, signal_data):
+    if coordinator is None:
+        result = open_futures_position(exchange, symbol, signal_data)
+        _journal_outcome(exchange, symbol, signal_data, DECISION_OPENED if result else DECISION_OPEN_FAILED)
+        return result
+
+    if not coordinator.reserve(symbol):
+        print(f"🔒 {symbol}: boş slot yok veya coin başka süreçte aktif")
+        _journal_outcome(exchange, symbol, signal_data, DECISION_NO_SLOT)
+        return False
+    try:
+        result = open_futures_position(exchange, symbol, signal_data)
+    except BaseException:
+        coordinator.release(symbol)
+        raise
+    if result:
+        coordinator.confirm(symbol)
+    else:
+        coordinator.release(symbol)
+    _journal_outcome(exchange, symbol, signal_data, DECISION_OPENED if result else DECISION_OPEN_FAILED)
+    return result
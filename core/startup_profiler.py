@@ -0,0 +1,78 @@
+"""
+Başlangıç profili - modül başına import maliyeti
+
+Ayrı bir Python süreci `-X importtime` ile başlatılır ve çıktı özetlenir.
+
+Kullanım:
+    python core/startup_profiler.py monitor_multiple
+    python core/startup_profiler.py core.Math.volume_check --top 30
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+
+
+def profile_imports(module):
+    """
+    Modülü temiz bir süreçte import et ve import sürelerini topla
+
+    Returns:
+        list: (modül, kendi süresi µs, toplam süresi µs, derinlik) listesi, import sırasıyla
+    """
+    # Betikler core/ klasöründen çalıştığı için iki yol da eklenir
+    code = f"import sys; sys.path[:0] = [{current_dir!r}, {project_root!r}]; import {module}"
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, cwd=project_root
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{module} import edilemedi:\n{result.stderr[-2000:]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def report(module, top=20):
+    """Import maliyet raporunu yazdır"""
+    entries = profile_imports(module)
+    target = next((e for e in reversed(entries) if e[0] == module), None)
+    total = target[2] if target else sum(e[1] for e in entries)
+
+    print(f"\n{'='*60}")
+    print(f"⏱️ IMPORT PROFİLİ: {module}")
+    print(f"{'='*60}")
+    print(f"• Toplam: {total / 1000:.1f} ms ({len(entries)} modül)")
+
+    # Doğrudan import edilen paketlerin toplam maliyeti (ccxt, pandas, ...)
+    roots = {}
+    for name, self_us, cumulative_us, depth in entries:
+        root = name.split('.')[0]
+        roots[root] = roots.get(root, 0) + self_us
+    print(f"\n📦 Paket bazında (ms):")
+    for root, us in sorted(roots.items(), key=lambda x: -x[1])[:top]:
+        print(f"{root:<40}{us / 1000:>10.1f}")
+
+    print(f"\n🐢 En pahalı modüller (kendi süresi, ms):")
+    for name, self_us, cumulative_us, depth in sorted(entries, key=lambda e: -e[1])[:top]:
+        print(f"{name:<40}{self_us / 1000:>10.1f}{cumulative_us / 1000:>10.1f}")
+    return entries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Modül başına import maliyeti")
+    parser.add_argument('modules', nargs='*', default=['monitor_multiple'])
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        report(module, args.top)
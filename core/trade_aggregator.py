@@ -0,0 +1,293 @@
+"""
+aggTrade akışından mum üretici - 1s, 15s, 1m gibi REST'te olmayan zaman dilimleri
+
+- Her işlem O(1) ile aktif mumu günceller; kapanan mumlar sınırlı bir deque'da tutulur
+  (sembol ve zaman dilimi başına en fazla max_candles mum)
+- İşlem olmayan aralıklar Binance kline'ları gibi önceki kapanışla, sıfır hacimle doldurulur
+- frame() tarama ile aynı formatta DataFrame verir; core/Math indikatörleri ve RangeFilter
+  doğrudan çalışır
+- Kaynaklar: Binance aggTrades dump'ları (CSV/zip), WebSocket aggTrade mesajları,
+  ccxt trade dict'leri veya SyntheticTrades (simülasyon)
+
+Kullanım:
+    python core/trade_aggregator.py BTCUSDT-aggTrades-2024-01-01.zip --timeframes 15s 1m
+    python core/trade_aggregator.py --sim 3 --timeframes 15s 1m --hours 12
+"""
+import sys
+import os
+import time
+import zipfile
+import argparse
+from collections import deque
+
+# Core klasörünü path'e ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from core.lazy_import import lazy_import
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+from core.candle_store import COLUMNS, timeframe_ms
+
+DEFAULT_MAX_CANDLES = 1500
+
+# Binance aggTrades CSV kolonları (başlıksız eski dump'larda da aynı sıra)
+AGG_TRADE_COLUMNS = [
+    'agg_trade_id', 'price', 'quantity', 'first_trade_id', 'last_trade_id',
+    'transact_time', 'is_buyer_maker',
+]
+
+
+class CandleAggregator:
+    """
+    Tek sembol, tek zaman dilimi için artımlı mum
+
+    Args:
+        timeframe (str): '1s', '15s', '1m', '5m' ...
+        max_candles (int): Tutulan kapanmış mum sayısı
+        on_close (callable): Her kapanan mum için on_close(candle) - candle = [ts, o, h, l, c, v]
+    """
+    def __init__(self, timeframe, max_candles=DEFAULT_MAX_CANDLES, on_close=None):
+        self.timeframe = timeframe
+        self.step = timeframe_ms(timeframe)
+        if self.step is None:
+            raise ValueError(f"Desteklenmeyen zaman dilimi: {timeframe}")
+        self.candles = deque(maxlen=max_candles)
+        self.current = None
+        self.on_close = on_close
+        self.trades = 0
+        self.late_trades = 0
+
+    def add(self, ts, price, quantity):
+        """
+        İşlemi ekle
+
+        Returns:
+            int: Bu işlemle kapanan mum sayısı
+        """
+        start = ts - ts % self.step
+        current = self.current
+        if current is not None and start == current[0]:
+            # En sık yol: aktif mum içinde
+            if price > current[2]:
+                current[2] = price
+            elif price < current[3]:
+                current[3] = price
+            current[4] = price
+            current[5] += quantity
+            self.trades += 1
+            return 0
+        if current is not None and start < current[0]:
+            # Kapanmış muma ait gecikmiş işlem - kapanan mumlar değiştirilmez
+            self.late_trades += 1
+            return 0
+
+        closed = 0
+        if current is not None:
+            closed = self._close(current, start)
+        self.current = [start, price, price, price, price, quantity]
+        self.trades += 1
+        return closed
+
+    def _close(self, candle, next_start):
+        """Mumu kapat, next_start'a kadar işlemsiz mumları doldur"""
+        self.candles.append(candle)
+        if self.on_close:
+            self.on_close(candle)
+        closed = 1
+        missing = (next_start - candle[0]) // self.step - 1
+        if missing > 0:
+            close = candle[4]
+            # deque'dan taşacak boş mumlar hiç oluşturulmaz
+            first = candle[0] + max(missing - self.candles.maxlen, 0) * self.step + self.step
+            for ts in range(first, next_start, self.step):
+                empty = [ts, close, close, close, close, 0.0]
+                self.candles.append(empty)
+                if self.on_close:
+                    self.on_close(empty)
+                closed += 1
+        return closed
+
+    def advance(self, now_ms):
+        """
+        İşlem gelmese de süresi dolan mumu kapat (sessiz piyasada sinyal gecikmesin)
+
+        Returns:
+            int: Kapanan mum sayısı
+        """
+        if self.current is None:
+            return 0
+        start = now_ms - now_ms % self.step
+        if start <= self.current[0]:
+            return 0
+        closed = self._close(self.current, start)
+        close = self.current[4]
+        self.current = [start, close, close, close, close, 0.0]
+        return closed
+
+    def rows(self, include_forming=False):
+        """Kapanmış mumlar (fetch_ohlcv formatında)"""
+        rows = [list(candle) for candle in self.candles]
+        if include_forming and self.current is not None:
+            rows.append(list(self.current))
+        return rows
+
+    def frame(self, include_forming=False):
+        """Tarama ile aynı formatta DataFrame (varsayılan: aktif mum hariç)"""
+        rows = self.rows(include_forming)
+        df = pd.DataFrame(rows, columns=COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms').dt.tz_localize('UTC').dt.tz_convert('Europe/Istanbul')
+        df.set_index('timestamp', inplace=True)
+        return df
+
+
+class TradeAggregator:
+    """
+    Çok sembol, çok zaman dilimi
+
+    Args:
+        timeframes (list): Üretilecek zaman dilimleri
+        max_candles (int): Sembol/zaman dilimi başına tutulan mum
+        on_close (callable): on_close(symbol, timeframe, candle)
+    """
+    def __init__(self, timeframes, max_candles=DEFAULT_MAX_CANDLES, on_close=None):
+        self.timeframes = list(timeframes)
+        self.max_candles = max_candles
+        self.on_close = on_close
+        self._aggregators = {}
+
+    def aggregators(self, symbol):
+        aggregators = self._aggregators.get(symbol)
+        if aggregators is None:
+            aggregators = []
+            for timeframe in self.timeframes:
+                callback = None
+                if self.on_close:
+                    callback = (lambda candle, tf=timeframe: self.on_close(symbol, tf, candle))
+                aggregators.append(CandleAggregator(timeframe, self.max_candles, callback))
+            self._aggregators[symbol] = aggregators
+        return aggregators
+
+    def get(self, symbol, timeframe):
+        return self.aggregators(symbol)[self.timeframes.index(timeframe)]
+
+    def symbols(self):
+        return list(self._aggregators)
+
+    def add(self, symbol, ts, price, quantity):
+        for aggregator in self.aggregators(symbol):
+            aggregator.add(ts, price, quantity)
+
+    def add_agg_trade(self, message):
+        """Binance WebSocket aggTrade mesajı: {'e': 'aggTrade', 's': 'BTCUSDT', 'p': '...', 'q': '...', 'T': ...}"""
+        self.add(message['s'], int(message['T']), float(message['p']), float(message['q']))
+
+    def add_ccxt_trade(self, trade):
+        """ccxt trade dict'i (fetch_trades / watch_trades)"""
+        self.add(trade['symbol'], int(trade['timestamp']), float(trade['price']), float(trade['amount']))
+
+    def advance(self, now_ms):
+        """Tüm sembollerde süresi dolan mumları kapat"""
+        for aggregators in self._aggregators.values():
+            for aggregator in aggregators:
+                aggregator.advance(now_ms)
+
+    def frame(self, symbol, timeframe, include_forming=False):
+        return self.get(symbol, timeframe).frame(include_forming)
+
+
+def read_agg_trades(path, chunksize=1_000_000):
+    """
+    Binance aggTrades dump'ını (CSV veya zip) parça parça oku
+
+    Yields:
+        tuple: (timestamp_ms, fiyat, miktar) dizileri
+    """
+    def chunks(stream):
+        header = None if stream.peek(1)[:1].isdigit() else 0
+        reader = pd.read_csv(
+            stream, header=header, usecols=range(7), names=AGG_TRADE_COLUMNS,
+            dtype={'price': 'float64', 'quantity': 'float64', 'transact_time': 'int64'},
+            engine='c', chunksize=chunksize
+        )
+        for chunk in reader:
+            ts = chunk['transact_time'].to_numpy()
+            if len(ts) and ts[0] >= 10 ** 14:
+                # 2025'ten sonraki spot dump'ları mikrosaniye
+                ts = ts // 1000
+            yield ts, chunk['price'].to_numpy(), chunk['quantity'].to_numpy()
+
+    if path.endswith('.zip'):
+        with zipfile.ZipFile(path) as archive:
+            name = next(n for n in archive.namelist() if n.endswith('.csv'))
+            with archive.open(name) as stream:
+                yield from chunks(stream)
+    else:
+        with open(path, 'rb') as stream:
+            yield from chunks(stream)
+
+
+def feed_file(aggregator, symbol, path):
+    """Dump dosyasındaki tüm işlemleri aggregator'a ver"""
+    count = 0
+    for ts, prices, quantities in read_agg_trades(path):
+        add = aggregator.add
+        # tolist(): NumPy skalerleri yerine Python sayıları - döngü ~3x hızlı
+        for t, p, q in zip(ts.tolist(), prices.tolist(), quantities.tolist()):
+            add(symbol, t, p, q)
+        count += len(ts)
+    return count
+
+
+def last_signal(df, rf):
+    """Kapanmış mumlarda son RangeFilter sinyali ('buy', 'sell' veya None)"""
+    if len(df) < 2:
+        return None
+    signals = rf.generate_signals(df)
+    if signals['buy_signals'].iloc[-1]:
+        return 'buy'
+    if signals['sell_signals'].iloc[-1]:
+        return 'sell'
+    return None
+
+
+if __name__ == "__main__":
+    from core.Math.range_filter import RangeFilter
+
+    parser = argparse.ArgumentParser(description="aggTrade -> mum")
+    parser.add_argument('paths', nargs='*', help="<SEMBOL>-aggTrades-*.zip/csv dosyaları")
+    parser.add_argument('--timeframes', nargs='+', default=['15s', '1m'])
+    parser.add_argument('--max-candles', type=int, default=DEFAULT_MAX_CANDLES)
+    parser.add_argument('--sim', type=int, default=None, metavar='SEMBOL', help="SyntheticTrades akışı")
+    parser.add_argument('--hours', type=float, default=6.0, help="Simülasyon süresi")
+    args = parser.parse_args()
+
+    rf = RangeFilter(100, 3.0)
+    aggregator = TradeAggregator(args.timeframes, args.max_candles)
+    start = time.perf_counter()
+    total = 0
+
+    if args.sim:
+        from core.sim_exchange import SyntheticCandles, SyntheticTrades
+        now = int(time.time() * 1000)
+        origin = now - int(args.hours * 3_600_000)
+        stream = SyntheticTrades(SyntheticCandles(origin, timeframe='1m'), trades_per_bar=60)
+        for i in range(args.sim):
+            symbol = f"SIM{i:04d}/USDT"
+            for ts, price, quantity, _ in stream.trades(symbol, origin, now):
+                aggregator.add(symbol, ts, price, quantity)
+                total += 1
+    else:
+        for path in args.paths:
+            symbol = os.path.basename(path).split('-')[0]
+            total += feed_file(aggregator, symbol, path)
+
+    elapsed = time.perf_counter() - start
+    print(f"📦 {total:,} işlem, {elapsed:.1f} sn ({total / (elapsed or 1e-9):,.0f} işlem/sn)")
+    for symbol in aggregator.symbols():
+        for timeframe in args.timeframes:
+            df = aggregator.frame(symbol, timeframe)
+            signal = last_signal(df, rf)
+            print(f"📊 {symbol} {timeframe}: {len(df)} mum, son kapanış {df['close'].iloc[-1] if len(df) else '-'}"
+                  f", sinyal: {signal or 'yok'}")
@@ -0,0 +1,13 @@
+"""
+Testler proje kökünden çalışır (core/ ve Trade/ paketleri import edilir)
+
+Testler ağa çıkmaz: borsa yerine core.sim_exchange.SimExchange kullanılır.
+Çalıştırma:
+    python -m pytest -q
+"""
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
@@ -0,0 +1,136 @@
+"""Geçmiş mum indirici - SimExchange ile sayfalama, tekrarsız yazma ve kaldığı yerden devam"""
+import json
+
+import numpy as np
+import pytest
+
+from core.candle_downloader import CandleDownloader, missing_intervals, merge_intervals, parse_date
+from core.candle_store import CandleStore, MARKET_SPOT
+from core.sim_exchange import SimExchange, SyntheticCandles, VirtualClock
+
+STEP = 5 * 60 * 1000
+ORIGIN = parse_date('2024-01-20')
+BARS = 4000
+PAIRS = ['SIM0000/USDT', 'SIM0001/USDT']
+
+
+class InterruptingExchange(SimExchange):
+    """fail_after istekten sonra her fetch_ohlcv hata verir (yarıda kalan indirme)"""
+    fail_after = None
+
+    def fetch_ohlcv(self, *args, **kwargs):
+        if self.fail_after is not None:
+            if self.fail_after <= 0:
+                raise RuntimeError("bağlantı koptu")
+            self.fail_after -= 1
+        return super().fetch_ohlcv(*args, **kwargs)
+
+
+def make_exchange(bars=BARS, cls=SimExchange):
+    # Son mum aktif: BARS kapanmış mum
+    clock = VirtualClock(start_ms=ORIGIN + bars * STEP + 60_000, speed=None)
+    exchange = cls(PAIRS, candles=SyntheticCandles(ORIGIN), clock=clock, on_rate_limit='raise')
+    exchange.load_markets()
+    return exchange
+
+
+def expected_rows(exchange, symbol, start, end):
+    bars = exchange.candles.bars(symbol, (start - ORIGIN) // STEP, (end - ORIGIN) // STEP)
+    timestamps = np.arange(start, end, STEP)
+    return timestamps, bars
+
+
+def assert_complete(store, exchange, start, end):
+    for symbol in PAIRS:
+        columns = store.read(symbol, '5m')
+        timestamps, bars = expected_rows(exchange, symbol, start, end)
+        np.testing.assert_array_equal(columns['timestamp'], timestamps)
+        for i, name in enumerate(['open', 'high', 'low', 'close']):
+            np.testing.assert_allclose(columns[name], bars[:, i], rtol=1e-12)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CandleStore(str(tmp_path / 'candles'))
+
+
+def test_intervals():
+    assert merge_intervals([[5, 10], [0, 3], [3, 5], [20, 30]]) == [[0, 10], [20, 30]]
+    assert missing_intervals(0, 100, [[10, 20], [50, 60]]) == [[0, 10], [20, 50], [60, 100]]
+    assert missing_intervals(0, 100, [[0, 100]]) == []
+
+
+def test_pagination(store):
+    exchange = make_exchange()
+    downloader = CandleDownloader(exchange, store, page_limit=499, workers=2)
+    end = ORIGIN + BARS * STEP
+    stats = downloader.download(PAIRS, ['5m'], ORIGIN)
+
+    assert stats['candles'] == BARS * len(PAIRS)
+    # Sembol başına ceil(4000 / 499) = 9 sayfa
+    assert stats['requests'] == 9 * len(PAIRS)
+    assert_complete(store, exchange, ORIGIN, end)
+    # Ay sınırı (2024-02) iki dosyaya bölünür
+    assert store.months(PAIRS[0], '5m') == ['2024-01', '2024-02']
+
+
+def test_rerun_fetches_only_new_candles_without_duplicates(store):
+    exchange = make_exchange()
+    CandleDownloader(exchange, store, page_limit=499).download(PAIRS, ['5m'], ORIGIN)
+
+    # 100 mum sonra aynı aralık + yeni mumlar
+    exchange.clock.advance(100 * STEP)
+    downloader = CandleDownloader(exchange, store, page_limit=499)
+    stats = downloader.download(PAIRS, ['5m'], ORIGIN)
+    assert stats['requests'] == len(PAIRS)
+    assert stats['candles'] == 100 * len(PAIRS)
+    assert_complete(store, exchange, ORIGIN, ORIGIN + (BARS + 100) * STEP)
+
+    # Örtüşen sayfalar tekrar yazılsa da depo tekrarsız kalır
+    rows = exchange.fetch_ohlcv(PAIRS[0], '5m', since=ORIGIN + 10 * STEP, limit=50)
+    store.write_rows(PAIRS[0], '5m', rows)
+    assert_complete(store, exchange, ORIGIN, ORIGIN + (BARS + 100) * STEP)
+
+
+def test_resume_after_interrupted_run(store):
+    end = ORIGIN + BARS * STEP
+    exchange = make_exchange(cls=InterruptingExchange)
+    exchange.fail_after = 4
+    first = CandleDownloader(exchange, store, page_limit=499, workers=1)
+    first.download(PAIRS, ['5m'], ORIGIN)
+    assert first.stats['requests'] == 4
+    with open(first.checkpoint_path) as f:
+        progress = json.load(f)
+    assert sum(len(state['covered']) for state in progress.values()) >= 1
+
+    # Yeni süreç: ilerleme dosyasından devam eder, indirilen sayfalar tekrar istenmez
+    exchange.fail_after = None
+    second = CandleDownloader(exchange, store, page_limit=499, workers=1)
+    second.download(PAIRS, ['5m'], ORIGIN)
+    assert first.stats['requests'] + second.stats['requests'] == 9 * len(PAIRS)
+    assert_complete(store, exchange, ORIGIN, end)
+
+    third = CandleDownloader(exchange, store, page_limit=499, workers=1)
+    third.download(PAIRS, ['5m'], ORIGIN)
+    assert third.stats['requests'] == 0
+
+
+def test_listing_date_is_remembered(store):
+    exchange = make_exchange(bars=1000)
+    since = ORIGIN - 2000 * STEP
+    first = CandleDownloader(exchange, store, page_limit=499, workers=1)
+    first.download(PAIRS, ['5m'], since)
+    assert_complete(store, exchange, ORIGIN, ORIGIN + 1000 * STEP)
+    for symbol in PAIRS:
+        assert first.progress[f"{symbol}|5m"]['first_available'] == ORIGIN
+
+    # Listeleme öncesi dönem için tekrar istek atılmaz
+    second = CandleDownloader(exchange, store, page_limit=499, workers=1)
+    second.download(PAIRS, ['5m'], since)
+    assert second.stats['requests'] == 0
+
+
+def test_store_market_must_match_exchange(tmp_path):
+    exchange = make_exchange(bars=10)
+    with pytest.raises(ValueError):
+        CandleDownloader(exchange, CandleStore(str(tmp_path), market=MARKET_SPOT))
@@ -0,0 +1,166 @@
+"""Olay tabanlı emir takibi - SimExchange user-data stream ile SL/TP, reconcile ve sıra dışı olaylar"""
+import pytest
+
+from core.sim_exchange import SimExchange, VirtualClock
+from Trade.order_tracker import OrderTracker, client_order_ids, split_client_order_id
+
+START = 1_704_067_200_000  # 2024-01-01
+PAIRS = ['SIM0000/USDT', 'SIM0001/USDT', 'SIM0002/USDT']
+
+
+@pytest.fixture
+def exchange():
+    exchange = SimExchange(PAIRS, clock=VirtualClock(start_ms=START, speed=None))
+    exchange.load_markets()
+    return exchange
+
+
+def market_id(exchange, symbol):
+    return exchange.market(symbol)['id']
+
+
+def open_position(exchange, tracker, symbol, sl_factor=0.5, tp_factor=10.0, register=True):
+    """Market long + reduce-only SL/TP; sl_factor > 1 ise SL bir sonraki tick'te tetiklenir"""
+    ids = client_order_ids()
+    price = exchange.fetch_ticker(symbol)['last']
+    amount = 100 / price
+    orders = {
+        'entry': exchange.create_order(symbol, 'market', 'buy', amount,
+                                       params={'newClientOrderId': ids['entry']}),
+        'stop_loss': exchange.create_order(symbol, 'STOP_MARKET', 'sell', amount, params={
+            'newClientOrderId': ids['stop_loss'], 'stopPrice': price * sl_factor, 'reduceOnly': True}),
+        'take_profit': exchange.create_order(symbol, 'TAKE_PROFIT_MARKET', 'sell', amount, params={
+            'newClientOrderId': ids['take_profit'], 'stopPrice': price * tp_factor, 'reduceOnly': True}),
+    }
+    if register:
+        for leg, order in orders.items():
+            tracker.register(order, leg)
+    return orders
+
+
+def test_client_order_ids_round_trip():
+    ids = client_order_ids()
+    groups = {split_client_order_id(client_id)[0] for client_id in ids.values()}
+    assert len(groups) == 1
+    assert {split_client_order_id(client_id)[1] for client_id in ids.values()} == set(ids)
+    assert split_client_order_id('sim_10000001') == (None, None)
+    assert client_order_ids()['entry'] != ids['entry']
+
+
+def test_stop_loss_fill_cancels_take_profit(exchange):
+    tracker = OrderTracker(exchange, reconcile_seconds=3600, cancel_orphans=True)
+    tracker.start()
+    symbol = PAIRS[0]
+    orders = open_position(exchange, tracker, symbol, sl_factor=1.5)
+    # Başka sürecin aynı semboldeki koruma emri (register edilmemiş)
+    foreign = exchange.create_order(symbol, 'TAKE_PROFIT_MARKET', 'sell', 1.0,
+                                    params={'stopPrice': orders['entry']['average'] * 20, 'reduceOnly': True})
+
+    exchange.tick()
+
+    sl, tp = orders['stop_loss'], orders['take_profit']
+    assert tracker.status(sl['clientOrderId']) == 'closed'
+    assert tracker.status(tp['clientOrderId']) == 'canceled'
+    assert exchange.orders[tp['id']]['status'] == 'canceled'
+    assert tracker.fills[sl['clientOrderId']][0]['amount'] == pytest.approx(sl['amount'])
+    assert tracker.positions[market_id(exchange, symbol)] == 0
+    assert tracker.stats['orphans_canceled'] == 1
+    # Takipçinin açmadığı emre dokunulmaz
+    assert exchange.orders[foreign['id']]['status'] == 'open'
+    assert tracker.status(foreign['id']) == 'open'
+
+    group = tracker.group(split_client_order_id(sl['clientOrderId'])[0])
+    assert {leg: entry['status'] for leg, entry in group.items()} == {
+        'entry': 'closed', 'stop_loss': 'closed', 'take_profit': 'canceled'}
+
+
+def test_orphans_are_kept_when_disabled(exchange):
+    tracker = OrderTracker(exchange, reconcile_seconds=3600, cancel_orphans=False)
+    tracker.start()
+    orders = open_position(exchange, tracker, PAIRS[0], sl_factor=1.5)
+    exchange.tick()
+    assert tracker.status(orders['stop_loss']['clientOrderId']) == 'closed'
+    assert tracker.status(orders['take_profit']['clientOrderId']) == 'open'
+    assert exchange.orders[orders['take_profit']['id']]['status'] == 'open'
+
+
+def test_reconcile_adopts_missed_and_orphan_orders(exchange):
+    # Akış yok: olaylar kaçar, defter sadece reconcile ile eşitlenir
+    tracker = OrderTracker(exchange, reconcile_seconds=3600, cancel_orphans=True)
+    filled = open_position(exchange, tracker, PAIRS[0], sl_factor=1.5)
+    closed = open_position(exchange, tracker, PAIRS[1])
+    # Bilinmeyen (başka süreç) açık emir
+    price = exchange.fetch_ticker(PAIRS[2])['last']
+    foreign = exchange.create_order(PAIRS[2], 'limit', 'buy', 1.0, price * 0.5)
+
+    # PAIRS[0]: SL borsada doldu; PAIRS[1]: pozisyon elle kapatıldı, SL/TP açık kaldı
+    exchange.tick()
+    exchange.create_order(PAIRS[1], 'market', 'sell', closed['entry']['amount'], params={'reduceOnly': True})
+    assert tracker.status(filled['stop_loss']['clientOrderId']) == 'open'
+
+    result = tracker.reconcile()
+
+    assert result['adopted'] == 1
+    assert result['missed'] == 1
+    # PAIRS[0] TP (grup) + PAIRS[1] SL ve TP (pozisyon yok)
+    assert result['canceled'] == 3
+    assert tracker.status(filled['stop_loss']['clientOrderId']) == 'closed'
+    for order in (filled['take_profit'], closed['stop_loss'], closed['take_profit']):
+        assert tracker.status(order['clientOrderId']) == 'canceled'
+        assert exchange.orders[order['id']]['status'] == 'canceled'
+    adopted = tracker.get(foreign['id'])
+    assert adopted['status'] == 'open' and not adopted.get('own')
+    assert exchange.orders[foreign['id']]['status'] == 'open'
+
+    # İkinci eşitlemede yapılacak iş kalmaz
+    assert tracker.reconcile() == {'open': 1, 'missed': 0, 'adopted': 0, 'canceled': 0}
+
+
+def test_reconcile_keeps_orders_of_open_positions(exchange):
+    tracker = OrderTracker(exchange, reconcile_seconds=3600, cancel_orphans=True)
+    orders = open_position(exchange, tracker, PAIRS[0])
+    result = tracker.reconcile()
+    assert result == {'open': 2, 'missed': 0, 'adopted': 0, 'canceled': 0}
+    assert tracker.status(orders['stop_loss']['clientOrderId']) == 'open'
+    assert tracker.positions[market_id(exchange, PAIRS[0])] == pytest.approx(orders['entry']['amount'])
+
+
+def test_out_of_order_and_stale_events(exchange):
+    events = []
+    exchange.subscribe_user_data(events.append)
+    tracker = OrderTracker(exchange, reconcile_seconds=3600, cancel_orphans=True)
+    orders = open_position(exchange, tracker, PAIRS[0], sl_factor=1.5, register=False)
+    exchange.clock.advance(1000)
+    exchange.tick()
+    exchange.unsubscribe_user_data(events.append)
+
+    sl_id = orders['stop_loss']['clientOrderId']
+    sl_events = [event for event in events if event['e'] == 'ORDER_TRADE_UPDATE' and event['o']['c'] == sl_id]
+    assert [event['o']['X'] for event in sl_events] == ['NEW', 'FILLED']
+
+    # Dolum olayı, emir olayından ve create_order sonucundan önce gelir
+    tracker.on_event(sl_events[1])
+    tracker.on_event(sl_events[0])
+    tracker.register(orders['stop_loss'], 'stop_loss')
+    entry = tracker.get(sl_id)
+    assert entry['status'] == 'closed'
+    assert entry['leg'] == 'stop_loss'
+    assert entry['filled'] == pytest.approx(orders['stop_loss']['amount'])
+    assert tracker.stats['stale_events'] == 2
+
+    # Aynı olayın tekrar gelmesi statüyü değiştirmez, daha eski tarihli iptal de
+    tracker.on_event(sl_events[1])
+    stale = dict(sl_events[1], o=dict(sl_events[1]['o'], X='CANCELED', x='CANCELED', T=START - 1))
+    tracker.on_event(stale)
+    assert tracker.status(sl_id) == 'closed'
+    assert tracker.stats['stale_events'] == 3
+    assert tracker.get(orders['stop_loss']['id'])['client_id'] == sl_id
+
+
+def test_snapshot_restore(exchange):
+    tracker = OrderTracker(exchange, reconcile_seconds=3600, cancel_orphans=True)
+    orders = open_position(exchange, tracker, PAIRS[0])
+    restored = OrderTracker(exchange, reconcile_seconds=3600, cancel_orphans=True)
+    assert restored.restore(tracker.snapshot()) == 3
+    assert restored.get(orders['take_profit']['id'])['own']
+    assert restored.open_orders() == tracker.open_orders()
@@ -0,0 +1,61 @@
+"""Toplu (vektörel) hesaplamalar tekil fonksiyonlarla birebir aynı olmalı"""
+import numpy as np
+import pytest
+
+from Trade.position_calculator import PositionCalculator
+
+
+@pytest.fixture
+def inputs():
+    rng = np.random.default_rng(42)
+    n = 500
+    return {
+        'entry_prices': rng.uniform(1e-4, 1e5, n) * rng.choice([1.0, 0.1, 1e-3], n),
+        'sides': rng.choice(['LONG', 'SHORT'], n),
+        'usdt_amounts': rng.uniform(0.5, 1000, n),
+        'sl_percent': rng.uniform(0.1, 5.0, n),
+        'tp_percent': rng.uniform(0.1, 8.0, n),
+    }
+
+
+@pytest.mark.parametrize('leverage', [1, 7, 10, 125])
+def test_tp_sl_batch_matches_scalar(inputs, leverage):
+    calc = PositionCalculator(leverage=leverage)
+    batch = calc.calculate_tp_sl_batch(
+        inputs['entry_prices'], inputs['sides'], inputs['sl_percent'], inputs['tp_percent']
+    )
+    for i, (price, side) in enumerate(zip(inputs['entry_prices'], inputs['sides'])):
+        scalar = calc.calculate_tp_sl(
+            float(price), str(side), float(inputs['sl_percent'][i]), float(inputs['tp_percent'][i])
+        )
+        for key, value in scalar.items():
+            assert batch[key][i] == value, (key, i, side)
+
+
+def test_tp_sl_batch_scalar_percents_and_side_encodings(inputs):
+    calc = PositionCalculator(leverage=10)
+    prices = inputs['entry_prices']
+    sides = inputs['sides']
+    by_name = calc.calculate_tp_sl_batch(prices, sides, 1.0, 1.5)
+    by_sign = calc.calculate_tp_sl_batch(prices, np.where(sides == 'LONG', 1, -1), 1.0, 1.5)
+    by_bool = calc.calculate_tp_sl_batch(prices, sides == 'LONG', 1.0, 1.5)
+    for i, (price, side) in enumerate(zip(prices, sides)):
+        scalar = calc.calculate_tp_sl(float(price), str(side), 1.0, 1.5)
+        for result in (by_name, by_sign, by_bool):
+            assert result['sl_price'][i] == scalar['sl_price']
+            assert result['tp_price'][i] == scalar['tp_price']
+
+
+def test_position_size_and_risk_batch_match_scalar(inputs):
+    calc = PositionCalculator(leverage=20)
+    result = calc.calculate_batch(
+        inputs['entry_prices'], inputs['sides'], inputs['usdt_amounts'],
+        inputs['sl_percent'], inputs['tp_percent']
+    )
+    for i, price in enumerate(inputs['entry_prices']):
+        levels = calc.calculate_tp_sl(
+            float(price), str(inputs['sides'][i]), float(inputs['sl_percent'][i]), float(inputs['tp_percent'][i])
+        )
+        size = calc.calculate_position_size(float(inputs['usdt_amounts'][i]), float(price))
+        assert result['position_size'][i] == size
+        assert result['risk'][i] == calc.calculate_risk(size, levels['entry_price'], levels['sl_price'])
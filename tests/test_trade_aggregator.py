@@ -0,0 +1,116 @@
+"""aggTrade -> mum: boşluk doldurma, deque taşması, gecikmiş işlemler, advance()"""
+import numpy as np
+import pytest
+
+from core.trade_aggregator import CandleAggregator, TradeAggregator, feed_file
+from core.sim_exchange import SyntheticCandles, SyntheticTrades
+
+STEP = 15_000
+
+
+def test_trades_inside_candle_update_ohlcv():
+    aggregator = CandleAggregator('15s')
+    for ts, price, quantity in [(1_000, 10.0, 1.0), (2_000, 12.0, 2.0), (3_000, 9.0, 0.5), (14_999, 11.0, 1.5)]:
+        assert aggregator.add(ts, price, quantity) == 0
+    assert aggregator.current == [0, 10.0, 12.0, 9.0, 11.0, 5.0]
+    assert aggregator.rows() == []
+    assert aggregator.rows(include_forming=True) == [[0, 10.0, 12.0, 9.0, 11.0, 5.0]]
+
+
+def test_gap_is_filled_with_previous_close_and_zero_volume():
+    closed = []
+    aggregator = CandleAggregator('15s', on_close=closed.append)
+    aggregator.add(1_000, 10.0, 1.0)
+    aggregator.add(2_000, 11.0, 1.0)
+    # 3 işlemsiz mum atlanır
+    assert aggregator.add(4 * STEP + 500, 13.0, 2.0) == 4
+    assert aggregator.rows() == [
+        [0, 10.0, 11.0, 10.0, 11.0, 2.0],
+        [STEP, 11.0, 11.0, 11.0, 11.0, 0.0],
+        [2 * STEP, 11.0, 11.0, 11.0, 11.0, 0.0],
+        [3 * STEP, 11.0, 11.0, 11.0, 11.0, 0.0],
+    ]
+    assert closed == aggregator.rows()
+    assert aggregator.current == [4 * STEP, 13.0, 13.0, 13.0, 13.0, 2.0]
+
+
+def test_gap_longer_than_maxlen_keeps_the_same_tail():
+    bounded = CandleAggregator('15s', max_candles=3)
+    unbounded = CandleAggregator('15s', max_candles=1000)
+    for aggregator in (bounded, unbounded):
+        aggregator.add(1_000, 10.0, 1.0)
+        aggregator.add(100 * STEP, 20.0, 1.0)
+    assert bounded.rows() == unbounded.rows()[-3:]
+    assert [row[0] for row in bounded.rows()] == [97 * STEP, 98 * STEP, 99 * STEP]
+    # Taşacak boş mumlar hiç oluşturulmaz (kapanan mum + deque'ya sığan boşlar)
+    bounded = CandleAggregator('15s', max_candles=3)
+    bounded.add(1_000, 10.0, 1.0)
+    assert bounded.add(100 * STEP, 20.0, 1.0) == 4
+
+
+def test_late_trade_does_not_change_closed_candle():
+    aggregator = CandleAggregator('15s')
+    aggregator.add(1_000, 10.0, 1.0)
+    aggregator.add(STEP + 1_000, 11.0, 1.0)
+    assert aggregator.add(5_000, 50.0, 9.0) == 0
+    assert aggregator.late_trades == 1
+    assert aggregator.rows() == [[0, 10.0, 10.0, 10.0, 10.0, 1.0]]
+    assert aggregator.current == [STEP, 11.0, 11.0, 11.0, 11.0, 1.0]
+
+
+def test_advance_closes_quiet_candles():
+    aggregator = CandleAggregator('15s')
+    assert aggregator.advance(10 * STEP) == 0
+    aggregator.add(1_000, 10.0, 1.0)
+    assert aggregator.advance(STEP - 1) == 0
+    assert aggregator.advance(2 * STEP + 1) == 2
+    assert aggregator.rows() == [
+        [0, 10.0, 10.0, 10.0, 10.0, 1.0],
+        [STEP, 10.0, 10.0, 10.0, 10.0, 0.0],
+    ]
+    assert aggregator.current == [2 * STEP, 10.0, 10.0, 10.0, 10.0, 0.0]
+    assert aggregator.advance(2 * STEP + 5_000) == 0
+    # Boş aktif muma gelen işlem tepe/dibi ve hacmi günceller
+    aggregator.add(2 * STEP + 6_000, 12.0, 3.0)
+    aggregator.add(2 * STEP + 7_000, 9.0, 1.0)
+    assert aggregator.current == [2 * STEP, 10.0, 12.0, 9.0, 9.0, 4.0]
+
+
+def test_unsupported_timeframe():
+    with pytest.raises(ValueError):
+        CandleAggregator('1M')
+
+
+def test_synthetic_trades_rebuild_candles():
+    candles = SyntheticCandles(0, timeframe='1m')
+    stream = SyntheticTrades(candles, trades_per_bar=30)
+    aggregator = TradeAggregator(['1m'])
+    for ts, price, quantity, _ in stream.trades('SIM0000/USDT', 0, 50 * 60_000):
+        aggregator.add('SIM0000/USDT', ts, price, quantity)
+    aggregator.advance(50 * 60_000)
+    rows = np.array(aggregator.get('SIM0000/USDT', '1m').rows())
+    bars = candles.bars('SIM0000/USDT', 0, 50)
+    assert len(rows) == 50
+    np.testing.assert_array_equal(rows[:, 0], np.arange(50) * 60_000)
+    np.testing.assert_array_equal(rows[:, 1:5], bars[:, :4])
+    np.testing.assert_allclose(rows[:, 5], bars[:, 4], rtol=1e-12)
+
+
+def test_feed_file_from_csv(tmp_path):
+    path = tmp_path / 'TESTUSDT-aggTrades-2024-01-01.csv'
+    lines = ['agg_trade_id,price,quantity,first_trade_id,last_trade_id,transact_time,is_buyer_maker']
+    trades = [(0, 10.0, 1.0), (20_000, 11.0, 2.0), (59_000, 9.5, 1.0), (61_000, 10.5, 0.5), (185_000, 12.0, 1.0)]
+    for i, (ts, price, quantity) in enumerate(trades):
+        lines.append(f"{i},{price},{quantity},{i},{i},{ts},false")
+    path.write_text('\n'.join(lines) + '\n')
+
+    aggregator = TradeAggregator(['1m'], max_candles=10)
+    assert feed_file(aggregator, 'TESTUSDT', str(path)) == len(trades)
+    assert aggregator.get('TESTUSDT', '1m').rows() == [
+        [0, 10.0, 11.0, 9.5, 9.5, 4.0],
+        [60_000, 10.5, 10.5, 10.5, 10.5, 0.5],
+        [120_000, 10.5, 10.5, 10.5, 10.5, 0.0],
+    ]
+    df = aggregator.frame('TESTUSDT', '1m', include_forming=True)
+    assert list(df.columns) == ['open', 'high', 'low', 'close', 'volume']
+    assert len(df) == 4